@@ -0,0 +1,3 @@
+"""
+Бенчмарки OSINT CLI Helper (запуск из корня проекта: python -m benchmarks.<имя>)
+"""
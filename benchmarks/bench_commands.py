@@ -0,0 +1,326 @@
+#!/usr/bin/env python3
+"""
+Офлайн-бенчмарк команд OSINT CLI Helper на локальных заменителях сервисов
+DNS по UDP, ip-api, crt.sh, CDX API, страницы профилей, сайт и TCP-порты
+работают в этом процессе, каждая команда выполняется в отдельном дочернем
+процессе, чтобы пиковая память относилась только к ней. Пропускная
+способность, перцентили задержки вызова и пиковая память пишутся в JSON;
+--compare сверяет прогон с сохраненной базой, --update-baseline перезаписывает ее.
+Запуск: python -m benchmarks.bench_commands [--only domain scan] [--compare benchmarks/baseline.json]
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import platform
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.fakes import (FakeIPAPI, FakeCrtSh, FakeCDX, FakeProfiles, FakeWebsite,
+                              FakeDNSServer, FakeTCPListeners, fake_catalog)
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'baseline.json')
+
+# Результаты обычного прогона: база в репозитории меняется только по --update-baseline
+DEFAULT_OUTPUT = os.path.join(tempfile.gettempdir(), 'osint_bench_commands.json')
+
+# Объем работы сценариев
+DOMAINS = 200
+SUBDOMAIN_LABELS = 5000
+SUBDOMAIN_RUNS = 3
+USERNAMES = 6
+PLATFORMS = 40
+PAGES = 50
+PAGE_SIZE = 256 * 1024
+SCAN_TARGET = '127.0.0.0/24'
+SCAN_ADDRESSES = 256
+SCAN_CLOSED_PORTS = 20
+SCAN_RUNS = 3
+IP_LOOKUPS = 30
+CDX_PAGES = 10
+CDX_PER_PAGE = 1000
+WAYBACK_RUNS = 3
+CRTSH_DOMAINS = 20
+CRTSH_CERTIFICATES = 500
+
+
+class _OutputCounter:
+    """Поток вместо stdout: вывод команд отбрасывается, ошибки считаются"""
+
+    def __init__(self):
+        self.errors = 0
+        self.first_error = None
+
+    def write(self, text):
+        if '[ERROR]' in text:
+            self.errors += 1
+            if self.first_error is None:
+                self.first_error = text.split('[ERROR]', 1)[1].replace('\033[0m', '').strip()
+        return len(text)
+
+    def flush(self):
+        pass
+
+    def isatty(self):
+        return False
+
+
+def percentile(values, fraction):
+    """Перцентиль по ближайшему рангу"""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, max(0, int(fraction * len(ordered) + 0.5) - 1))]
+
+
+def make_tool(env, refresh=False, **options):
+    """OSINTTool, все внешние адреса которого указывают на заменители"""
+    from osint_cli import OSINTTool
+    from osint_cache import ResponseCache
+    # refresh: каждый вызов заново обращается к сервису, а не к кэшу
+    return OSINTTool(cache=ResponseCache(env['cache'], refresh=refresh), catalog=env['catalog'],
+                     nameserver=env['dns'], geo_url=env['ip-api'], cdx_url=env['cdx'], **options)
+
+
+def scenario_domain(env):
+    tool = make_tool(env)
+    calls = [lambda i=i: tool.domain_info(f"bench-{i}.example") for i in range(DOMAINS)]
+    return 'доменов', DOMAINS, calls
+
+
+def scenario_subdomains(env):
+    tool = make_tool(env)
+    # Словарь подается файлом, как через --wordlist
+    wordlist = os.path.join(env['tmp'], 'wordlist.txt')
+    with open(wordlist, 'w', encoding='utf-8') as f:
+        f.writelines(f"label{i}\n" for i in range(SUBDOMAIN_LABELS))
+    calls = [lambda run=run: tool.subdomain_enumeration(f"run{run}.example", wordlist=wordlist)
+             for run in range(SUBDOMAIN_RUNS)]
+    return 'DNS-запросов', SUBDOMAIN_LABELS * SUBDOMAIN_RUNS, calls
+
+
+def scenario_social(env):
+    tool = make_tool(env, pool_size=32)
+    calls = [lambda i=i: tool.social_media_search(f"user{i}") for i in range(USERNAMES)]
+    return 'проверок', USERNAMES * PLATFORMS, calls
+
+
+def scenario_website(env):
+    tool = make_tool(env)
+    calls = [lambda i=i: tool.website_analysis(f"{env['website']}/page{i}") for i in range(PAGES)]
+    return 'страниц', PAGES, calls
+
+
+def scenario_scan(env):
+    tool = make_tool(env)
+    ports = env['tcp'] + list(range(1, SCAN_CLOSED_PORTS + 1))
+    spec = ','.join(map(str, ports))
+    checkpoint = os.path.join(env['tmp'], 'scan.journal')
+    calls = [lambda: tool.network_scan(SCAN_TARGET, ports=spec, checkpoint=checkpoint)
+             for _ in range(SCAN_RUNS)]
+    return 'проб', SCAN_ADDRESSES * len(ports) * SCAN_RUNS, calls
+
+
+def scenario_ip(env):
+    spec = ','.join(map(str, env['tcp']))
+    # Новый инструмент на вызов, как отдельный запуск CLI: иначе GeoBatcher
+    # отвечает на повторный адрес из памяти. Обратный DNS 127.0.0.1 - из /etc/hosts
+    calls = [lambda: make_tool(env, refresh=True).ip_info('127.0.0.1', ports=spec)
+             for _ in range(IP_LOOKUPS)]
+    return 'адресов', IP_LOOKUPS, calls
+
+
+def scenario_wayback(env):
+    tool = make_tool(env)
+    output = os.path.join(env['tmp'], 'urls.txt')
+    calls = [lambda: tool.wayback_harvest('example.com', output=output, cdx_rate=1000)
+             for _ in range(WAYBACK_RUNS)]
+    return 'URL', CDX_PAGES * CDX_PER_PAGE * WAYBACK_RUNS, calls
+
+
+def scenario_crtsh(env):
+    from osint_advanced import AdvancedOSINT
+    from osint_cache import ResponseCache
+    tool = make_tool(env)
+    advanced = AdvancedOSINT(cache=ResponseCache(env['cache'], refresh=True), session=tool.session)
+    advanced.crtsh_url = env['crt.sh'] + '/'
+    calls = [lambda i=i: advanced.certificate_transparency(f"bench-{i}.example")
+             for i in range(CRTSH_DOMAINS)]
+    return 'доменов', CRTSH_DOMAINS, calls
+
+
+SCENARIOS = {
+    'domain': scenario_domain,
+    'subdomains': scenario_subdomains,
+    'social': scenario_social,
+    'website': scenario_website,
+    'scan': scenario_scan,
+    'ip': scenario_ip,
+    'wayback': scenario_wayback,
+    'crtsh': scenario_crtsh,
+}
+
+
+def run_scenario(name, env):
+    """Дочерний процесс: выполнить сценарий и вернуть измерения"""
+    output = _OutputCounter()
+    with contextlib.redirect_stdout(output):
+        units, count, calls = SCENARIOS[name](env)
+        latencies = []
+        started = time.perf_counter()
+        for call in calls:
+            call_started = time.perf_counter()
+            call()
+            latencies.append(time.perf_counter() - call_started)
+        elapsed = time.perf_counter() - started
+    return {
+        'units': units,
+        'count': count,
+        'calls': len(latencies),
+        'seconds': round(elapsed, 3),
+        'throughput': round(count / elapsed, 1),
+        'latency_ms': {label: round(percentile(latencies, fraction) * 1000, 1)
+                       for label, fraction in (('p50', 0.5), ('p90', 0.9), ('p99', 0.99),
+                                               ('max', 1.0))},
+        # ru_maxrss в Linux - в килобайтах
+        'peak_rss_kb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+        'errors': output.errors,
+        'first_error': output.first_error,
+    }
+
+
+def seed_cache(path):
+    """Кэш с ответами WHOIS: python-whois ходит на порт 43 напрямую, заменителя у него нет"""
+    from osint_cache import ResponseCache
+    cache = ResponseCache(path)
+    for i in range(DOMAINS):
+        domain = f"bench-{i}.example"
+        cache.put('whois', domain, {
+            'domain_name': domain.upper(), 'registrar': 'Fake Registrar, Inc.',
+            'creation_date': '2010-01-01 00:00:00', 'expiration_date': '2030-01-01 00:00:00',
+            'name_servers': [f"ns1.{domain}", f"ns2.{domain}"],
+        })
+    cache.close()
+
+
+def compare(results, baseline, tolerance):
+    """Сравнение с базой; возвращает список регрессий"""
+    if baseline.get('cpus') != os.cpu_count() or baseline.get('python') != platform.python_version():
+        print(f"Внимание: база снята на другой машине (CPU {baseline.get('cpus')}, "
+              f"Python {baseline.get('python')}), сравнение приблизительное")
+    regressions = []
+    for name, result in results.items():
+        old = baseline.get('scenarios', {}).get(name)
+        if not old:
+            continue
+        change = result['throughput'] / old['throughput'] - 1
+        memory = result['peak_rss_kb'] / old['peak_rss_kb'] - 1
+        print(f"{name:<12} пропускная способность {change:+.0%}, память {memory:+.0%}")
+        if change < -tolerance:
+            regressions.append(f"{name}: пропускная способность {change:+.0%}")
+        if memory > tolerance:
+            regressions.append(f"{name}: пиковая память {memory:+.0%}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Офлайн-бенчмарк команд на локальных заменителях')
+    parser.add_argument('--only', nargs='+', choices=sorted(SCENARIOS), help='Только эти сценарии')
+    parser.add_argument('--output', default=DEFAULT_OUTPUT,
+                        help=f'JSON с результатами (по умолчанию {DEFAULT_OUTPUT})')
+    parser.add_argument('--update-baseline', action='store_true',
+                        help='Записать результаты и в benchmarks/baseline.json '
+                             '(снимайте базу на эталонной машине, а не в песочнице)')
+    parser.add_argument('--compare', metavar='FILE', help='Сравнить с сохраненной базой')
+    parser.add_argument('--tolerance', type=float, default=0.2,
+                        help='Допустимое ухудшение при сравнении (по умолчанию 0.2)')
+    parser.add_argument('--dns-latency', type=float, default=0.005, help='Задержка DNS-ответа, с')
+    parser.add_argument('--nxdomain', type=float, default=0.9, help='Доля NXDOMAIN для поддоменов')
+    parser.add_argument('--http-latency', type=float, default=0.005, help='Задержка HTTP-ответа, с')
+    parser.add_argument('--scenario', help=argparse.SUPPRESS)
+    parser.add_argument('--env', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.scenario:
+        print(json.dumps(run_scenario(args.scenario, json.loads(args.env))))
+        return
+
+    # База читается до прогона: --output или --update-baseline могут указывать на тот же файл
+    baseline = None
+    if args.compare:
+        with open(args.compare, encoding='utf-8') as f:
+            baseline = json.load(f)
+
+    tmp = tempfile.mkdtemp(prefix='osint-bench-')
+    latency = args.http_latency
+    try:
+        with contextlib.ExitStack() as stack:
+            dns_server = stack.enter_context(FakeDNSServer(args.dns_latency, args.nxdomain))
+            ip_api = stack.enter_context(FakeIPAPI(latency))
+            crtsh = stack.enter_context(FakeCrtSh(latency, CRTSH_CERTIFICATES))
+            cdx = stack.enter_context(FakeCDX(latency, CDX_PAGES, CDX_PER_PAGE))
+            profiles = stack.enter_context(FakeProfiles(latency))
+            website = stack.enter_context(FakeWebsite(latency, PAGE_SIZE))
+            listeners = stack.enter_context(FakeTCPListeners(count=5))
+
+            catalog = os.path.join(tmp, 'platforms.json')
+            with open(catalog, 'w', encoding='utf-8') as f:
+                json.dump(fake_catalog(profiles.url, PLATFORMS), f)
+            cache = os.path.join(tmp, 'cache.sqlite')
+            seed_cache(cache)
+            env = {'tmp': tmp, 'cache': cache, 'catalog': catalog, 'dns': dns_server.address,
+                   'ip-api': ip_api.url, 'crt.sh': crtsh.url, 'cdx': cdx.url,
+                   'website': website.url, 'tcp': listeners.ports}
+
+            results = {}
+            failed = False
+            for name in args.only or SCENARIOS:
+                child = subprocess.run(
+                    [sys.executable, '-m', 'benchmarks.bench_commands', '--scenario', name,
+                     '--env', json.dumps(env)],
+                    stdout=subprocess.PIPE, text=True)
+                if child.returncode != 0:
+                    print(f"{name:<12} завершился с кодом {child.returncode}")
+                    failed = True
+                    continue
+                result = json.loads(child.stdout.strip().splitlines()[-1])
+                results[name] = result
+                latencies = result['latency_ms']
+                print(f"{name:<12} {result['throughput']:>10.1f} {result['units']}/с  "
+                      f"вызов p50 {latencies['p50']:.1f} мс, p90 {latencies['p90']:.1f} мс, "
+                      f"p99 {latencies['p99']:.1f} мс  память {result['peak_rss_kb'] / 1024:.1f} МБ")
+                if result['errors']:
+                    print(f"{'':<12} ошибок: {result['errors']}, первая: {result['first_error']}")
+                    failed = True
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+
+    report = {
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'cpus': os.cpu_count(),
+        'created': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'settings': {'dns_latency': args.dns_latency, 'nxdomain': args.nxdomain,
+                     'http_latency': args.http_latency},
+        'scenarios': results,
+    }
+    for path in [args.output] + ([DEFAULT_BASELINE] if args.update_baseline else []):
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+            f.write('\n')
+        print(f"Результаты записаны в {path}")
+
+    if baseline:
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print("Регрессии: " + "; ".join(regressions))
+            failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
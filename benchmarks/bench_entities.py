@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк извлечения сущностей: время должно расти линейно с размером страницы,
+для сравнения приводится прежний поиск одним общим выражением на все типы
+Запуск: python -m benchmarks.bench_entities [--sizes 1,2,4,8] [--tolerance 1.5]
+"""
+
+import argparse
+import random
+import re
+import string
+import sys
+import time
+
+from osint_entities import ENTITY_PATTERNS, EntityExtractor, MAX_URL_LENGTH, _SOCIAL_DOMAINS
+
+# Прежняя реализация: одно выражение, альтернативы пробуются в каждой позиции текста
+COMBINED_PATTERN = re.compile(r'''
+    (?P<url>\bhttps?://[^\s<>"'`]{1,%(max_url)d})
+  | (?P<social>(?<![\w./@-])(?:www\.)?(?:%(social)s)/@?[A-Za-z0-9_.-]{2,64})
+  | (?P<email>(?<![\w.%%+-])[A-Za-z0-9._%%+-]{1,64}@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63})*\.[A-Za-z]{2,24}\b)
+  | (?P<ip>(?<![\w.])(?:\d{1,3}\.){3}\d{1,3}(?![\w]|\.\d))
+  | (?P<eth>(?<!\w)0x[a-fA-F0-9]{40}(?!\w))
+  | (?P<bech32>(?<!\w)bc1[02-9ac-hj-np-z]{11,71}(?!\w))
+  | (?P<btc>(?<!\w)[13][1-9A-HJ-NP-Za-km-z]{25,34}(?!\w))
+  | (?P<phone>(?<![\w+.-])(?:\+\d{1,3}[ \t.\-\u00a0]?|\d{1,2}[ \t\-\u00a0]?(?=\())?(?:\(\d{1,5}\)[ \t.\-\u00a0]?)?\d{1,5}(?:[ \t.\-\u00a0]\d{1,5}){0,5}(?![\w]))
+''' % {'max_url': MAX_URL_LENGTH, 'social': _SOCIAL_DOMAINS}, re.VERBOSE)
+
+# Фрагменты обычной страницы
+SAMPLES = [
+    '<p>Contact us at support{n}@example.com or call +1 (415) 555-{n:04d}.</p>\n',
+    '<a href="https://example.com/page/{n}">Page {n}</a> <a href="https://twitter.com/user{n}">tw</a>\n',
+    '<div class="price">{n} руб.</div><span>2024-01-{d:02d}</span> server 10.0.{d}.{d}\n',
+    '<script src="/static/app.{n}.js"></script><!-- build {n} -->\n',
+]
+
+
+def adversarial_block(size):
+    """Вход, на котором регулярные выражения обычно начинают откатываться"""
+    parts = [
+        '9' * 4096,                                  # длинное число
+        'a' * 4096,                                  # длинное слово
+        '@' * 1024,                                  # много @ подряд
+        '1.' * 2048,                                 # похоже на IP/версию
+        '+1 ' * 1024,                                # обрывки телефонов
+        'x@' * 1024,                                 # обрывки email
+        ''.join(random.choices(string.ascii_letters + string.digits, k=4096)),
+    ]
+    block = ' '.join(parts)
+    return (block * (size // len(block) + 1))[:size]
+
+
+def build_page(megabytes):
+    """Синтетическая страница: обычный текст и пятая часть неудобного входа"""
+    target = megabytes * 1024 * 1024
+    chunks = []
+    size = 0
+    n = 0
+    while size < target * 0.8:
+        piece = random.choice(SAMPLES).format(n=n, d=n % 28 + 1)
+        chunks.append(piece)
+        size += len(piece)
+        n += 1
+    chunks.append(adversarial_block(target - size))
+    return ''.join(chunks)
+
+
+def measure(text, pattern=None, repeat=3):
+    """Лучшее время из нескольких прогонов и найденные сущности.
+
+    pattern подменяет поиск сканера (для сравнения с прежним выражением).
+    """
+    extractor = EntityExtractor()
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scanner = extractor.scanner()
+        if pattern is not None:
+            scanner._stream.pattern = pattern
+        scanner.feed(text)
+        scanner.finish()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, scanner.results()
+
+
+def search_time(text, pattern):
+    """Время только поиска кандидатов, без проверки и дедупликации"""
+    started = time.perf_counter()
+    for _ in pattern.finditer(text):
+        pass
+    return time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк извлечения сущностей')
+    parser.add_argument('--sizes', default='1,2,4,8', help='Размеры страниц в МБ через запятую')
+    parser.add_argument('--tolerance', type=float, default=1.5,
+                        help='Допустимый рост времени на 1 МБ между меньшей и большей страницей')
+    args = parser.parse_args()
+
+    random.seed(1)
+    sizes = [int(size) for size in args.sizes.split(',')]
+    per_mb = []
+    mismatch = False
+    # Время в секундах; "прежнее" - одно общее выражение, "поиск" - без проверки кандидатов
+    print(f"{'МБ':>4} {'время':>8} {'МБ/с':>6} {'прежнее':>8} {'поиск':>7} {'прежний поиск':>14}")
+    for megabytes in sizes:
+        page = build_page(megabytes)
+        elapsed, found = measure(page)
+        baseline, expected = measure(page, COMBINED_PATTERN, repeat=1)
+        mismatch = mismatch or found != expected
+        per_mb.append(elapsed / megabytes)
+        print(f"{megabytes:>4} {elapsed:>8.3f} {megabytes / elapsed:>6.2f} {baseline:>8.3f} "
+              f"{search_time(page, ENTITY_PATTERNS):>7.3f} {search_time(page, COMBINED_PATTERN):>14.3f}")
+
+    if mismatch:
+        print("ОШИБКА: сущности отличаются от найденных одним выражением")
+        sys.exit(1)
+    growth = per_mb[-1] / per_mb[0]
+    print(f"Рост времени на 1 МБ: {growth:.2f}x (допустимо {args.tolerance}x)")
+    if growth > args.tolerance:
+        print("ОШИБКА: время извлечения растет быстрее линейного")
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,210 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк определения технологий: поиск сигнатур выражением по префиксному
+дереву и pyahocorasick (если установлен) против прежнего автомата
+Ахо-Корасик с обходом по символам на Python. К базе добавляются тысячи
+синтетических сигнатур: время поиска не должно расти вместе с их числом
+Запуск: python -m benchmarks.bench_fingerprint [--megabytes 5] [--signatures 0,1000,5000,15000]
+"""
+
+import argparse
+import random
+import string
+import sys
+import time
+
+from osint_fingerprint import AhoCorasickMatcher, FingerprintEngine, NeedleMatcher, load_signatures
+
+# Во сколько раз может вырасти время поиска от меньшего числа синтетических
+# сигнатур к большему; у перебора ветвей альтернации рост линейный
+GROWTH_LIMIT = 4.0
+
+# Шаблоны синтетических сигнатур: у настоящих много общих начал
+SYNTHETIC_TEMPLATES = [
+    ('html', '/wp-content/plugins/{}/'),
+    ('scripts', '{}.min.js'),
+    ('html', 'data-{}-id'),
+    ('scripts', 'cdn.{}.io/'),
+    ('html', 'window.{}='),
+    ('html', 'powered by {}'),
+]
+
+# Сколько синтетических сигнатур встречается на странице
+SYNTHETIC_ON_PAGE = 5
+
+# Фрагменты обычной страницы, сигнатуры встречаются редко
+SAMPLES = [
+    '<p class="text-{n}">Lorem ipsum dolor sit amet, consectetur adipiscing elit {n}.</p>\n',
+    '<a href="/catalog/item-{n}.html">Item {n}</a> <span data-id="{n}">new</span>\n',
+    '<div class="row"><div class="col-md-{d}">{n}</div></div>\n',
+    '<img src="/static/img/{n}.png" alt="photo {n}">\n',
+]
+
+# Что встречается на странице несколько раз
+MARKERS = [
+    '<script src="/wp-content/themes/site/jquery.min.js"></script>\n',
+    '<meta name="generator" content="WordPress 6.4">\n',
+    '<div id="__next" data-reactroot="">\n',
+]
+
+
+class PythonAhoCorasick:
+    """Прежняя реализация: автомат Ахо-Корасик, текст обходится по символам"""
+
+    def __init__(self, needles):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+        for index, needle in enumerate(needles):
+            state = 0
+            for ch in needle:
+                next_state = self._goto[state].get(ch)
+                if next_state is None:
+                    next_state = len(self._goto)
+                    self._goto[state][ch] = next_state
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._out.append(())
+                state = next_state
+            self._out[state] += (index,)
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for ch, next_state in self._goto[state].items():
+                queue.append(next_state)
+                fail = self._fail[state]
+                while fail and ch not in self._goto[fail]:
+                    fail = self._fail[fail]
+                target = self._goto[fail].get(ch, 0)
+                self._fail[next_state] = target if target != next_state else 0
+                self._out[next_state] += self._out[self._fail[next_state]]
+
+    def scan(self, text, state=0):
+        goto, fail, out = self._goto, self._fail, self._out
+        root = goto[0]
+        matches = []
+        for position, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0) if state else root.get(ch, 0)
+            if out[state]:
+                for index in out[state]:
+                    matches.append((position, index))
+        return matches, state
+
+
+def synthetic_signatures(count):
+    """count технологий с одной случайной сигнатурой тела"""
+    alphabet = string.ascii_lowercase + string.digits
+    signatures = {}
+    while len(signatures) < count:
+        word = ''.join(random.choice(alphabet) for _ in range(random.randint(5, 14)))
+        place, template = random.choice(SYNTHETIC_TEMPLATES)
+        signatures[f'Synthetic {word}'] = {'cats': ['Synthetic'], place: [template.format(word)]}
+    return signatures
+
+
+def build_page(megabytes, extra_markers=()):
+    target = megabytes * 1024 * 1024
+    markers = MARKERS + list(extra_markers)
+    chunks = []
+    size = 0
+    n = 0
+    while size < target:
+        piece = random.choice(markers) if n % 5000 == 0 else random.choice(SAMPLES)
+        piece = piece.format(n=n, d=n % 12 + 1)
+        chunks.append(piece)
+        size += len(piece)
+        n += 1
+    return ''.join(chunks)
+
+
+def measure(engine, page, chunk, repeat=3):
+    """Лучшее время разбора страницы кусками chunk и найденные технологии"""
+    best = None
+    for _ in range(repeat):
+        started = time.perf_counter()
+        scanner = engine.scanner()
+        scanner.feed_headers({'Server': 'nginx'})
+        for offset in range(0, len(page), chunk):
+            scanner.feed(page[offset:offset + chunk])
+        scanner.finish()
+        elapsed = time.perf_counter() - started
+        best = elapsed if best is None else min(best, elapsed)
+    return best, scanner.result()
+
+
+def matchers():
+    """Проверяемые способы поиска: (название, фабрика по списку подстрок)"""
+    available = [('дерево + re', NeedleMatcher)]
+    try:
+        import ahocorasick
+    except ImportError:
+        print("pyahocorasick не установлен: проверяется только выражение по дереву")
+    else:
+        available.append(('pyahocorasick', lambda needles: AhoCorasickMatcher(needles, ahocorasick)))
+    return available
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк определения технологий')
+    parser.add_argument('--megabytes', type=int, default=5, help='Размер страницы в МБ')
+    parser.add_argument('--chunk', type=int, default=65536, help='Размер куска тела')
+    parser.add_argument('--signatures', default='0,1000,5000,15000',
+                        help='Сколько синтетических сигнатур добавить к базе, через запятую')
+    args = parser.parse_args()
+    sizes = sorted(int(size) for size in args.signatures.split(','))
+
+    random.seed(1)
+    bundled = load_signatures()
+    synthetic = synthetic_signatures(max(sizes))
+    on_page = []
+    for rules in list(synthetic.values())[:SYNTHETIC_ON_PAGE]:
+        needle = (rules.get('html') or rules.get('scripts'))[0]
+        on_page.append(f'<script src="/{needle}"></script>\n' if 'scripts' in rules
+                       else f'<div>{needle}</div>\n')
+    page = build_page(args.megabytes, on_page)
+    methods = matchers()
+
+    print(f"Страница {args.megabytes} МБ, сигнатур в базе: {len(bundled)}")
+    print(f"{'сигнатур':>9} {'способ':<22} {'сборка, с':>10} {'поиск, с':>9} {'МБ/с':>7}")
+    failed = False
+    times = {}
+    for size in sizes:
+        signatures = dict(bundled)
+        signatures.update(list(synthetic.items())[:size])
+        engine = FingerprintEngine(signatures)
+        # Прежний автомат - эталон результатов (пустое начальное состояние - корень)
+        engine.matcher = PythonAhoCorasick(engine.needles)
+        python_time, expected = measure(engine, page, args.chunk, repeat=1)
+        print(f"{len(signatures):>9} {'Ахо-Корасик (Python)':<22} {'':>10} {python_time:>9.3f} "
+              f"{args.megabytes / python_time:>7.1f}")
+        for title, factory in methods:
+            started = time.perf_counter()
+            engine.matcher = factory(engine.needles)
+            build_time = time.perf_counter() - started
+            elapsed, result = measure(engine, page, args.chunk)
+            times.setdefault(title, []).append(elapsed)
+            print(f"{'':>9} {title:<22} {build_time:>10.3f} {elapsed:>9.3f} "
+                  f"{args.megabytes / elapsed:>7.1f}")
+            if result != expected:
+                print(f"ОШИБКА: {title} нашел {', '.join(result)}, эталон - {', '.join(expected)}")
+                failed = True
+    print(f"Технологии: {', '.join(expected)}")
+
+    # Рост времени считается от первого набора с синтетическими сигнатурами:
+    # маленькая встроенная база ищется заметно быстрее любого большого набора
+    first = next((position for position, size in enumerate(sizes) if size), None)
+    if first is not None and first < len(sizes) - 1:
+        for title, elapsed in times.items():
+            growth = elapsed[-1] / elapsed[first]
+            print(f"{title}: рост времени поиска с {sizes[first]} до {sizes[-1]} "
+                  f"синтетических сигнатур - {growth:.1f}x")
+            if growth > GROWTH_LIMIT:
+                print(f"ОШИБКА: время поиска растет с числом сигнатур (предел {GROWTH_LIMIT:.0f}x)")
+                failed = True
+    if failed:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк геолокации: запрос на каждый адрес против пакетного API
+Запуск: python -m benchmarks.bench_geo [--ips 2000] [--latency 0.02]
+"""
+
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FakeIPAPI
+from osint_geo import GeoBatcher
+from osint_http import create_session
+
+
+def make_ips(count, unique):
+    """Список адресов с повторами, как в реальных выгрузках логов"""
+    pool = [f"10.{random.randrange(256)}.{random.randrange(256)}.{random.randrange(1, 255)}"
+            for _ in range(unique)]
+    return [random.choice(pool) for _ in range(count)]
+
+
+def per_ip(url, ips, workers):
+    session = create_session(workers)
+
+    def lookup(ip):
+        return session.get(f"{url}/json/{ip}").json()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(lookup, ips))
+
+
+def batched(url, ips, workers):
+    session = create_session(workers)
+    # Лимит частоты ip-api здесь не нужен: сравнивается число запросов
+    batcher = GeoBatcher(session, base_url=url, rate=1000, burst=1000)
+    futures = [batcher.submit(ip) for ip in ips]
+    results = [future.result() for future in futures]
+    batcher.close()
+    return results, batcher
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк пакетной геолокации')
+    parser.add_argument('--ips', type=int, default=2000, help='Число адресов')
+    parser.add_argument('--unique', type=int, default=1500, help='Число различных адресов')
+    parser.add_argument('--latency', type=float, default=0.02, help='Задержка ответа сервера, с')
+    parser.add_argument('--workers', type=int, default=8, help='Потоков в режиме "запрос на адрес"')
+    args = parser.parse_args()
+
+    random.seed(1)
+    ips = make_ips(args.ips, args.unique)
+
+    with FakeIPAPI(latency=args.latency) as fake:
+        started = time.perf_counter()
+        single = per_ip(fake.url, ips, args.workers)
+        single_time = time.perf_counter() - started
+        single_requests = fake.requests
+
+        fake.requests = 0
+        started = time.perf_counter()
+        batch, batcher = batched(fake.url, ips, args.workers)
+        batch_time = time.perf_counter() - started
+
+    assert [r['country'] for r in single] == [r['country'] for r in batch], "ответы различаются"
+    print(f"{'режим':<16} {'запросов':>9} {'время, с':>9}")
+    print(f"{'запрос на адрес':<16} {single_requests:>9} {single_time:>9.2f}")
+    print(f"{'пакетный':<16} {fake.requests:>9} {batch_time:>9.2f}")
+    print(f"Повторных адресов без запроса: {batcher.deduplicated}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк офлайн-индекса геолокации: сборка, открытие и скорость поиска
+Запуск: python -m benchmarks.bench_geoindex [--ranges 500000] [--lookups 1000000]
+"""
+
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from osint_geo import GeoIndex, build_geo_index
+
+COUNTRIES = ['DE', 'US', 'NL', 'RU', 'JP', 'BR', 'FR', 'GB']
+
+
+def write_ranges(path, count):
+    """CSV с непересекающимися диапазонами, покрывающими часть пространства IPv4"""
+    step = (1 << 32) // (count + 1)
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('start,end,country,asn,org\n')
+        for i in range(count):
+            start = i * step
+            end = start + random.randrange(step // 2, step)
+            asn = 1000 + i % 5000
+            f.write(f"{start},{end},{random.choice(COUNTRIES)},AS{asn},Org {asn}\n")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк офлайн-индекса геолокации')
+    parser.add_argument('--ranges', type=int, default=500000, help='Число диапазонов')
+    parser.add_argument('--lookups', type=int, default=1000000, help='Число поисков')
+    args = parser.parse_args()
+
+    random.seed(1)
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, 'ranges.csv')
+        index_path = os.path.join(tmp, 'ranges.idx')
+        write_ranges(csv_path, args.ranges)
+
+        started = time.perf_counter()
+        build_geo_index(csv_path, index_path)
+        print(f"Сборка: {time.perf_counter() - started:.2f} с, "
+              f"индекс {os.path.getsize(index_path) / 1024 / 1024:.1f} МБ")
+
+        started = time.perf_counter()
+        index = GeoIndex(index_path)
+        print(f"Открытие индекса: {(time.perf_counter() - started) * 1000:.2f} мс")
+
+        numbers = [random.getrandbits(32) for _ in range(args.lookups)]
+        find = index.find
+        started = time.perf_counter()
+        hits = sum(1 for number in numbers if find(number) >= 0)
+        elapsed = time.perf_counter() - started
+        print(f"Поиск по числу: {args.lookups / elapsed / 1e6:.2f} млн адресов/с, попаданий {hits}")
+
+        addresses = [f"{n >> 24}.{n >> 16 & 255}.{n >> 8 & 255}.{n & 255}" for n in numbers[:100000]]
+        started = time.perf_counter()
+        for address in addresses:
+            index.lookup(address)
+        elapsed = time.perf_counter() - started
+        print(f"lookup() со строкой и записью: {len(addresses) / elapsed / 1e3:.0f} тыс. адресов/с")
+        index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк сканирования на loopback: один процесс против нескольких
+Закрытые порты 127.0.0.0/8 отвечают RST сразу, поэтому упор - в CPU.
+Запуск: python -m benchmarks.bench_scan [--targets 127.0.0.0/20] [--ports 1-32]
+"""
+
+import argparse
+import os
+import time
+
+from osint_scan import PortScanner, parse_ports
+from osint_shard import ShardedScanner
+from osint_targets import TargetSet
+
+
+def single(targets, ports, concurrency):
+    scanner = PortScanner(concurrency=concurrency, timeout=1)
+    scanner.scan(iter(TargetSet(targets)), ports)
+
+
+def sharded(targets, ports, concurrency, processes):
+    scanner = ShardedScanner(processes, concurrency=concurrency, timeout=1)
+    scanner.scan(targets, None, ports)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк многопроцессного сканирования')
+    parser.add_argument('--targets', default='127.0.0.0/20', help='Адреса на loopback')
+    parser.add_argument('--ports', default='1-32', help='Порты (закрытые)')
+    parser.add_argument('--concurrency', type=int, default=1000,
+                        help='Одновременных соединений на процесс')
+    parser.add_argument('--processes', type=int, nargs='+',
+                        help='Числа процессов (по умолчанию 2, 4, ... до числа ядер)')
+    args = parser.parse_args()
+
+    ports = parse_ports(args.ports)
+    probes = TargetSet(args.targets).size * len(ports)
+    cores = os.cpu_count() or 1
+    counts = args.processes or [n for n in (2, 4, 8, 16, 32) if n <= cores] or [2]
+    print(f"Проб: {probes}, ядер: {cores}")
+
+    started = time.perf_counter()
+    single(args.targets, ports, args.concurrency)
+    base = time.perf_counter() - started
+    print(f"1 процесс: {base:.2f} с, {probes / base:.0f} проб/с")
+
+    for count in counts:
+        started = time.perf_counter()
+        # Лимит на процесс тот же, что у одиночного сканера
+        sharded(args.targets, ports, args.concurrency * count, count)
+        elapsed = time.perf_counter() - started
+        print(f"{count} процессов: {elapsed:.2f} с, {probes / elapsed:.0f} проб/с, "
+              f"ускорение x{base / elapsed:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Бенчмарк холодного старта: время импортов по -X importtime и время запуска
+Завершается с кодом 1, если импорты превысили бюджет или легкая команда
+загрузила тяжелые модули (requests, whois, dns, asyncio, ...)
+Запуск: python -m benchmarks.bench_startup [--runs 5] [--budget-ms 40]
+"""
+
+import argparse
+import os
+import re
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Модули, которые не должны загружаться при запуске легких команд
+HEAVY_MODULES = ('requests', 'urllib3', 'whois', 'dns', 'asyncio', 'ssl', 'sqlite3',
+                 'concurrent', 'http', 'osint_advanced')
+
+_LINE_RE = re.compile(r'import time:\s+(\d+) \|\s+(\d+) \| (\s*)(\S+)')
+
+
+def import_times(args):
+    """Запуск python -X importtime: {модуль: собственное время, мкс} и время верхних импортов"""
+    result = subprocess.run([sys.executable, '-X', 'importtime', *args], cwd=ROOT,
+                            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+    modules = {}
+    top_level = {}
+    for line in result.stderr.splitlines():
+        match = _LINE_RE.match(line)
+        if match:
+            own, cumulative, indent, name = match.groups()
+            modules[name] = int(own)
+            if not indent:
+                top_level[name] = int(cumulative)
+    return modules, top_level
+
+
+def measure(args, baseline, runs):
+    """Лучшее из runs время импортов сверх голого интерпретатора (мс) и загруженные модули"""
+    best = None
+    loaded = set()
+    for _ in range(runs):
+        modules, top_level = import_times(args)
+        # Импорты самого интерпретатора (site, encodings) не учитываются
+        extra = sum(time for name, time in top_level.items() if name not in baseline)
+        best = extra if best is None else min(best, extra)
+        loaded = set(modules)
+    return best / 1000, loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Бенчмарк холодного старта CLI')
+    parser.add_argument('--runs', type=int, default=5, help='Запусков на сценарий')
+    parser.add_argument('--budget-ms', type=float, default=40.0,
+                        help='Бюджет времени импортов легкой команды в мс (по умолчанию 40)')
+    args = parser.parse_args()
+
+    baseline, _ = import_times(['-c', 'pass'])
+    with tempfile.NamedTemporaryFile('w', suffix='.txt', delete=False) as f:
+        f.write('startup\n')
+    try:
+        # (название, аргументы интерпретатора, бюджет или None, только легкие модули)
+        scenarios = [
+            ('osint_cli.py --help', ['osint_cli.py', '--help'], args.budget_ms, True),
+            ('osint_cli.py metadata', ['osint_cli.py', 'metadata', f.name], args.budget_ms, True),
+            ('import quick_start', ['-c', 'import quick_start'], args.budget_ms, True),
+            ('import osint_cli', ['-c', 'import osint_cli'], args.budget_ms, True),
+            ('import osint_advanced', ['-c', 'import osint_advanced'], None, False),
+        ]
+        failed = False
+        for title, command, budget, light in scenarios:
+            elapsed, loaded = measure(command, baseline, args.runs)
+            heavy = sorted({name.split('.')[0] for name in loaded} & set(HEAVY_MODULES))
+            status = 'ok'
+            if budget is not None and elapsed > budget:
+                status = f"ПРЕВЫШЕН БЮДЖЕТ {budget:.0f} мс"
+                failed = True
+            if light and heavy:
+                status = f"загружены тяжелые модули: {', '.join(heavy)}"
+                failed = True
+            print(f"{title:<24} импорты {elapsed:7.1f} мс  {status}")
+    finally:
+        os.remove(f.name)
+
+    if failed:
+        print("Холодный старт регрессировал")
+        sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,422 @@
+#!/usr/bin/env python3
+"""
+Локальные заменители внешних сервисов для бенчмарков OSINT CLI Helper
+Серверы запускаются в фоновом потоке на 127.0.0.1 и случайном порту:
+ip-api, crt.sh, CDX API, страницы профилей и сайт, DNS по UDP и TCP-порты
+"""
+
+import hashlib
+import heapq
+import json
+import selectors
+import socket
+import sys
+import threading
+import time
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlsplit, parse_qs
+
+import dns.message
+import dns.rcode
+import dns.rdatatype
+import dns.rrset
+
+COUNTRIES = ['Germany', 'United States', 'Netherlands', 'Russia', 'Japan', 'Brazil']
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    """Клиент закрыл соединение, не дочитав ответ (HEAD, stream) - это не ошибка"""
+
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        if not isinstance(sys.exc_info()[1], ConnectionError):
+            super().handle_error(request, client_address)
+
+
+class FakeHTTPServer:
+    """Базовый HTTP-заменитель: счетчик запросов и задержка ответа"""
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._server = None
+
+    def handle(self, handler, method):
+        """Ответ на запрос: (статус, заголовки, тело в байтах)"""
+        raise NotImplementedError
+
+    def _handler_class(self):
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+
+            def _dispatch(self, method):
+                with fake._lock:
+                    fake.requests += 1
+                if fake.latency:
+                    time.sleep(fake.latency)
+                status, headers, body = fake.handle(self, method)
+                self.send_response(status)
+                for name, value in headers.items():
+                    self.send_header(name, value)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                if method != 'HEAD':
+                    self.wfile.write(body)
+
+            def do_GET(self):
+                self._dispatch('GET')
+
+            def do_POST(self):
+                self._dispatch('POST')
+
+            def do_HEAD(self):
+                self._dispatch('HEAD')
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+    def start(self):
+        self._server = _QuietHTTPServer(('127.0.0.1', 0), self._handler_class())
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self.url
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def stop(self):
+        if self._server:
+            self._server.shutdown()
+            self._server.server_close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+def fake_geolocation(ip):
+    """Детерминированный ответ в формате ip-api.com"""
+    digest = hashlib.md5(ip.encode()).digest()
+    return {
+        'status': 'success', 'query': ip,
+        'country': COUNTRIES[digest[0] % len(COUNTRIES)],
+        'city': f"City{digest[1]}", 'regionName': f"Region{digest[2]}",
+        'isp': f"ISP {digest[3]}", 'org': f"Org {digest[4]}", 'as': f"AS{digest[5] * 256 + digest[6]}",
+        'lat': digest[7] - 90, 'lon': digest[8] - 180, 'timezone': 'UTC',
+    }
+
+
+class FakeIPAPI(FakeHTTPServer):
+    """Заменитель ip-api.com: GET /json/<ip> и POST /batch (до 100 адресов)"""
+
+    def __init__(self, latency=0.0, batch_limit=100):
+        super().__init__(latency)
+        self.batch_limit = batch_limit
+        self.batches = 0
+        self.lookups = 0
+
+    def handle(self, handler, method):
+        headers = {'Content-Type': 'application/json', 'X-Rl': '100', 'X-Ttl': '60'}
+        if method == 'GET' and handler.path.startswith('/json/'):
+            ip = handler.path[len('/json/'):].split('?')[0]
+            self.lookups += 1
+            return 200, headers, json.dumps(fake_geolocation(ip)).encode()
+        if method == 'POST' and handler.path.startswith('/batch'):
+            length = int(handler.headers.get('Content-Length', 0))
+            items = json.loads(handler.rfile.read(length) or b'[]')
+            if len(items) > self.batch_limit:
+                return 422, headers, b'{"message": "too many items"}'
+            self.batches += 1
+            self.lookups += len(items)
+            queries = [item['query'] if isinstance(item, dict) else item for item in items]
+            return 200, headers, json.dumps([fake_geolocation(ip) for ip in queries]).encode()
+        return 404, headers, b'{}'
+
+
+def _digest(*parts):
+    return hashlib.md5('|'.join(parts).encode()).digest()
+
+
+def _query(handler):
+    """Путь и параметры запроса"""
+    parts = urlsplit(handler.path)
+    return parts.path, {name: values[-1] for name, values in parse_qs(parts.query).items()}
+
+
+class FakeCrtSh(FakeHTTPServer):
+    """Заменитель crt.sh: GET /?q=%.<домен>&output=json - массив сертификатов"""
+
+    def __init__(self, latency=0.0, certificates=500):
+        super().__init__(latency)
+        self.certificates = certificates
+
+    def handle(self, handler, method):
+        _, params = _query(handler)
+        domain = params.get('q', '').lstrip('%.')
+        certs = [{'id': i, 'issuer_name': 'C=US, O=Fake CA',
+                  'name_value': f"host{i % 200}.{domain}\nwww.host{i % 200}.{domain}"}
+                 for i in range(self.certificates)]
+        return 200, {'Content-Type': 'application/json'}, json.dumps(certs).encode()
+
+
+class FakeCDX(FakeHTTPServer):
+    """Заменитель CDX API Wayback Machine в режиме page"""
+
+    def __init__(self, latency=0.0, pages=10, per_page=1000):
+        super().__init__(latency)
+        self.pages = pages
+        self.per_page = per_page
+
+    def handle(self, handler, method):
+        _, params = _query(handler)
+        domain = params.get('url', '')
+        if params.get('showNumPages') == 'true':
+            return 200, {'Content-Type': 'text/plain'}, str(self.pages).encode()
+        page = int(params.get('page', 0))
+        count = min(self.per_page, int(params.get('limit', self.per_page)))
+        rows = [['original']] + [[f"http://{domain}/page{page}/item{i}.html"]
+                                 for i in range(count)]
+        return 200, {'Content-Type': 'application/json'}, json.dumps(rows).encode()
+
+
+class FakeProfiles(FakeHTTPServer):
+    """Страницы профилей: /<платформа>/<имя>, примерно половина имен существует.
+
+    У существующего профиля в теле есть маркер PROFILE_MARKER, у
+    отсутствующего - статус 404.
+    """
+
+    PROFILE_MARKER = 'data-profile-id'
+
+    def handle(self, handler, method):
+        path, _ = _query(handler)
+        platform, _, username = path.strip('/').partition('/')
+        if _digest(platform, username)[0] % 2:
+            return 404, {'Content-Type': 'text/html'}, b'<html>not found</html>'
+        body = (f'<html><head><title>{username}</title></head><body>'
+                f'<div {self.PROFILE_MARKER}="{username}">{username}</div>'
+                + '<p>lorem ipsum</p>' * 200 + '</body></html>')
+        return 200, {'Content-Type': 'text/html; charset=utf-8'}, body.encode()
+
+
+def fake_catalog(url, platforms=40):
+    """Каталог платформ (формат platforms.json) со страницами на FakeProfiles"""
+    probes = ['head', 'get', 'body']
+    entries = []
+    for i in range(platforms):
+        probe = probes[i % len(probes)]
+        entry = {'name': f"Platform{i}", 'url': f"{url}/platform{i}/{{username}}",
+                 'group': 'basic', 'probe': probe}
+        if probe == 'body':
+            entry['marker'] = FakeProfiles.PROFILE_MARKER
+        entries.append(entry)
+    return {'platforms': entries}
+
+
+class FakeWebsite(FakeHTTPServer):
+    """Сайт: HTML-страница заданного размера с признаками технологий и сущностями"""
+
+    def __init__(self, latency=0.0, size=256 * 1024):
+        super().__init__(latency)
+        head = ('<html><head><meta name="generator" content="WordPress 6.4">'
+                '<link rel="stylesheet" href="/wp-content/themes/x/bootstrap.min.css">'
+                '<script src="/wp-includes/js/jquery/jquery.min.js"></script></head><body>')
+        block = ('<p>Contact: admin{0}@example.com, +1 202 555 0{0:03d}, '
+                 '<a href="https://twitter.com/user{0}">twitter</a>, server 10.0.{1}.{2}</p>')
+        parts = [head]
+        length = len(head)
+        i = 0
+        while length < size:
+            part = block.format(i % 1000, i % 256, i % 250 + 1)
+            parts.append(part)
+            length += len(part)
+            i += 1
+        parts.append('</body></html>')
+        self.body = ''.join(parts).encode()
+
+    def handle(self, handler, method):
+        headers = {'Content-Type': 'text/html; charset=utf-8', 'Server': 'nginx',
+                   'X-Powered-By': 'PHP/8.2', 'Set-Cookie': 'PHPSESSID=fake; path=/'}
+        return 200, headers, self.body
+
+
+class FakeDNSServer:
+    """DNS-заменитель по UDP: A, MX и TXT по хэшу имени.
+
+    Имена из двух меток (зарегистрированные домены) существуют всегда,
+    для поддоменов доля NXDOMAIN задается nxdomain_ratio. Ответы
+    отправляются отдельным потоком через latency секунд после запроса.
+    """
+
+    def __init__(self, latency=0.0, nxdomain_ratio=0.9):
+        self.latency = latency
+        self.nxdomain_ratio = nxdomain_ratio
+        self.queries = 0
+        self.nxdomains = 0
+        self._socket = None
+        self._pending = []
+        self._sequence = 0
+        self._ready = threading.Condition()
+        self._stopped = False
+
+    def exists(self, name):
+        labels = name.rstrip('.').split('.')
+        if len(labels) <= 2:
+            return True
+        return _digest(name.lower())[0] / 256 >= self.nxdomain_ratio
+
+    def answer(self, wire):
+        """Ответ на запрос в формате DNS"""
+        query = dns.message.from_wire(wire)
+        response = dns.message.make_response(query)
+        question = query.question[0]
+        name = question.name.to_text()
+        if not self.exists(name):
+            self.nxdomains += 1
+            response.set_rcode(dns.rcode.NXDOMAIN)
+            return response.to_wire()
+        digest = _digest(name.lower())
+        if question.rdtype == dns.rdatatype.A:
+            data = [f"10.{digest[1]}.{digest[2]}.{digest[3] or 1}"]
+        elif question.rdtype == dns.rdatatype.MX:
+            data = [f"10 mx1.{name}", f"20 mx2.{name}"]
+        elif question.rdtype == dns.rdatatype.TXT:
+            data = ['"v=spf1 -all"', f'"verification={digest.hex()}"']
+        else:
+            data = []
+        if data:
+            response.answer.append(dns.rrset.from_text_list(question.name, 300, 'IN',
+                                                            question.rdtype, data))
+        return response.to_wire()
+
+    def _receive(self):
+        while not self._stopped:
+            try:
+                wire, address = self._socket.recvfrom(4096)
+            except OSError:
+                return
+            self.queries += 1
+            try:
+                response = self.answer(wire)
+            except Exception:
+                continue
+            with self._ready:
+                self._sequence += 1
+                heapq.heappush(self._pending, (time.monotonic() + self.latency, self._sequence,
+                                               response, address))
+                self._ready.notify()
+
+    def _send(self):
+        with self._ready:
+            while not self._stopped:
+                if not self._pending:
+                    self._ready.wait()
+                    continue
+                delay = self._pending[0][0] - time.monotonic()
+                if delay > 0:
+                    self._ready.wait(delay)
+                    continue
+                _, _, response, address = heapq.heappop(self._pending)
+                try:
+                    self._socket.sendto(response, address)
+                except OSError:
+                    pass
+
+    def start(self):
+        self._socket = socket.socket(socket.AF_INET, socket.SOCK_DGRAM)
+        self._socket.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, 4 * 1024 * 1024)
+        self._socket.bind(('127.0.0.1', 0))
+        threading.Thread(target=self._receive, daemon=True).start()
+        threading.Thread(target=self._send, daemon=True).start()
+        return self.address
+
+    @property
+    def address(self):
+        """Адрес для --nameserver: IP:PORT"""
+        host, port = self._socket.getsockname()
+        return f"{host}:{port}"
+
+    def stop(self):
+        with self._ready:
+            self._stopped = True
+            self._ready.notify()
+        if self._socket:
+            self._socket.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
+
+
+class FakeTCPListeners:
+    """Открытые TCP-порты на 127.0.0.1: соединения принимаются и закрываются.
+
+    ports - номера портов; если не заданы, занимается count свободных.
+    banner - байты, которые отправляются после подключения.
+    """
+
+    def __init__(self, ports=None, count=5, banner=None):
+        self.requested = list(ports) if ports else [0] * count
+        self.banner = banner
+        self.ports = []
+        self.accepted = 0
+        self._sockets = []
+        self._selector = selectors.DefaultSelector()
+        self._thread = None
+        self._stopped = False
+
+    def _serve(self):
+        while not self._stopped:
+            for key, _ in self._selector.select(timeout=0.5):
+                try:
+                    connection, _ = key.fileobj.accept()
+                except OSError:
+                    continue
+                self.accepted += 1
+                try:
+                    if self.banner:
+                        connection.sendall(self.banner)
+                finally:
+                    connection.close()
+
+    def start(self):
+        for port in self.requested:
+            listener = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+            listener.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+            listener.bind(('127.0.0.1', port))
+            listener.listen(1024)
+            listener.setblocking(False)
+            self._selector.register(listener, selectors.EVENT_READ)
+            self._sockets.append(listener)
+            self.ports.append(listener.getsockname()[1])
+        self._thread = threading.Thread(target=self._serve, daemon=True)
+        self._thread.start()
+        return self.ports
+
+    def stop(self):
+        self._stopped = True
+        if self._thread:
+            self._thread.join()
+        for listener in self._sockets:
+            self._selector.unregister(listener)
+            listener.close()
+
+    def __enter__(self):
+        self.start()
+        return self
+
+    def __exit__(self, *exc):
+        self.stop()
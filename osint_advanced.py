@@ -4,25 +4,54 @@
 Дополнительные возможности для углубленного анализа
 """
 
-import requests
-import json
-import re
 import time
-import hashlib
-import base64
-import socket
-import ipaddress
-from urllib.parse import urljoin, urlparse
-import threading
-from concurrent.futures import ThreadPoolExecutor
-import os
+from osint_cache import get_default_cache
+from osint_http import create_session
+from osint_metrics import count, traced
+from osint_stream import iter_text, iter_json_array
+from osint_wayback import CDXHarvester, SAMPLE_LIMIT
+from osint_social import ProfileScheduler, load_catalog, select_platforms, split_usernames
+
+# API crt.sh и формат записи в кэше (список нормализованных имен)
+CRT_SH_URL = "https://crt.sh/"
+CRT_SH_CACHE = {'format': 'names'}
+
+# Формат записи Wayback в кэше (уникальные URL одного запроса CDX)
+WAYBACK_CACHE = {'format': 'urls', 'limit': SAMPLE_LIMIT}
+
+
+def normalize_hostname(name):
+    """Имя из сертификата в нижнем регистре без '*.', None для email и мусора"""
+    name = name.strip().lower().rstrip('.')
+    while name.startswith('*.'):
+        name = name[2:]
+    if not name or '@' in name or ' ' in name:
+        return None
+    return name
+
+# Команды демона и соответствующие методы AdvancedOSINT
+ADVANCED_COMMANDS = {
+    'shodan': 'shodan_search',
+    'archive': 'wayback_machine',
+    'dorks': 'google_dorks',
+    'certs': 'certificate_transparency',
+    'threats': 'threat_intelligence',
+    'social-advanced': 'social_media_advanced',
+    'breach-advanced': 'email_breach_check_advanced',
+    'reputation': 'domain_reputation',
+    'netscan': 'network_scan',
+}
 
 class AdvancedOSINT:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    def __init__(self, cache=None, catalog=None, session=None):
+        # Общий транспорт: пул соединений, таймауты и повторы по умолчанию
+        self.session = session or create_session()
+        self.crtsh_url = CRT_SH_URL
+        # Кэш ответов Shodan, Wayback и crt.sh на диске
+        self.cache = cache or get_default_cache()
+        # Каталог платформ и планировщик проверок с лимитом частоты на платформу
+        self.catalog = load_catalog(catalog)
+        self.profiles = ProfileScheduler(self.session)
         
     def print_section(self, title):
         """Вывод заголовка секции"""
@@ -38,12 +67,42 @@ class AdvancedOSINT:
     
     def print_error(self, message):
         """Вывод ошибки"""
+        count('errors')
         print(f"\033[91m[ERROR]\033[0m {message}")
     
     def print_warning(self, message):
         """Вывод предупреждения"""
         print(f"\033[93m[WARNING]\033[0m {message}")
 
+    def _load_json(self, url):
+        """GET-запрос с разбором JSON, None при неуспешном статусе"""
+        response = self.session.get(url)
+        if response.status_code == 200:
+            return response.json()
+        return None
+
+    def _load_shodan(self, query, api_key):
+        """Запрос к Shodan API"""
+        return self._load_json(f"https://api.shodan.io/shodan/host/search?key={api_key}&query={query}")
+
+    def _iter_certificate_names(self, domain, counters):
+        """Потоковый запрос к crt.sh: уникальные имена по мере разбора ответа"""
+        response = self.session.get(self.crtsh_url, params={'q': f"%.{domain}", 'output': 'json'},
+                                    stream=True)
+        if response.status_code != 200:
+            response.close()
+            raise ValueError(f"crt.sh вернул статус {response.status_code}")
+        seen = set()
+        # Сертификаты разбираются по одному, весь ответ в памяти не держится
+        for cert in iter_json_array(iter_text(response)):
+            counters['certificates'] += 1
+            for name in cert.get('name_value', '').split('\n'):
+                name = normalize_hostname(name)
+                if name and name not in seen:
+                    seen.add(name)
+                    yield name
+
+    @traced()
     def shodan_search(self, query, api_key=None):
         """Поиск через Shodan API"""
         self.print_section("ПОИСК ЧЕРЕЗ SHODAN")
@@ -54,11 +113,9 @@ class AdvancedOSINT:
             return
         
         try:
-            url = f"https://api.shodan.io/shodan/host/search?key={api_key}&query={query}"
-            response = self.session.get(url)
+            data = self.cache.fetch('shodan', query, lambda: self._load_shodan(query, api_key))
             
-            if response.status_code == 200:
-                data = response.json()
+            if data is not None:
                 total = data.get('total', 0)
                 self.print_result("Найдено результатов", total)
                 
@@ -66,42 +123,38 @@ class AdvancedOSINT:
                     ip = result.get('ip_str', 'N/A')
                     port = result.get('port', 'N/A')
                     product = result.get('product', 'N/A')
-                    self.print_result(f"IP:Port", f"{ip}:{port} ({product})")
+                    self.print_result("IP:Port", f"{ip}:{port} ({product})")
             else:
                 self.print_error("Ошибка при поиске в Shodan")
                 
         except Exception as e:
             self.print_error(f"Ошибка: {e}")
 
+    @traced()
     def wayback_machine(self, domain):
         """Поиск в Wayback Machine"""
         self.print_section("ПОИСК В WAYBACK MACHINE")
         
         try:
-            url = f"http://web.archive.org/cdx/search/cdx?url={domain}&output=json&fl=original&collapse=urlkey"
-            response = self.session.get(url)
+            # Один запрос с лимитом; все страницы CDX выгружает команда wayback
+            harvester = CDXHarvester(self.session)
+            urls = self.cache.fetch('wayback', domain, lambda: harvester.sample(domain),
+                                    WAYBACK_CACHE)
             
-            if response.status_code == 200:
-                data = response.json()
-                if len(data) > 1:  # Первая строка - заголовки
-                    self.print_result("Найдено архивных версий", len(data) - 1)
-                    
-                    # Показываем первые 10 уникальных URL
-                    unique_urls = set()
-                    for row in data[1:11]:  # Пропускаем заголовок
-                        if row:
-                            unique_urls.add(row[0])
-                    
-                    for url in list(unique_urls)[:5]:
-                        self.print_result("Архивный URL", url)
-                else:
-                    self.print_info("Архивные версии не найдены")
+            if urls:
+                self.print_result("Уникальных архивных URL", len(urls))
+                for url in urls[:5]:
+                    self.print_result("Архивный URL", url)
+                if len(urls) >= SAMPLE_LIMIT:
+                    self.print_info(f"Показаны первые {SAMPLE_LIMIT} URL, полная выгрузка: "
+                                    f"wayback {domain} --output urls.txt")
             else:
-                self.print_error("Ошибка при поиске в Wayback Machine")
+                self.print_info("Архивные версии не найдены")
                 
         except Exception as e:
             self.print_error(f"Ошибка: {e}")
 
+    @traced()
     def google_dorks(self, domain):
         """Генерация Google Dorks"""
         self.print_section("GOOGLE DORKS")
@@ -130,44 +183,35 @@ class AdvancedOSINT:
         
         self.print_info(f"\nВсего сгенерировано: {len(dorks)} dorks")
 
+    @traced()
     def certificate_transparency(self, domain):
         """Поиск в Certificate Transparency logs"""
         self.print_section("CERTIFICATE TRANSPARENCY")
         
         try:
-            # Используем crt.sh API
-            url = f"https://crt.sh/?q=%.{domain}&output=json"
-            response = self.session.get(url)
+            # Используем crt.sh API, имена выводятся по мере разбора ответа
+            counters = {'certificates': 0}
+            names = self.cache.stream('crt.sh', domain,
+                                      lambda: self._iter_certificate_names(domain, counters),
+                                      CRT_SH_CACHE)
+            total = 0
+            for domain_name in names:
+                total += 1
+                # Показываем первые 10
+                if total <= 10:
+                    self.print_result("Домен", domain_name)
             
-            if response.status_code == 200:
-                data = response.json()
-                if data:
-                    self.print_result("Найдено сертификатов", len(data))
-                    
-                    # Показываем уникальные домены
-                    unique_domains = set()
-                    for cert in data:
-                        name_value = cert.get('name_value', '')
-                        if name_value:
-                            # Разбиваем на отдельные домены
-                            domains = name_value.split('\n')
-                            for domain_name in domains:
-                                if domain_name.strip():
-                                    unique_domains.add(domain_name.strip())
-                    
-                    self.print_result("Уникальных доменов", len(unique_domains))
-                    
-                    # Показываем первые 10
-                    for domain_name in list(unique_domains)[:10]:
-                        self.print_result("Домен", domain_name)
-                else:
-                    self.print_info("Сертификаты не найдены")
+            if total:
+                if counters['certificates']:
+                    self.print_result("Найдено сертификатов", counters['certificates'])
+                self.print_result("Уникальных доменов", total)
             else:
-                self.print_error("Ошибка при поиске сертификатов")
+                self.print_info("Сертификаты не найдены")
                 
         except Exception as e:
             self.print_error(f"Ошибка: {e}")
 
+    @traced()
     def threat_intelligence(self, target):
         """Проверка в базах данных угроз"""
         self.print_section("АНАЛИЗ УГРОЗ")
@@ -198,57 +242,24 @@ class AdvancedOSINT:
         except Exception as e:
             self.print_error(f"Ошибка: {e}")
 
+    @traced()
     def social_media_advanced(self, username):
-        """Расширенный поиск в социальных сетях"""
+        """Расширенный поиск в социальных сетях (несколько имен - через запятую)"""
         self.print_section("РАСШИРЕННЫЙ ПОИСК В СОЦСЕТЯХ")
         
-        # Дополнительные платформы
-        platforms = {
-            'Snapchat': f'https://snapchat.com/add/{username}',
-            'Pinterest': f'https://pinterest.com/{username}',
-            'Tumblr': f'https://{username}.tumblr.com',
-            'Medium': f'https://medium.com/@{username}',
-            'DeviantArt': f'https://deviantart.com/{username}',
-            'Steam': f'https://steamcommunity.com/id/{username}',
-            'Twitch': f'https://twitch.tv/{username}',
-            'Discord': f'https://discord.com/users/{username}',
-            'Slack': f'https://{username}.slack.com',
-            'Stack Overflow': f'https://stackoverflow.com/users/{username}',
-            'Behance': f'https://behance.net/{username}',
-            'Dribbble': f'https://dribbble.com/{username}',
-            'Flickr': f'https://flickr.com/photos/{username}',
-            '500px': f'https://500px.com/{username}',
-            'SoundCloud': f'https://soundcloud.com/{username}',
-            'Spotify': f'https://open.spotify.com/user/{username}',
-            'Last.fm': f'https://last.fm/user/{username}',
-            'Goodreads': f'https://goodreads.com/user/show/{username}',
-            'Letterboxd': f'https://letterboxd.com/{username}'
-        }
-        
+        several = len(split_usernames(username)) > 1
         found_profiles = []
         
-        def check_profile(platform, url):
-            try:
-                response = self.session.get(url, timeout=5)
-                if response.status_code == 200:
-                    return platform, url
-                return None
-            except:
-                return None
-        
-        with ThreadPoolExecutor(max_workers=10) as executor:
-            futures = [executor.submit(check_profile, platform, url) 
-                      for platform, url in platforms.items()]
-            
-            for future in futures:
-                result = future.result()
-                if result:
-                    platform, url = result
-                    found_profiles.append((platform, url))
-                    self.print_result(platform, url)
+        # Дополнительные платформы
+        platforms = select_platforms(self.catalog, 'extra')
+        for name, platform, url, found in self.profiles.check(username, platforms):
+            if found:
+                found_profiles.append((platform, url))
+                self.print_result(f"{platform} ({name})" if several else platform, url)
         
         self.print_result("Всего найдено профилей", len(found_profiles))
 
+    @traced()
     def email_breach_check_advanced(self, email):
         """Расширенная проверка утечек"""
         self.print_section("РАСШИРЕННАЯ ПРОВЕРКА УТЕЧЕК")
@@ -272,6 +283,7 @@ class AdvancedOSINT:
         self.print_info(f"\nEmail для проверки: {email}")
         self.print_info("Для полной проверки используйте специализированные инструменты")
 
+    @traced()
     def domain_reputation(self, domain):
         """Проверка репутации домена"""
         self.print_section("ПРОВЕРКА РЕПУТАЦИИ ДОМЕНА")
@@ -292,83 +304,15 @@ class AdvancedOSINT:
         except Exception as e:
             self.print_error(f"Ошибка: {e}")
 
-    def network_scan(self, target):
-        """Сканирование сети"""
-        self.print_section("СКАНИРОВАНИЕ СЕТИ")
-        
-        try:
-            # Определяем диапазон IP
-            if '/' in target:
-                # CIDR нотация
-                network = ipaddress.ip_network(target, strict=False)
-                ips = list(network.hosts())
-            else:
-                # Одиночный IP
-                ips = [target]
-            
-            self.print_result("Целей для сканирования", len(ips))
-            self.print_info("Начинаю сканирование...")
-            
-            # Сканируем популярные порты
-            common_ports = [21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995, 3306, 3389, 5432, 8080]
-            
-            # Словарь с названиями портов
-            port_names = {
-                21: "FTP", 22: "SSH", 23: "Telnet", 25: "SMTP", 53: "DNS",
-                80: "HTTP", 110: "POP3", 143: "IMAP", 443: "HTTPS", 
-                993: "IMAPS", 995: "POP3S", 3306: "MySQL", 3389: "RDP", 
-                5432: "PostgreSQL", 8080: "HTTP-Proxy"
-            }
-            
-            def scan_host(ip):
-                open_ports = []
-                self.print_info(f"Сканирую {ip}...")
-                
-                for port in common_ports:
-                    try:
-                        sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                        sock.settimeout(2)  # Увеличиваем таймаут
-                        result = sock.connect_ex((str(ip), port))
-                        sock.close()
-                        if result == 0:
-                            port_name = port_names.get(port, f"Port {port}")
-                            open_ports.append((port, port_name))
-                    except Exception as e:
-                        continue
-                
-                return str(ip), open_ports
-            
-            # Сканируем последовательно для лучшего контроля
-            results = []
-            for ip in ips:
-                ip_str, ports = scan_host(ip)
-                results.append((ip_str, ports))
-            
-            # Выводим результаты
-            found_hosts = 0
-            for ip, ports in results:
-                if ports:
-                    found_hosts += 1
-                    self.print_result(f"IP {ip}", f"Найдено открытых портов: {len(ports)}")
-                    for port, name in ports:
-                        self.print_result(f"  Порт {port}", f"{name}")
-                else:
-                    self.print_result(f"IP {ip}", "Открытых портов не найдено")
-            
-            self.print_result("Активных хостов", found_hosts)
-            
-            if found_hosts == 0:
-                self.print_warning("Активных хостов не найдено. Возможные причины:")
-                self.print_warning("- Все порты закрыты")
-                self.print_warning("- Брандмауэр блокирует соединения")
-                self.print_warning("- Слишком короткий таймаут")
-                self.print_info("Попробуйте увеличить таймаут или проверить настройки сети")
-                        
-        except Exception as e:
-            self.print_error(f"Ошибка: {e}")
-            self.print_info("Убедитесь, что введен корректный IP-адрес или диапазон")
-            self.print_info("Примеры: 127.0.0.1, 192.168.1.0/24")
+    def network_scan(self, target, **options):
+        """Сканирование сети: то же, что команда scan (журнал, --resume, процессы).
+
+        Параметры - как у OSINTTool.network_scan.
+        """
+        from osint_cli import OSINTTool
+        OSINTTool().network_scan(target, **options)
 
+    @traced()
     def generate_report(self, target, results):
         """Генерация отчета"""
         self.print_section("ГЕНЕРАЦИЯ ОТЧЕТА")
@@ -0,0 +1,217 @@
+#!/usr/bin/env python3
+"""
+Кэш ответов внешних источников для OSINT CLI Helper
+SQLite-хранилище со сроком жизни по источнику, сжатием и LRU-вытеснением
+"""
+
+import hashlib
+import json
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+from osint_metrics import count
+
+# Срок жизни записей по источникам (секунды)
+DEFAULT_TTLS = {
+    'whois': 7 * 24 * 3600,
+    'ip-api': 24 * 3600,
+    'crt.sh': 24 * 3600,
+    'wayback': 3 * 24 * 3600,
+    'shodan': 12 * 3600,
+}
+
+# Срок жизни для источников, которых нет в таблице
+FALLBACK_TTL = 24 * 3600
+
+# Предельный размер сжатых данных в кэше
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+# Через сколько записей удаляются устаревшие строки, даже если лимит не превышен
+SWEEP_INTERVAL = 1000
+
+
+def default_cache_path():
+    """Путь к файлу кэша: OSINT_CACHE_PATH или ~/.cache/osint_cli/responses.sqlite3"""
+    path = os.environ.get('OSINT_CACHE_PATH')
+    if path:
+        return path
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'osint_cli', 'responses.sqlite3')
+
+
+def normalize_target(target):
+    """Нормализация цели для ключа кэша"""
+    return str(target).strip().lower().rstrip('.')
+
+
+class CacheMiss(Exception):
+    """Нет данных в кэше в режиме --cache-only"""
+
+
+class ResponseCache:
+    """Кэш ответов с ключом (источник, цель, параметры)"""
+
+    def __init__(self, path=None, ttls=None, max_bytes=DEFAULT_MAX_BYTES,
+                 cache_only=False, refresh=False):
+        self.path = path or default_cache_path()
+        self.ttls = dict(DEFAULT_TTLS, **(ttls or {}))
+        self.max_bytes = max_bytes
+        self.cache_only = cache_only
+        self.refresh = refresh
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(self.path, check_same_thread=False, isolation_level=None)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                source TEXT NOT NULL,
+                expires REAL NOT NULL,
+                accessed REAL NOT NULL,
+                size INTEGER NOT NULL,
+                payload BLOB NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        # Размер данных считается один раз при открытии и дальше ведется в put/_evict
+        self._bytes = self._total_bytes()
+        self._puts = 0
+
+    def _total_bytes(self):
+        return self._db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+
+    @staticmethod
+    def make_key(source, target, params=None):
+        """Ключ записи: хэш от источника, нормализованной цели и параметров"""
+        raw = json.dumps([source, normalize_target(target), params or {}],
+                         sort_keys=True, default=str)
+        return hashlib.sha256(raw.encode('utf-8')).hexdigest()
+
+    def get(self, source, target, params=None):
+        """Значение из кэша или None, если записи нет или она устарела"""
+        key = self.make_key(source, target, params)
+        now = time.time()
+        with self._lock:
+            row = self._db.execute(
+                "SELECT payload, expires FROM responses WHERE key = ?", (key,)).fetchone()
+            if row is None or row[1] <= now:
+                return None
+            self._db.execute("UPDATE responses SET accessed = ? WHERE key = ?", (now, key))
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def put(self, source, target, value, params=None):
+        """Сохранение значения (JSON-совместимого) в кэш"""
+        key = self.make_key(source, target, params)
+        payload = zlib.compress(json.dumps(value, default=str).encode('utf-8'), 6)
+        now = time.time()
+        expires = now + self.ttls.get(source, FALLBACK_TTL)
+        with self._lock:
+            old = self._db.execute("SELECT size FROM responses WHERE key = ?", (key,)).fetchone()
+            self._db.execute(
+                "INSERT OR REPLACE INTO responses (key, source, expires, accessed, size, payload) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, source, expires, now, len(payload), sqlite3.Binary(payload)))
+            self._bytes += len(payload) - (old[0] if old else 0)
+            self._puts += 1
+            if self._bytes > self.max_bytes or self._puts >= SWEEP_INTERVAL:
+                self._evict()
+
+    def _evict(self):
+        """Удаление устаревших записей и LRU-вытеснение сверх лимита размера.
+
+        Вызывается, только когда счетчик размера превысил лимит или
+        накопилось SWEEP_INTERVAL записей; заодно счетчик сверяется с базой
+        (в тот же файл могут писать другие процессы).
+        """
+        self._puts = 0
+        self._db.execute("DELETE FROM responses WHERE expires <= ?", (time.time(),))
+        total = self._bytes = self._total_bytes()
+        if total <= self.max_bytes:
+            return
+        excess = total - self.max_bytes
+        freed = 0
+        victims = []
+        for key, size in self._db.execute("SELECT key, size FROM responses ORDER BY accessed"):
+            victims.append((key,))
+            freed += size
+            if freed >= excess:
+                break
+        self._db.executemany("DELETE FROM responses WHERE key = ?", victims)
+        self._bytes -= freed
+
+    def fetch(self, source, target, loader, params=None):
+        """Значение из кэша, иначе loader() с сохранением результата.
+
+        В режиме refresh кэш не читается, в режиме cache_only сеть не используется.
+        """
+        if not self.refresh:
+            value = self.get(source, target, params)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                count('cache.hits')
+                return value
+        with self._lock:
+            self.misses += 1
+        count('cache.misses')
+        if self.cache_only:
+            raise CacheMiss(f"нет данных в кэше для {source}:{target}")
+        value = loader()
+        if value is not None:
+            self.put(source, target, value, params)
+        return value
+
+    def stream(self, source, target, loader, params=None):
+        """Потоковый вариант fetch: loader() - генератор элементов списка.
+
+        Элементы отдаются по мере получения, список сохраняется в кэш
+        только после того, как генератор исчерпан полностью.
+        """
+        if not self.refresh:
+            value = self.get(source, target, params)
+            if value is not None:
+                with self._lock:
+                    self.hits += 1
+                count('cache.hits')
+                yield from value
+                return
+        with self._lock:
+            self.misses += 1
+        count('cache.misses')
+        if self.cache_only:
+            raise CacheMiss(f"нет данных в кэше для {source}:{target}")
+        items = []
+        for item in loader():
+            items.append(item)
+            yield item
+        self.put(source, target, items, params)
+
+    def stats(self):
+        """Счетчики и размер кэша"""
+        with self._lock:
+            entries, size = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM responses").fetchone()
+        return {'hits': self.hits, 'misses': self.misses, 'entries': entries, 'bytes': size}
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+_default_cache = None
+_default_lock = threading.Lock()
+
+
+def get_default_cache():
+    """Общий для процесса кэш с настройками по умолчанию"""
+    global _default_cache
+    with _default_lock:
+        if _default_cache is None:
+            _default_cache = ResponseCache()
+        return _default_cache
@@ -5,22 +5,22 @@
 Автор: NKR_Proger///Tigran Avanesyan
 """
 
+# Здесь только легкие модули: requests, whois, dns.resolver, asyncio и
+# остальные osint_* импортируются командами, которым они нужны
 import argparse
-import requests
-import json
-import re
-import socket
-import whois
-import dns.resolver
-import subprocess
 import sys
 import os
-from datetime import datetime
-from urllib.parse import urlparse
 import time
 import threading
-from concurrent.futures import ThreadPoolExecutor
-import ipaddress
+import signal
+import io
+from collections import deque
+from datetime import datetime
+from osint_metrics import FORMATS, Profiler, count, enable as enable_metrics, traced
+from osint_stream import DEFAULT_MAX_BYTES, DEFAULT_MAX_TIME
+
+# Очистка экрана и прокрутки терминала без запуска cls/clear
+CLEAR_SCREEN = "\033[H\033[2J\033[3J"
 
 # Цвета ANSI
 GREEN = "\033[38;2;0;255;0m"
@@ -40,16 +40,160 @@ class Colors:
     BOLD = '\033[1m'
     UNDERLINE = '\033[4m'
 
+# Заголовки вывода найденных на странице сущностей
+ENTITY_TITLES = (
+    ('email', "Найденные email"),
+    ('phone', "Найденные телефоны"),
+    ('url', "Найденные ссылки"),
+    ('ip', "Найденные IP"),
+    ('social', "Найденные профили соцсетей"),
+    ('crypto', "Найденные криптоадреса"),
+)
+
+def clear_screen():
+    """Очистка экрана escape-последовательностью (только в терминале)"""
+    if sys.stdout.isatty():
+        sys.stdout.write(CLEAR_SCREEN)
+        sys.stdout.flush()
+
+# Поля WHOIS, которые выводятся и сохраняются в кэш
+WHOIS_FIELDS = ('domain_name', 'registrar', 'creation_date', 'expiration_date', 'name_servers')
+
 class OSINTTool:
-    def __init__(self):
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
-        })
+    """Команды OSINT.
+
+    Сессия, кэши, каталоги и базы сигнатур создаются при первом
+    обращении: команда, которой они не нужны, не платит за их загрузку.
+    timeout, retries, geo_url и cdx_url по умолчанию (None) - значения модулей;
+    cache - ResponseCache или функция, которая создаст его при первом обращении;
+    nameserver - DNS-сервер вида IP[:PORT] вместо системного.
+    """
+
+    def __init__(self, pool_size=10, cache=None, catalog=None, signatures=None,
+                 timeout=None, retries=None, geo_url=None, geo_db=None, nameserver=None,
+                 cdx_url=None):
+        self._pool_size = pool_size
+        self._cache = cache
+        self._catalog_path = catalog
+        self._signatures_path = signatures
+        self._timeout = timeout
+        self._retries = retries
+        self._geo_url = geo_url
+        self._geo_db = geo_db
+        self._nameserver = nameserver
+        self._cdx_url = cdx_url
+        self._lazy_lock = threading.RLock()
+        self._lazy_values = {}
+
+    def _lazy(self, name, factory):
+        """Значение, созданное factory() при первом обращении (потокобезопасно)"""
+        try:
+            return self._lazy_values[name]
+        except KeyError:
+            pass
+        with self._lazy_lock:
+            if name not in self._lazy_values:
+                self._lazy_values[name] = factory()
+            return self._lazy_values[name]
+
+    @property
+    def session(self):
+        """Пул соединений под число параллельных воркеров, таймауты и повторы"""
+        def create():
+            from osint_http import create_session, DEFAULT_TIMEOUT, DEFAULT_RETRIES
+            return create_session(self._pool_size, timeout=self._timeout or DEFAULT_TIMEOUT,
+                                  retries=DEFAULT_RETRIES if self._retries is None else self._retries)
+        return self._lazy('session', create)
+
+    @property
+    def dns(self):
+        """Общий DNS-кэш на все запросы инструмента"""
+        def create():
+            from osint_dns import DNSCache, get_shared_cache, create_resolver
+            if self._nameserver:
+                return DNSCache(create_resolver(self._nameserver))
+            return get_shared_cache()
+        return self._lazy('dns', create)
+
+    @property
+    def cache(self):
+        """Кэш ответов WHOIS и ip-api на диске"""
+        def create():
+            if callable(self._cache):
+                return self._cache()
+            from osint_cache import get_default_cache
+            return self._cache or get_default_cache()
+        return self._lazy('cache', create)
+
+    @property
+    def catalog(self):
+        """Каталог платформ для поиска профилей"""
+        def create():
+            from osint_social import load_catalog
+            return load_catalog(self._catalog_path)
+        return self._lazy('catalog', create)
+
+    @property
+    def profiles(self):
+        """Планировщик проверок профилей с лимитом частоты на платформу"""
+        def create():
+            from osint_social import ProfileScheduler
+            return ProfileScheduler(self.session)
+        return self._lazy('profiles', create)
+
+    @property
+    def fingerprints(self):
+        """База сигнатур технологий для website_analysis"""
+        def create():
+            from osint_fingerprint import FingerprintEngine, load_signatures
+            return FingerprintEngine(load_signatures(self._signatures_path))
+        return self._lazy('fingerprints', create)
+
+    @property
+    def entities(self):
+        """Извлечение email, телефонов, ссылок и других сущностей со страниц"""
+        def create():
+            from osint_entities import EntityExtractor
+            return EntityExtractor()
+        return self._lazy('entities', create)
+
+    @property
+    def geo(self):
+        """Геолокация пачками через пакетный API ip-api"""
+        def create():
+            from osint_geo import GeoBatcher, IP_API_URL
+            from osint_http import create_session, DEFAULT_TIMEOUT, DEFAULT_RETRIES
+            # Пачки отправляет один поток; POST /batch идемпотентен, поэтому
+            # 429/5xx повторяются с учетом Retry-After, как и GET
+            session = create_session(1, timeout=self._timeout or DEFAULT_TIMEOUT,
+                                     retries=DEFAULT_RETRIES if self._retries is None else self._retries,
+                                     retry_methods=('POST',))
+            return GeoBatcher(session, base_url=self._geo_url or IP_API_URL)
+        return self._lazy('geo', create)
+
+    @property
+    def geo_index(self):
+        """Офлайн-индекс диапазонов IP: геолокация и ASN без сети"""
+        def create():
+            if not self._geo_db:
+                return None
+            from osint_geo import GeoIndex
+            return GeoIndex(self._geo_db)
+        return self._lazy('geo_index', create)
+        
+    def print_http_stats(self, limit=5):
+        """Задержки ответов по самым нагруженным хостам"""
+        if 'session' not in self._lazy_values:
+            return
+        hosts = sorted(self.session.stats.stats().items(), key=lambda item: -item[1]['requests'])
+        for host, stats in hosts[:limit]:
+            self.print_info(f"HTTP {host}: запросов {stats['requests']}, ошибок {stats['errors']}, "
+                            f"p50 {stats['p50'] * 1000:.0f} мс, p95 {stats['p95'] * 1000:.0f} мс, "
+                            f"макс. {stats['max'] * 1000:.0f} мс")
         
     def print_banner(self):
         """Вывод масштабного баннера"""
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
         print(f"{CYAN}")
         print(r'''
   ___  ____  ___ _____ _______   __
@@ -79,12 +223,21 @@ class OSINTTool:
     
     def print_error(self, message):
         """Вывод ошибки"""
+        count('errors')
         print(f"{RED}[ERROR]{RESET} {message}")
     
     def print_result(self, title, data):
         """Вывод результата"""
         print(f"{CYAN}{title}:{RESET} {data}")
 
+    @traced('whois')
+    def _load_whois(self, domain):
+        """WHOIS-запрос, возвращает только используемые поля"""
+        import whois
+        w = whois.whois(domain)
+        return {field: w.get(field) for field in WHOIS_FIELDS}
+
+    @traced()
     def domain_info(self, domain):
         """Получение информации о домене"""
         self.print_section("АНАЛИЗ ДОМЕНА")
@@ -92,25 +245,25 @@ class OSINTTool:
         try:
             # WHOIS информация
             self.print_info("Получение WHOIS информации...")
-            w = whois.whois(domain)
-            
-            if w.domain_name:
-                self.print_result("Домен", w.domain_name)
-            if w.registrar:
-                self.print_result("Регистратор", w.registrar)
-            if w.creation_date:
-                self.print_result("Дата создания", w.creation_date)
-            if w.expiration_date:
-                self.print_result("Дата истечения", w.expiration_date)
-            if w.name_servers:
-                self.print_result("NS серверы", w.name_servers)
+            w = self.cache.fetch('whois', domain, lambda: self._load_whois(domain))
+            
+            if w.get('domain_name'):
+                self.print_result("Домен", w['domain_name'])
+            if w.get('registrar'):
+                self.print_result("Регистратор", w['registrar'])
+            if w.get('creation_date'):
+                self.print_result("Дата создания", w['creation_date'])
+            if w.get('expiration_date'):
+                self.print_result("Дата истечения", w['expiration_date'])
+            if w.get('name_servers'):
+                self.print_result("NS серверы", w['name_servers'])
             
             # DNS записи
             self.print_info("Получение DNS записей...")
             
             # A записи
             try:
-                a_records = dns.resolver.resolve(domain, 'A')
+                a_records = self.dns.resolve(domain, 'A')
                 ips = [str(record) for record in a_records]
                 self.print_result("A записи (IP адреса)", ", ".join(ips))
             except Exception as e:
@@ -118,7 +271,7 @@ class OSINTTool:
             
             # MX записи
             try:
-                mx_records = dns.resolver.resolve(domain, 'MX')
+                mx_records = self.dns.resolve(domain, 'MX')
                 mx_list = [f"{record.exchange} (приоритет: {record.preference})" for record in mx_records]
                 self.print_result("MX записи", ", ".join(mx_list))
             except Exception as e:
@@ -126,7 +279,7 @@ class OSINTTool:
             
             # TXT записи
             try:
-                txt_records = dns.resolver.resolve(domain, 'TXT')
+                txt_records = self.dns.resolve(domain, 'TXT')
                 txt_list = [str(record) for record in txt_records]
                 self.print_result("TXT записи", ", ".join(txt_list))
             except Exception as e:
@@ -135,9 +288,43 @@ class OSINTTool:
         except Exception as e:
             self.print_error(f"Ошибка при получении информации о домене: {e}")
 
-    def ip_info(self, ip):
+    @traced('geo')
+    def _load_geolocation(self, ip):
+        """Запрос к ip-api.com через пакетный API, None если ответ не получен"""
+        return self.geo.lookup(ip)
+
+    def prefetch_geolocation(self, targets, lookahead=1000):
+        """Чтение целей с опережением: адреса заранее уходят в пакетные запросы.
+
+        Пока воркеры обрабатывают текущие цели, геолокация следующих
+        lookahead адресов уже запрашивается пачками по 100.
+        """
+        import ipaddress
+        if self.cache.cache_only or self.geo_index:
+            yield from targets
+            return
+        window = deque()
+        for target in targets:
+            window.append(target)
+            try:
+                ipaddress.ip_address(target)
+            except ValueError:
+                pass
+            else:
+                if self.cache.refresh or self.cache.get('ip-api', target) is None:
+                    self.geo.submit(target, prefetch=True)
+            if len(window) > lookahead:
+                yield window.popleft()
+        while window:
+            yield window.popleft()
+
+    @traced()
+    def ip_info(self, ip, ports=None, banners=False):
         """Получение информации об IP адресе"""
         self.print_section("АНАЛИЗ IP АДРЕСА")
+        import ipaddress
+        import socket
+        from osint_scan import PortScanner, BannerGrabber, parse_ports, banner_summary
         
         try:
             # Проверка валидности IP
@@ -145,17 +332,28 @@ class OSINTTool:
             
             # Геолокация
             self.print_info("Получение геолокации...")
-            response = self.session.get(f"http://ip-api.com/json/{ip}")
-            if response.status_code == 200:
-                data = response.json()
-                if data.get('status') == 'success':
-                    self.print_result("Страна", data.get('country', 'N/A'))
-                    self.print_result("Город", data.get('city', 'N/A'))
-                    self.print_result("Регион", data.get('regionName', 'N/A'))
-                    self.print_result("Провайдер", data.get('isp', 'N/A'))
-                    self.print_result("Организация", data.get('org', 'N/A'))
-                    self.print_result("Координаты", f"{data.get('lat', 'N/A')}, {data.get('lon', 'N/A')}")
-                    self.print_result("Часовой пояс", data.get('timezone', 'N/A'))
+            try:
+                if self.geo_index:
+                    data = self.geo_index.lookup(ip)
+                    if data:
+                        self.print_result("Страна", data['country'] or 'N/A')
+                        self.print_result("ASN", data['as'] or 'N/A')
+                        self.print_result("Организация", data['org'] or 'N/A')
+                    else:
+                        self.print_warning("Адрес не найден в офлайн-индексе")
+                else:
+                    data = self.cache.fetch('ip-api', ip, lambda: self._load_geolocation(ip))
+                    if data and data.get('status') == 'success':
+                        self.print_result("Страна", data.get('country', 'N/A'))
+                        self.print_result("Город", data.get('city', 'N/A'))
+                        self.print_result("Регион", data.get('regionName', 'N/A'))
+                        self.print_result("Провайдер", data.get('isp', 'N/A'))
+                        self.print_result("Организация", data.get('org', 'N/A'))
+                        self.print_result("Координаты", f"{data.get('lat', 'N/A')}, {data.get('lon', 'N/A')}")
+                        self.print_result("Часовой пояс", data.get('timezone', 'N/A'))
+            except Exception as e:
+                # Без геолокации анализ продолжается: обратный DNS и порты не зависят от ip-api
+                self.print_warning(f"Не удалось получить геолокацию: {e}")
             
             # Обратный DNS
             try:
@@ -165,32 +363,26 @@ class OSINTTool:
                 self.print_warning(f"Не удалось получить обратный DNS: {e}")
             
             # Проверка портов
-            self.print_info("Сканирование популярных портов...")
-            common_ports = [21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995, 3306, 3389, 5432, 8080]
-            open_ports = []
-            
-            def check_port(port):
-                try:
-                    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
-                    sock.settimeout(1)
-                    result = sock.connect_ex((ip, port))
-                    sock.close()
-                    return port if result == 0 else None
-                except:
-                    return None
-            
-            with ThreadPoolExecutor(max_workers=10) as executor:
-                results = list(executor.map(check_port, common_ports))
-                open_ports = [port for port in results if port is not None]
+            ports = parse_ports(ports)
+            self.print_info(f"Сканирование портов ({len(ports)})...")
+            scanner = PortScanner(concurrency=min(len(ports), 500), timeout=1,
+                                  banners=BannerGrabber() if banners else None)
+            services = {}
+            open_ports = sorted(port for _, port in scanner.scan(
+                ip, ports, on_banner=lambda _, port, info: services.__setitem__(port, info)))
             
             if open_ports:
                 self.print_result("Открытые порты", ", ".join(map(str, open_ports)))
+                for port in open_ports:
+                    if port in services:
+                        self.print_result(f"Порт {port}", banner_summary(services[port]))
             else:
                 self.print_result("Открытые порты", "Не найдено")
                 
         except Exception as e:
             self.print_error(f"Ошибка при анализе IP: {e}")
 
+    @traced()
     def email_analysis(self, email):
         """Анализ email адреса"""
         self.print_section("АНАЛИЗ EMAIL")
@@ -203,7 +395,7 @@ class OSINTTool:
             
             # Проверка MX записей
             try:
-                mx_records = dns.resolver.resolve(domain, 'MX')
+                mx_records = self.dns.resolve(domain, 'MX')
                 mx_list = [str(record.exchange) for record in mx_records]
                 self.print_result("MX серверы", ", ".join(mx_list))
             except Exception as e:
@@ -211,7 +403,7 @@ class OSINTTool:
             
             # Проверка SPF записи
             try:
-                txt_records = dns.resolver.resolve(domain, 'TXT')
+                txt_records = self.dns.resolve(domain, 'TXT')
                 spf_records = [str(record) for record in txt_records if 'spf' in str(record).lower()]
                 if spf_records:
                     self.print_result("SPF записи", ", ".join(spf_records))
@@ -223,43 +415,59 @@ class OSINTTool:
         except Exception as e:
             self.print_error(f"Ошибка при анализе email: {e}")
 
+    @traced()
     def social_media_search(self, username):
-        """Поиск пользователя в социальных сетях"""
+        """Поиск пользователя в социальных сетях (несколько имен - через запятую)"""
         self.print_section("ПОИСК В СОЦИАЛЬНЫХ СЕТЯХ")
+        from osint_social import select_platforms, split_usernames
         
-        platforms = {
-            'Twitter': f'https://twitter.com/{username}',
-            'Instagram': f'https://instagram.com/{username}',
-            'Facebook': f'https://facebook.com/{username}',
-            'LinkedIn': f'https://linkedin.com/in/{username}',
-            'GitHub': f'https://github.com/{username}',
-            'YouTube': f'https://youtube.com/@{username}',
-            'TikTok': f'https://tiktok.com/@{username}',
-            'Reddit': f'https://reddit.com/user/{username}',
-            'Telegram': f'https://t.me/{username}',
-            'VK': f'https://vk.com/{username}'
-        }
-        
+        several = len(split_usernames(username)) > 1
         found_profiles = []
         
-        for platform, url in platforms.items():
-            try:
-                response = self.session.get(url, timeout=5)
-                if response.status_code == 200:
-                    found_profiles.append(platform)
-                    self.print_result(platform, url)
-                time.sleep(0.5)  # Задержка между запросами
-            except Exception as e:
-                continue
+        platforms = select_platforms(self.catalog, 'basic')
+        for name, platform, url, found in self.profiles.check(username, platforms):
+            if found:
+                found_profiles.append(platform)
+                self.print_result(f"{platform} ({name})" if several else platform, url)
         
         if found_profiles:
             self.print_info(f"Найдено профилей: {len(found_profiles)}")
         else:
             self.print_warning("Профили не найдены")
 
-    def website_analysis(self, url):
+    @traced()
+    def analyze_page(self, url, max_bytes=DEFAULT_MAX_BYTES, max_time=DEFAULT_MAX_TIME,
+                     consumers=(), html_only=False):
+        """Загрузка и потоковый анализ одной страницы без вывода"""
+        from osint_stream import cap_timeout, stream_text
+        # Ожидание заголовков тоже не дольше лимита времени на страницу
+        response = self.session.get(url, timeout=cap_timeout(self.session.timeout, max_time),
+                                    stream=True)
+        page = {'url': url, 'final_url': response.url, 'status': response.status_code,
+                'headers': response.headers, 'skipped': False}
+        if html_only and 'html' not in response.headers.get('Content-Type', '').lower():
+            response.close()
+            page['skipped'] = True
+            return page
+        
+        # Поиск технологий по заголовкам, cookie, meta, script и телу страницы
+        fingerprint = self.fingerprints.scanner()
+        fingerprint.feed_headers(response.headers)
+        
+        # Email, телефоны, ссылки, IP, профили и криптоадреса - за одно чтение страницы
+        entities = self.entities.scanner()
+        
+        page['stream'] = stream_text(response, [fingerprint, entities, *consumers],
+                                     max_bytes=max_bytes, max_time=max_time)
+        page['technologies'] = fingerprint.result()
+        page['entities'] = entities.results()
+        return page
+
+    @traced()
+    def website_analysis(self, url, max_bytes=DEFAULT_MAX_BYTES, max_time=DEFAULT_MAX_TIME):
         """Анализ веб-сайта"""
         self.print_section("АНАЛИЗ ВЕБ-САЙТА")
+        from urllib.parse import urlparse
         
         try:
             # Парсинг URL
@@ -271,67 +479,79 @@ class OSINTTool:
             self.print_result("Протокол", parsed_url.scheme)
             self.print_result("Путь", parsed_url.path)
             
-            # Получение заголовков
+            # Получение заголовков, тело читается потоково
             self.print_info("Получение HTTP заголовков...")
-            response = self.session.get(url, timeout=10)
-            
-            self.print_result("Статус код", response.status_code)
-            self.print_result("Сервер", response.headers.get('Server', 'N/A'))
-            self.print_result("Content-Type", response.headers.get('Content-Type', 'N/A'))
-            self.print_result("X-Powered-By", response.headers.get('X-Powered-By', 'N/A'))
-            
-            # Поиск технологий
-            technologies = []
-            headers = str(response.headers).lower()
-            content = response.text.lower()
-            
-            tech_patterns = {
-                'WordPress': ['wordpress', 'wp-content'],
-                'Drupal': ['drupal'],
-                'Joomla': ['joomla'],
-                'Laravel': ['laravel'],
-                'Django': ['django'],
-                'React': ['react', 'reactjs'],
-                'Angular': ['angular'],
-                'Vue.js': ['vue'],
-                'Bootstrap': ['bootstrap'],
-                'jQuery': ['jquery'],
-                'PHP': ['php'],
-                'ASP.NET': ['asp.net', 'aspx'],
-                'Node.js': ['node.js', 'express'],
-                'Nginx': ['nginx'],
-                'Apache': ['apache'],
-                'IIS': ['iis'],
-                'CloudFlare': ['cloudflare'],
-                'CDN': ['cdn']
-            }
-            
-            for tech, patterns in tech_patterns.items():
-                for pattern in patterns:
-                    if pattern in headers or pattern in content:
-                        technologies.append(tech)
-                        break
-            
-            if technologies:
-                self.print_result("Обнаруженные технологии", ", ".join(set(technologies)))
-            
-            # Поиск email адресов
-            email_pattern = r'\b[A-Za-z0-9._%+-]+@[A-Za-z0-9.-]+\.[A-Z|a-z]{2,}\b'
-            emails = re.findall(email_pattern, response.text)
-            if emails:
-                unique_emails = list(set(emails))[:5]  # Первые 5 уникальных
-                self.print_result("Найденные email", ", ".join(unique_emails))
-            
-            # Поиск телефонных номеров
-            phone_pattern = r'[\+]?[1-9][\d]{0,15}'
-            phones = re.findall(phone_pattern, response.text)
-            if phones:
-                unique_phones = list(set(phones))[:5]  # Первые 5 уникальных
-                self.print_result("Найденные телефоны", ", ".join(unique_phones))
+            page = self.analyze_page(url, max_bytes, max_time)
+            headers = page['headers']
+            
+            self.print_result("Статус код", page['status'])
+            self.print_result("Сервер", headers.get('Server', 'N/A'))
+            self.print_result("Content-Type", headers.get('Content-Type', 'N/A'))
+            self.print_result("X-Powered-By", headers.get('X-Powered-By', 'N/A'))
+            
+            info = page['stream']
+            if info['truncated']:
+                limit = f"{max_bytes} байт" if info['reason'] == 'max_bytes' else f"{max_time} с"
+                self.print_warning(f"Страница прочитана не полностью (лимит {limit})")
+            
+            if page['technologies']:
+                self.print_result("Обнаруженные технологии", ", ".join(page['technologies']))
+            
+            self.print_entities(page['entities'])
                 
         except Exception as e:
             self.print_error(f"Ошибка при анализе сайта: {e}")
 
+    def print_entities(self, found, limit=5):
+        """Вывод первых найденных сущностей каждого типа"""
+        for kind, title in ENTITY_TITLES:
+            if found.get(kind):
+                values = [entity.value for entity in found[kind][:limit]]
+                self.print_result(title, ", ".join(values))
+
+    @traced()
+    def website_crawl(self, url, depth=2, max_pages=100, crawl_workers=8,
+                      max_bytes=DEFAULT_MAX_BYTES, max_time=DEFAULT_MAX_TIME):
+        """Обход сайта с анализом каждой страницы и сводкой по сайту"""
+        self.print_section("ОБХОД САЙТА")
+        from osint_crawl import SiteCrawler
+        
+        try:
+            self.print_result("Стартовый URL", url)
+            self.print_result("Глубина", depth)
+            self.print_result("Лимит страниц", max_pages)
+            
+            crawler = SiteCrawler(self, workers=crawl_workers, max_depth=depth, max_pages=max_pages,
+                                  max_bytes=max_bytes, max_time=max_time)
+            
+            def on_page(page, level):
+                if 'error' in page:
+                    self.print_warning(f"{page['url']}: {page['error']}")
+                elif not page['skipped']:
+                    self.print_result(f"[{level}] {page['status']}", page['url'])
+            
+            report = crawler.crawl(url, on_page)
+            
+            self.print_info("Сводка по сайту:")
+            if report['technologies']:
+                self.print_result("Обнаруженные технологии", ", ".join(report['technologies']))
+            self.print_entities(report['entities'], limit=20)
+            self.print_result("Страниц проанализировано", report['pages'])
+            self.print_result("Ошибок", report['errors'])
+            self.print_result("Уникальных URL в очереди обхода", report['seen'])
+            self.print_result("Скорость", f"{report['pages_per_second']:.1f} стр/с "
+                              f"за {report['elapsed']:.1f} с")
+            self.print_result("Память фильтра URL", f"{report['filter_bytes_per_10k']:.0f} байт на 10 тыс. URL")
+            self.print_result("Пиковая память очереди обхода",
+                              f"{report['frontier_peak_bytes'] / 1024:.1f} КБ "
+                              f"({report['frontier_peak_urls']} URL)")
+            if report['peak_rss']:
+                self.print_result("Пиковая память процесса", f"{report['peak_rss'] / 1024 / 1024:.1f} МБ")
+                
+        except Exception as e:
+            self.print_error(f"Ошибка при обходе сайта: {e}")
+
+    @traced()
     def breach_check(self, email):
         """Проверка email в утечках данных"""
         self.print_section("ПРОВЕРКА УТЕЧЕК ДАННЫХ")
@@ -350,41 +570,202 @@ class OSINTTool:
         except Exception as e:
             self.print_error(f"Ошибка при проверке утечек: {e}")
 
-    def subdomain_enumeration(self, domain):
+    @traced()
+    def subdomain_enumeration(self, domain, wordlist=None, concurrency=500, nameserver=None):
         """Перечисление поддоменов"""
         self.print_section("ПЕРЕЧИСЛЕНИЕ ПОДДОМЕНОВ")
+        from osint_dns import SubdomainBruteForcer, COMMON_SUBDOMAINS, iter_wordlist, parse_nameserver
         
         try:
-            # Список популярных поддоменов
-            common_subdomains = [
-                'www', 'mail', 'ftp', 'admin', 'blog', 'dev', 'test', 'staging',
-                'api', 'cdn', 'static', 'img', 'images', 'media', 'files',
-                'support', 'help', 'docs', 'wiki', 'forum', 'shop', 'store',
-                'app', 'mobile', 'web', 'secure', 'login', 'portal', 'dashboard'
-            ]
+            # Словарь читается из файла построчно, по умолчанию - популярные поддомены
+            labels = iter_wordlist(wordlist) if wordlist else COMMON_SUBDOMAINS
+            nameserver = nameserver or self._nameserver
+            nameservers, port = None, 53
+            if nameserver:
+                host, port = parse_nameserver(nameserver)
+                nameservers = [host]
             
-            found_subdomains = []
+            brute = SubdomainBruteForcer(nameservers, port, concurrency=concurrency)
             
-            def check_subdomain(subdomain):
-                try:
-                    full_domain = f"{subdomain}.{domain}"
-                    socket.gethostbyname(full_domain)
-                    return full_domain
-                except:
-                    return None
+            def on_wildcard(ips):
+                self.print_warning(f"Обнаружен wildcard DNS ({', '.join(sorted(ips))}), "
+                                   f"такие ответы не считаются находками")
+            
+            def on_found(name, ips):
+                self.print_result("Поддомен", f"{name} ({', '.join(sorted(ips))})")
             
-            with ThreadPoolExecutor(max_workers=20) as executor:
-                results = list(executor.map(check_subdomain, common_subdomains))
-                found_subdomains = [subdomain for subdomain in results if subdomain]
+            started = time.time()
+            found_subdomains = brute.scan(domain, labels, on_found, on_wildcard)
+            elapsed = max(time.time() - started, 1e-6)
+            self.print_info(f"Проверено имен: {brute.checked} за {elapsed:.1f} с "
+                            f"({brute.checked / elapsed:.0f} запросов/с)")
             
             if found_subdomains:
-                self.print_result("Найденные поддомены", "\n".join(found_subdomains))
+                self.print_result("Найдено поддоменов", len(found_subdomains))
             else:
                 self.print_warning("Поддомены не найдены")
                 
         except Exception as e:
             self.print_error(f"Ошибка при перечислении поддоменов: {e}")
 
+    @traced()
+    def network_scan(self, target, exclude=None, randomize=False, seed=0, concurrency=1000,
+                     timeout=2, adaptive=True, liveness=False, ports=None, banners=False,
+                     checkpoint=None, resume=False, processes=1, per_host=100):
+        """Сканирование портов в диапазонах адресов"""
+        self.print_section("СКАНИРОВАНИЕ СЕТИ")
+        from osint_scan import PortScanner, BannerGrabber, OPEN, parse_ports, port_name, banner_summary
+        from osint_targets import TargetSet
+        from osint_journal import ScanJournal, scan_params, default_journal_path
+        
+        journal = None
+        try:
+            # Цели разворачиваются лениво: /8 не превращается в список адресов
+            targets = TargetSet(target, exclude)
+            self.print_result("Адресов для сканирования", targets.size)
+            ports = parse_ports(ports)
+            self.print_result("Портов на адрес", len(ports))
+            if randomize:
+                self.print_info("Адреса перебираются в псевдослучайном порядке")
+            
+            # Журнал: завершенные цели и открытые порты периодически пишутся на диск
+            params = scan_params(target, exclude, ports, randomize, seed, targets.size)
+            checkpoint = checkpoint or default_journal_path(params)
+            journal = ScanJournal(checkpoint, params, resume=resume)
+            if journal.resumed:
+                self.print_info(f"Продолжение по журналу {checkpoint}: завершено "
+                                f"{journal.completed} из {targets.size} адресов")
+                for ip, port in journal.open_ports:
+                    self.print_result(f"IP {ip}", f"Порт {port} ({port_name(port)}) [журнал]")
+            elif resume:
+                self.print_warning(f"Журнал {checkpoint} не найден, сканирование начинается заново")
+            remaining = targets.size - journal.completed
+            
+            def on_result(ip, port, state):
+                if state == OPEN and journal.add_open(ip, port):
+                    self.print_result(f"IP {ip}", f"Порт {port} ({port_name(port)})")
+            
+            def on_banner(ip, port, info):
+                self.print_result(f"IP {ip}:{port}", banner_summary(info))
+            
+            started = time.time()
+            # Таймауты по измеренному RTT, недоступные хосты отбрасываются сразу;
+            # баннеры открытых портов читаются параллельно со сканированием
+            if processes > 1:
+                from osint_shard import ShardedScanner
+                # Цели делятся между процессами, результаты идут в порядке обхода
+                self.print_info(f"Сканирование в {processes} процессах")
+                scanner = ShardedScanner(processes, concurrency=concurrency, per_host=per_host,
+                                         timeout=timeout, adaptive=adaptive, liveness=liveness,
+                                         banners=banners)
+                scanner.scan(target, exclude, ports, randomize, seed, journal.done,
+                             lambda ip, port: on_result(ip, port, OPEN), on_banner,
+                             journal.position_done)
+            else:
+                scanner = PortScanner(concurrency=concurrency, per_host=per_host, timeout=timeout,
+                                      adaptive=adaptive, liveness=liveness,
+                                      banners=BannerGrabber() if banners else None)
+                pending = journal.track(targets.iter_positions(randomize, seed, journal.done))
+                scanner.scan(pending, ports, on_result, on_banner, journal.host_done)
+            elapsed = max(time.time() - started, 1e-6)
+            # Сканирование завершено: журнал больше не нужен
+            journal.close(remove=True)
+            
+            active_hosts = len({ip for ip, _ in journal.open_ports})
+            self.print_result("Активных хостов", active_hosts)
+            self.print_result("Открытых портов", len(journal.open_ports))
+            if liveness:
+                self.print_result("Хостов без ответа (пропущены)", scanner.dead_hosts)
+            self.print_info(f"Проверено {remaining} адресов за {elapsed:.1f} с "
+                            f"({remaining / elapsed:.0f} адресов/с)")
+            if not active_hosts:
+                self.print_warning("Активных хостов не найдено. Возможные причины:")
+                self.print_warning("- Все порты закрыты")
+                self.print_warning("- Брандмауэр блокирует соединения")
+                self.print_warning("- Слишком короткий таймаут")
+                self.print_info("Попробуйте увеличить таймаут (--scan-timeout) или проверить настройки сети")
+                
+        except KeyboardInterrupt:
+            self.print_warning("Сканирование прервано")
+        except Exception as e:
+            self.print_error(f"Ошибка при сканировании сети: {e}")
+        finally:
+            if journal and not journal.closed:
+                journal.close()
+                self.print_info(f"Прогресс сохранен в {journal.path}, продолжить: --resume")
+
+    @traced()
+    def wayback_harvest(self, domain, output=None, checkpoint=None, cdx_workers=None,
+                        cdx_rate=None):
+        """Выгрузка всех архивных URL домена из Wayback Machine"""
+        self.print_section("ВЫГРУЗКА ИЗ WAYBACK MACHINE")
+        from osint_wayback import CDXHarvester, URLSink, CDX_URL, DEFAULT_WORKERS, DEFAULT_RATE
+        
+        try:
+            # {domain} в имени файла - отдельный файл на каждый домен пакетного режима
+            if output and output != '-':
+                output = output.replace('{domain}', domain)
+                checkpoint = (checkpoint or output + '.checkpoint').replace('{domain}', domain)
+            elif checkpoint:
+                checkpoint = checkpoint.replace('{domain}', domain)
+            
+            harvester = CDXHarvester(self.session, base_url=self._cdx_url or CDX_URL,
+                                     workers=cdx_workers or DEFAULT_WORKERS,
+                                     rate=cdx_rate or DEFAULT_RATE,
+                                     checkpoint=checkpoint)
+            resume = harvester.checkpoint.matches(domain)
+            if resume:
+                self.print_info(f"Продолжение выгрузки по контрольной точке {checkpoint}")
+            to_file = output and output != '-'
+            
+            def on_page(pages, written):
+                if to_file and pages % 10 == 0:
+                    total = harvester.pages or '?'
+                    self.print_info(f"Страниц: {pages}/{total}, URL записано: {written}")
+            
+            sink = URLSink(output, resume=resume)
+            try:
+                started = time.time()
+                pages = harvester.harvest(domain, sink, on_page)
+            finally:
+                sink.close()
+            # Выгрузка завершена: следующий запуск начнется заново
+            harvester.checkpoint.remove()
+            
+            elapsed = max(time.time() - started, 1e-6)
+            self.print_result("Режим CDX", "page" if harvester.pages is not None else "resumeKey")
+            self.print_result("Страниц обработано", pages)
+            self.print_result("Уникальных URL", len(sink.seen))
+            self.print_result("Запросов к CDX API", harvester.requests)
+            self.print_result("Время", f"{elapsed:.1f} с")
+            if to_file:
+                self.print_result("Файл", output)
+                
+        except Exception as e:
+            self.print_error(f"Ошибка при выгрузке из Wayback Machine: {e}")
+            if checkpoint:
+                self.print_info("Прогресс сохранен, повторный запуск продолжит выгрузку")
+
+    @traced()
+    def build_geoindex(self, csv_path, geo_db=None):
+        """Сборка офлайн-индекса геолокации из CSV диапазонов"""
+        self.print_section("СБОРКА ИНДЕКСА ГЕОЛОКАЦИИ")
+        from osint_geo import build_geo_index
+        
+        try:
+            index_path = geo_db or os.path.splitext(csv_path)[0] + '.idx'
+            started = time.time()
+            rows = build_geo_index(csv_path, index_path)
+            self.print_result("Диапазонов", rows)
+            self.print_result("Файл индекса", index_path)
+            self.print_result("Размер", f"{os.path.getsize(index_path) / 1024 / 1024:.1f} МБ")
+            self.print_result("Время", f"{time.time() - started:.1f} с")
+            self.print_info(f"Использование: python osint_cli.py ip 8.8.8.8 --geo-db {index_path}")
+            
+        except Exception as e:
+            self.print_error(f"Ошибка при сборке индекса: {e}")
+
+    @traced()
     def metadata_extraction(self, file_path):
         """Извлечение метаданных из файлов"""
         self.print_section("ИЗВЛЕЧЕНИЕ МЕТАДАННЫХ")
@@ -426,6 +807,216 @@ class OSINTTool:
         except Exception as e:
             self.print_error(f"Ошибка при извлечении метаданных: {e}")
 
+# Команды CLI и соответствующие методы OSINTTool
+COMMANDS = {
+    'domain': 'domain_info',
+    'ip': 'ip_info',
+    'email': 'email_analysis',
+    'social': 'social_media_search',
+    'website': 'website_analysis',
+    'breach': 'breach_check',
+    'subdomains': 'subdomain_enumeration',
+    'metadata': 'metadata_extraction',
+    'wayback': 'wayback_harvest',
+    'geoindex': 'build_geoindex',
+    'scan': 'network_scan',
+}
+
+# Команды демона и параметры, которые может передать клиент. Пути к файлам
+# (output, checkpoint, wordlist, geo_db) не принимаются: клиент не должен
+# читать или перезаписывать файлы на машине демона. metadata и geoindex
+# работают только с локальными файлами и в демоне недоступны
+_SCAN_OPTIONS = ('exclude', 'randomize', 'seed', 'concurrency', 'timeout', 'adaptive',
+                 'liveness', 'ports', 'banners', 'processes', 'per_host')
+DAEMON_OPTIONS = {
+    'domain': (),
+    'ip': ('ports', 'banners'),
+    'email': (),
+    'social': (),
+    'website': ('max_bytes', 'max_time'),
+    'breach': (),
+    'subdomains': ('concurrency', 'nameserver'),
+    'wayback': ('cdx_workers', 'cdx_rate'),
+    'scan': _SCAN_OPTIONS,
+    'shodan': ('api_key',),
+    'archive': (),
+    'dorks': (),
+    'certs': (),
+    'threats': (),
+    'social-advanced': (),
+    'breach-advanced': (),
+    'reputation': (),
+    'netscan': _SCAN_OPTIONS,
+}
+
+class ThreadOutput:
+    """Перенаправление stdout в буфер текущего потока (для пакетного режима)"""
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def capture(self, buffer=None):
+        """Начать сбор вывода текущего потока (в buffer или в новый StringIO)"""
+        self._local.buffer = buffer if buffer is not None else io.StringIO()
+
+    def release(self):
+        """Завершить сбор и вернуть накопленный вывод"""
+        buffer = getattr(self._local, 'buffer', None)
+        self._local.buffer = None
+        return buffer.getvalue() if buffer else ""
+
+    def write(self, text):
+        buffer = getattr(self._local, 'buffer', None)
+        if buffer is None:
+            return self.stream.write(text)
+        return buffer.write(text)
+
+    def flush(self):
+        self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+def iter_targets(source):
+    """Чтение целей из файла или stdin ('-'), пустые строки и комментарии пропускаются"""
+    stream = sys.stdin if source == '-' else open(source, encoding='utf-8')
+    try:
+        for line in stream:
+            line = line.strip()
+            if line and not line.startswith('#'):
+                yield line
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+def run_batch(tool, method, targets, workers=8, order='input', options=None):
+    """Выполнение метода OSINTTool по множеству целей пулом воркеров"""
+    from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, as_completed, wait
+    handler = getattr(tool, method)
+    options = options or {}
+    router = ThreadOutput(sys.stdout)
+    # Ограничиваем число целей в работе, чтобы не читать весь файл в память
+    limit = workers * 4
+    processed = 0
+
+    def job(target):
+        router.capture()
+        try:
+            handler(target, **options)
+        except Exception as e:
+            tool.print_error(f"{target}: {e}")
+        return router.release()
+
+    def emit(future):
+        router.stream.write(future.result())
+        router.stream.flush()
+
+    sys.stdout = router
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            if order == 'input':
+                window = deque()
+                for target in targets:
+                    window.append(executor.submit(job, target))
+                    if len(window) >= limit:
+                        emit(window.popleft())
+                        processed += 1
+                while window:
+                    emit(window.popleft())
+                    processed += 1
+            else:
+                running = set()
+                for target in targets:
+                    running.add(executor.submit(job, target))
+                    if len(running) >= limit:
+                        done, running = wait(running, return_when=FIRST_COMPLETED)
+                        for future in done:
+                            emit(future)
+                            processed += 1
+                for future in as_completed(running):
+                    emit(future)
+                    processed += 1
+    finally:
+        sys.stdout = router.stream
+    return processed
+
+def _without_file_specs(handler):
+    """Сканирование для демона: списки адресов из файла (@путь) не принимаются"""
+    def scan(target, **options):
+        if target.startswith('@') or str(options.get('exclude') or '').startswith('@'):
+            raise ValueError("Списки адресов из файла (@путь) в демоне недоступны")
+        return handler(target, **options)
+    return scan
+
+def serve_daemon(tool, listen=None, workers=None, queue_size=None, catalog=None,
+                 token_file=None):
+    """Режим демона: задания через локальный HTTP API на прогретых OSINTTool и AdvancedOSINT"""
+    from osint_daemon import (JobManager, create_server, default_token_path, new_token,
+                              write_token, DEFAULT_LISTEN, DEFAULT_WORKERS, DEFAULT_QUEUE_SIZE)
+    from osint_advanced import AdvancedOSINT, ADVANCED_COMMANDS
+    listen = listen or DEFAULT_LISTEN
+    workers = workers or DEFAULT_WORKERS
+    queue_size = queue_size or DEFAULT_QUEUE_SIZE
+    # Расширенные функции используют те же сессию и кэш, что и основные
+    advanced = AdvancedOSINT(cache=tool.cache, catalog=catalog, session=tool.session)
+    methods = {command: getattr(tool, method) for command, method in COMMANDS.items()}
+    methods.update((command, getattr(advanced, method))
+                   for command, method in ADVANCED_COMMANDS.items())
+    handlers = {command: methods[command] for command in DAEMON_OPTIONS}
+    for command in ('scan', 'netscan'):
+        handlers[command] = _without_file_specs(handlers[command])
+    router = ThreadOutput(sys.stdout)
+    manager = JobManager(handlers, router, DAEMON_OPTIONS, workers, queue_size)
+
+    def stats():
+        return {'cache': tool.cache.stats(), 'dns': tool.dns.stats()}
+
+    # Для TCP нужен токен: новый при каждом запуске, если не задан OSINT_DAEMON_TOKEN
+    token = None
+    if not listen.startswith('unix:'):
+        token_file = token_file or default_token_path()
+        token = os.environ.get('OSINT_DAEMON_TOKEN') or new_token()
+    try:
+        server = create_server(listen, manager, stats, token)
+    except (OSError, ValueError) as e:
+        manager.close()
+        tool.print_error(f"Не удалось запустить демон на {listen}: {e}")
+        sys.exit(1)
+    # Файл токена появляется только после успешного bind
+    if token:
+        try:
+            write_token(token_file, token)
+        except OSError as e:
+            server.server_close()
+            manager.close()
+            tool.print_error(f"Не удалось записать токен API в {token_file}: {e}")
+            sys.exit(1)
+    
+    def stop(signum, frame):
+        raise KeyboardInterrupt
+    
+    # SIGTERM (systemd, docker stop) завершает демон так же, как Ctrl+C
+    signal.signal(signal.SIGTERM, stop)
+    tool.print_info(f"Демон слушает {listen}: заданий одновременно {workers}, очередь {queue_size}")
+    if token:
+        tool.print_info(f"Токен API (Authorization: Bearer) записан в {token_file}")
+    tool.print_info("Остановка: Ctrl+C")
+    sys.stdout = router
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        sys.stdout = router.stream
+        server.server_close()
+        manager.close()
+        if listen.startswith('unix:') and os.path.exists(listen[5:]):
+            os.remove(listen[5:])
+        if token and os.path.exists(token_file):
+            os.remove(token_file)
+    tool.print_info(f"Демон остановлен, выполнено заданий: {manager.completed}")
+
 def main():
     parser = argparse.ArgumentParser(
         description='Универсальный CLI-помощник для OSINT',
@@ -436,41 +1027,227 @@ def main():
   python osint_cli.py ip 8.8.8.8
   python osint_cli.py email user@example.com
   python osint_cli.py social username
+  python osint_cli.py social user1,user2,user3
   python osint_cli.py website https://example.com
+  python osint_cli.py website https://example.com --crawl --depth 3 --max-pages 500
   python osint_cli.py breach user@example.com
   python osint_cli.py subdomains example.com
+  python osint_cli.py subdomains example.com --wordlist words.txt --concurrency 1000
   python osint_cli.py metadata file.jpg
+  python osint_cli.py wayback example.com --output urls.txt
+  python osint_cli.py geoindex ranges.csv --geo-db geo.idx
+  python osint_cli.py scan 10.0.0.0/16,10.1.0.1-50 --exclude 10.0.5.0/24 --random
+  python osint_cli.py ip 8.8.8.8 --geo-db geo.idx
+  python osint_cli.py daemon --listen 127.0.0.1:8765
+  python osint_cli.py domain example.com --metrics json --profile profile.txt
+  python osint_cli.py domain --targets-file domains.txt --workers 16
+  cat ips.txt | python osint_cli.py ip --targets-file - --order completion
         """
     )
     
-    parser.add_argument('command', choices=[
-        'domain', 'ip', 'email', 'social', 'website', 
-        'breach', 'subdomains', 'metadata'
-    ], help='Команда для выполнения')
+    parser.add_argument('command', choices=list(COMMANDS) + ['daemon'], help='Команда для выполнения')
     
-    parser.add_argument('target', help='Цель для анализа')
+    parser.add_argument('target', nargs='?', help='Цель для анализа')
+    parser.add_argument('--targets-file', metavar='FILE',
+                        help='Файл со списком целей (по одной на строку), "-" для stdin')
+    parser.add_argument('-w', '--workers', type=int, default=8,
+                        help='Число параллельных воркеров пакетного режима '
+                             'и одновременных заданий демона (по умолчанию 8)')
+    parser.add_argument('--order', choices=['input', 'completion'], default='input',
+                        help='Порядок вывода результатов пакетного режима')
+    parser.add_argument('--cache-only', action='store_true',
+                        help='Брать ответы WHOIS/ip-api только из кэша, без сети')
+    parser.add_argument('--refresh', action='store_true',
+                        help='Игнорировать кэш и обновить его свежими ответами')
+    parser.add_argument('--cache-path', metavar='FILE',
+                        help='Файл кэша ответов (по умолчанию ~/.cache/osint_cli/responses.sqlite3)')
+    parser.add_argument('--catalog', metavar='FILE',
+                        help='Каталог платформ для social (JSON или YAML), по умолчанию platforms.json')
+    parser.add_argument('--signatures', metavar='FILE',
+                        help='База сигнатур технологий для website (JSON), по умолчанию technologies.json')
+    parser.add_argument('--max-bytes', type=int, default=DEFAULT_MAX_BYTES,
+                        help='Сколько байт страницы читать в website (по умолчанию 5 МБ)')
+    parser.add_argument('--max-time', type=float, default=DEFAULT_MAX_TIME,
+                        help='Сколько секунд читать страницу в website (по умолчанию 15)')
+    parser.add_argument('--crawl', action='store_true',
+                        help='website: обойти страницы того же сайта и свести результаты')
+    parser.add_argument('--depth', type=int, default=2,
+                        help='Глубина обхода сайта для --crawl (по умолчанию 2)')
+    parser.add_argument('--max-pages', type=int, default=100,
+                        help='Максимум страниц для --crawl (по умолчанию 100)')
+    parser.add_argument('--crawl-workers', type=int, default=8,
+                        help='Число параллельных загрузок для --crawl (по умолчанию 8)')
+    parser.add_argument('--wordlist', metavar='FILE',
+                        help='Словарь поддоменов для subdomains (читается потоково)')
+    parser.add_argument('--concurrency', type=int, default=500,
+                        help='Одновременных запросов: DNS для subdomains, соединений для scan (по умолчанию 500)')
+    parser.add_argument('--nameserver', metavar='IP[:PORT]',
+                        help='DNS-сервер вместо системного (domain, email, subdomains)')
+    parser.add_argument('--output', metavar='FILE',
+                        help='wayback: файл для URL ({domain} - имя домена), "-" для stdout')
+    parser.add_argument('--checkpoint', metavar='FILE',
+                        help='wayback: файл контрольной точки (по умолчанию OUTPUT.checkpoint); '
+                             'scan: файл журнала (по умолчанию scan_<хэш параметров>.journal)')
+    parser.add_argument('--processes', type=int, default=1,
+                        help='scan: число процессов сканирования (по умолчанию 1)')
+    parser.add_argument('--resume', action='store_true',
+                        help='scan: продолжить прерванное сканирование по журналу')
+    parser.add_argument('--cdx-workers', type=int,
+                        help='wayback: параллельных запросов к CDX API (по умолчанию 4)')
+    parser.add_argument('--cdx-rate', type=float,
+                        help='wayback: запросов в секунду к CDX API (по умолчанию 1)')
+    parser.add_argument('--ip-api-url', metavar='URL',
+                        help='Адрес API геолокации, совместимого с ip-api.com (по умолчанию http://ip-api.com)')
+    parser.add_argument('--cdx-url', metavar='URL',
+                        help='wayback: адрес CDX API (по умолчанию http://web.archive.org/cdx/search/cdx)')
+    parser.add_argument('--geo-db', metavar='FILE',
+                        help='ip: офлайн-индекс геолокации вместо ip-api; geoindex: файл для сборки')
+    parser.add_argument('--exclude', metavar='LIST',
+                        help='scan: исключаемые CIDR/диапазоны/адреса через запятую или @файл')
+    parser.add_argument('--random', action='store_true',
+                        help='scan: перебирать адреса в псевдослучайном порядке')
+    parser.add_argument('--seed', type=int, default=0,
+                        help='scan: зерно псевдослучайного порядка (по умолчанию 0)')
+    parser.add_argument('--scan-timeout', type=float, default=2.0,
+                        help='scan: максимальный таймаут соединения в секундах (по умолчанию 2)')
+    parser.add_argument('--fixed-timeout', action='store_true',
+                        help='scan: не подстраивать таймаут под измеренное время ответа')
+    parser.add_argument('--ping', action='store_true',
+                        help='scan: пропускать хосты, не ответившие на несколько популярных портов '
+                             '(быстрее на разреженных сетях, но хост за брандмауэром может быть пропущен)')
+    parser.add_argument('--ports', metavar='SPEC',
+                        help='ip/scan: порты, например 1-1024,3306,top-100 или all '
+                             '(по умолчанию популярные)')
+    parser.add_argument('--banners', action='store_true',
+                        help='ip/scan: читать баннеры открытых портов и определять службы')
+    parser.add_argument('--listen', metavar='HOST:PORT',
+                        help='daemon: адрес API, хост:порт или unix:/путь (по умолчанию 127.0.0.1:8765)')
+    parser.add_argument('--token-file', metavar='FILE',
+                        help='daemon: файл токена API для TCP '
+                             '(по умолчанию ~/.cache/osint_cli/daemon.token)')
+    parser.add_argument('--queue-size', type=int, default=100,
+                        help='daemon: максимум заданий в очереди (по умолчанию 100)')
+    parser.add_argument('--metrics', choices=FORMATS,
+                        help='Вывести при выходе время этапов и счетчики (HTTP, DNS, сокеты, кэш, ошибки)')
+    parser.add_argument('--metrics-file', metavar='FILE',
+                        help='Файл для --metrics вместо stderr')
+    parser.add_argument('--profile', metavar='FILE',
+                        help='Профилировать запуск cProfile: отчет по горячим функциям '
+                             '(FILE.prof - двоичная статистика для pstats)')
+    parser.add_argument('--http-timeout', type=float, nargs=2, metavar=('CONNECT', 'READ'),
+                        help='Таймауты HTTP-запросов в секундах (по умолчанию 5 15)')
+    parser.add_argument('--retries', type=int,
+                        help='Повторов HTTP-запроса при 429/5xx и сбоях сети (по умолчанию 3)')
     
     args = parser.parse_args()
+    if not args.target and not args.targets_file and args.command != 'daemon':
+        parser.error("укажите цель или --targets-file")
+    if args.workers < 1:
+        parser.error("--workers должен быть положительным")
+    if args.cache_only and args.refresh:
+        parser.error("--cache-only и --refresh несовместимы")
+    if args.crawl and args.command != 'website':
+        parser.error("--crawl применим только к команде website")
+    if args.crawl_workers < 1 or args.max_pages < 1 or args.depth < 0:
+        parser.error("--crawl-workers и --max-pages должны быть положительными, --depth - неотрицательным")
     
-    tool = OSINTTool()
-    tool.print_banner()
+    if args.resume and args.command != 'scan':
+        parser.error("--resume применим только к команде scan")
+    if args.processes < 1:
+        parser.error("--processes должен быть положительным")
+    if (args.cdx_workers is not None and args.cdx_workers < 1) or (
+            args.cdx_rate is not None and args.cdx_rate <= 0):
+        parser.error("--cdx-workers и --cdx-rate должны быть положительными")
+    if args.ports:
+        try:
+            from osint_scan import parse_ports
+            parse_ports(args.ports)
+        except ValueError as e:
+            parser.error(f"--ports: {e}")
     
-    if args.command == 'domain':
-        tool.domain_info(args.target)
+    if args.queue_size < 1:
+        parser.error("--queue-size должен быть положительным")
+    
+    # Метод и параметры, которые получает выбранная команда
+    method = COMMANDS.get(args.command)
+    options = {}
+    pool_size = args.workers
+    if args.command == 'website':
+        options = {'max_bytes': args.max_bytes, 'max_time': args.max_time}
+        if args.crawl:
+            method = 'website_crawl'
+            options.update(depth=args.depth, max_pages=args.max_pages,
+                           crawl_workers=args.crawl_workers)
+            # Соединений в пуле хватает на все загрузки всех воркеров
+            pool_size = max(pool_size, args.workers * args.crawl_workers)
+    elif args.command == 'wayback':
+        options = {'output': args.output, 'checkpoint': args.checkpoint,
+                   'cdx_workers': args.cdx_workers, 'cdx_rate': args.cdx_rate}
+    elif args.command == 'scan':
+        options = {'exclude': args.exclude, 'randomize': args.random, 'seed': args.seed,
+                   'concurrency': args.concurrency, 'timeout': args.scan_timeout,
+                   'adaptive': not args.fixed_timeout, 'liveness': args.ping,
+                   'ports': args.ports, 'banners': args.banners,
+                   'checkpoint': args.checkpoint, 'resume': args.resume,
+                   'processes': args.processes}
     elif args.command == 'ip':
-        tool.ip_info(args.target)
-    elif args.command == 'email':
-        tool.email_analysis(args.target)
-    elif args.command == 'social':
-        tool.social_media_search(args.target)
-    elif args.command == 'website':
-        tool.website_analysis(args.target)
-    elif args.command == 'breach':
-        tool.breach_check(args.target)
+        options = {'ports': args.ports, 'banners': args.banners}
+    elif args.command == 'geoindex':
+        options = {'geo_db': args.geo_db}
     elif args.command == 'subdomains':
-        tool.subdomain_enumeration(args.target)
-    elif args.command == 'metadata':
-        tool.metadata_extraction(args.target)
+        options = {'wordlist': args.wordlist, 'concurrency': args.concurrency,
+                   'nameserver': args.nameserver}
+    
+    def open_cache():
+        from osint_cache import ResponseCache
+        return ResponseCache(args.cache_path, cache_only=args.cache_only, refresh=args.refresh)
+    
+    # Метрики и профилировщик включаются до первого обращения к сети
+    metrics = enable_metrics() if args.metrics else None
+    profiler = None
+    if args.profile:
+        profiler = Profiler()
+        profiler.start()
+    
+    # Кэш на диске открывается, только если он нужен команде
+    tool = OSINTTool(pool_size=pool_size, cache=open_cache, catalog=args.catalog,
+                     signatures=args.signatures,
+                     timeout=tuple(args.http_timeout) if args.http_timeout else None,
+                     retries=args.retries, geo_url=args.ip_api_url,
+                     geo_db=args.geo_db if args.command == 'ip' else None,
+                     nameserver=args.nameserver, cdx_url=args.cdx_url)
+    tool.print_banner()
+    
+    try:
+        if args.command == 'daemon':
+            serve_daemon(tool, args.listen, args.workers, args.queue_size, args.catalog,
+                         args.token_file)
+        elif args.targets_file:
+            start = time.time()
+            targets = iter_targets(args.targets_file)
+            if args.command == 'ip':
+                targets = tool.prefetch_geolocation(targets)
+            processed = run_batch(tool, method, targets, args.workers, args.order, options)
+            tool.print_info(f"Обработано целей: {processed} за {time.time() - start:.1f} с")
+            # Статистика только тех компонентов, которые команда успела создать
+            if 'dns' in tool._lazy_values:
+                stats = tool.dns.stats()
+                tool.print_info(f"DNS кэш: попаданий {stats['hits']}, промахов {stats['misses']}, "
+                                f"объединено запросов {stats['coalesced']}")
+            tool.print_http_stats()
+            if 'geo' in tool._lazy_values and tool.geo.batches:
+                tool.print_info(f"Геолокация: пакетных запросов {tool.geo.batches}, "
+                                f"повторных адресов без запроса {tool.geo.deduplicated}")
+        else:
+            getattr(tool, method)(args.target, **options)
+    finally:
+        # Отчеты пишутся и после ошибки или Ctrl+C
+        if profiler:
+            profiler.stop()
+            profiler.write_report(args.profile)
+            tool.print_info(f"Профиль записан в {args.profile}")
+        if metrics:
+            metrics.write(args.metrics, args.metrics_file)
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
@@ -0,0 +1,246 @@
+#!/usr/bin/env python3
+"""
+Обход сайта для OSINT CLI Helper
+Параллельный обход в ширину по ссылкам того же сайта с лимитом
+глубины и числа страниц; каждая страница проходит анализ технологий
+и извлечение сущностей, результаты сводятся по всему сайту
+"""
+
+import hashlib
+import math
+import re
+import sys
+import time
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+from urllib.parse import urljoin, urldefrag, urlparse
+
+from osint_entities import KINDS
+from osint_stream import RegexStreamScanner
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+# Ссылки из атрибутов href и src
+LINK_PATTERN = re.compile(r'''(?:href|src)\s*=\s*["']?([^"'\s<>#]+)''', re.IGNORECASE)
+
+# Расширения, которые точно не являются HTML-страницами
+SKIP_EXTENSIONS = {
+    '.jpg', '.jpeg', '.png', '.gif', '.webp', '.svg', '.ico', '.bmp', '.css', '.js',
+    '.pdf', '.zip', '.gz', '.tar', '.rar', '.7z', '.exe', '.dmg', '.iso', '.mp3',
+    '.mp4', '.avi', '.mov', '.webm', '.woff', '.woff2', '.ttf', '.eot', '.xml', '.json'
+}
+
+# Ожидаемое число URL и доля ложных срабатываний фильтра по умолчанию
+DEFAULT_CAPACITY = 100000
+DEFAULT_ERROR_RATE = 0.001
+
+
+class BloomFilter:
+    """Фильтр Блума: множество URL в фиксированном объеме памяти.
+
+    Ложное срабатывание означает лишь пропуск страницы, поэтому
+    вместо множества строк хранится битовый массив.
+    """
+
+    def __init__(self, capacity=DEFAULT_CAPACITY, error_rate=DEFAULT_ERROR_RATE):
+        self.capacity = capacity
+        self.bits = max(8, int(-capacity * math.log(error_rate) / math.log(2) ** 2))
+        self.hashes = max(1, round(self.bits / capacity * math.log(2)))
+        self.array = bytearray((self.bits + 7) // 8)
+        self.count = 0
+
+    def _positions(self, item):
+        # Двойное хеширование: k позиций из двух половин одного дайджеста
+        digest = hashlib.blake2b(item.encode('utf-8'), digest_size=16).digest()
+        first = int.from_bytes(digest[:8], 'little')
+        second = int.from_bytes(digest[8:], 'little') | 1
+        return [(first + i * second) % self.bits for i in range(self.hashes)]
+
+    def __contains__(self, item):
+        return all(self.array[p >> 3] & (1 << (p & 7)) for p in self._positions(item))
+
+    def add(self, item):
+        """Добавить элемент; True, если его еще не было"""
+        new = False
+        for p in self._positions(item):
+            mask = 1 << (p & 7)
+            if not self.array[p >> 3] & mask:
+                self.array[p >> 3] |= mask
+                new = True
+        if new:
+            self.count += 1
+        return new
+
+    @property
+    def nbytes(self):
+        return len(self.array)
+
+
+class LinkScanner:
+    """Потоковый сбор ссылок страницы"""
+
+    def __init__(self, limit=1000):
+        self.limit = limit
+        self.links = []
+        self._stream = RegexStreamScanner(LINK_PATTERN, overlap=2048, on_match=self._on_match)
+
+    def feed(self, text):
+        self._stream.feed(text)
+
+    def finish(self):
+        self._stream.finish()
+
+    def _on_match(self, match, offset):
+        if len(self.links) < self.limit:
+            self.links.append(match.group(1))
+
+
+def normalize_url(url):
+    """URL без фрагмента, с хостом в нижнем регистре и путем '/' по умолчанию"""
+    url, _ = urldefrag(url)
+    parsed = urlparse(url)
+    return parsed._replace(netloc=parsed.netloc.lower(), path=parsed.path or '/').geturl()
+
+
+def peak_rss():
+    """Пиковый объем памяти процесса в байтах или None"""
+    if resource is None:
+        return None
+    usage = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # macOS отдает байты, Linux и BSD - килобайты
+    return usage if sys.platform == 'darwin' else usage * 1024
+
+
+class Frontier:
+    """Очередь обхода (URL, глубина) с учетом занятой памяти.
+
+    Считаются сам deque, кортежи и строки URL; фильтр Блума - отдельно.
+    """
+
+    def __init__(self):
+        self._queue = deque()
+        # Кортежи и строки в очереди, байт
+        self._items_bytes = 0
+        self.peak_bytes = 0
+        self.peak_length = 0
+
+    def __len__(self):
+        return len(self._queue)
+
+    @property
+    def nbytes(self):
+        return sys.getsizeof(self._queue) + self._items_bytes
+
+    def append(self, url, depth):
+        item = (url, depth)
+        self._queue.append(item)
+        self._items_bytes += sys.getsizeof(item) + sys.getsizeof(url)
+        self.peak_bytes = max(self.peak_bytes, self.nbytes)
+        self.peak_length = max(self.peak_length, len(self._queue))
+
+    def popleft(self):
+        item = self._queue.popleft()
+        self._items_bytes -= sys.getsizeof(item) + sys.getsizeof(item[0])
+        return item
+
+
+class SiteCrawler:
+    """Параллельный обход сайта в ширину.
+
+    analyzer - объект с методом analyze_page (OSINTTool): пул соединений
+    его сессии переиспользуется всеми потоками обхода.
+    """
+
+    def __init__(self, analyzer, workers=8, max_depth=2, max_pages=100,
+                 max_bytes=None, max_time=None, capacity=DEFAULT_CAPACITY):
+        self.analyzer = analyzer
+        self.workers = workers
+        self.max_depth = max_depth
+        self.max_pages = max_pages
+        self.limits = {}
+        if max_bytes is not None:
+            self.limits['max_bytes'] = max_bytes
+        if max_time is not None:
+            self.limits['max_time'] = max_time
+        self.seen = BloomFilter(max(capacity, max_pages * 10))
+
+    def _origin(self, url):
+        parsed = urlparse(url)
+        return parsed.scheme, parsed.netloc.lower()
+
+    def _fetch(self, url):
+        links = LinkScanner()
+        try:
+            page = self.analyzer.analyze_page(url, consumers=[links], html_only=True, **self.limits)
+        except Exception as e:
+            return {'url': url, 'error': str(e)}, []
+        return page, links.links
+
+    def _enqueue(self, base, links, depth, origin, frontier):
+        for link in links:
+            url = normalize_url(urljoin(base, link.strip()))
+            if self._origin(url) != origin:
+                continue
+            extension = urlparse(url).path.rsplit('/', 1)[-1]
+            if '.' in extension and '.' + extension.rsplit('.', 1)[-1].lower() in SKIP_EXTENSIONS:
+                continue
+            if self.seen.add(url):
+                frontier.append(url, depth)
+
+    def crawl(self, start_url, on_page=None):
+        """Обход сайта; on_page(page, depth) вызывается по мере готовности страниц"""
+        start_url = normalize_url(start_url)
+        origin = self._origin(start_url)
+        self.seen.add(start_url)
+        frontier = Frontier()
+        frontier.append(start_url, 0)
+        technologies = set()
+        entities = {kind: {} for kind in KINDS}
+        pages = errors = submitted = 0
+        started = time.monotonic()
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = {}
+            while frontier or running:
+                # Очередь заданий не больше числа потоков: лимит страниц соблюдается точно
+                while frontier and len(running) < self.workers and submitted < self.max_pages:
+                    url, depth = frontier.popleft()
+                    running[executor.submit(self._fetch, url)] = depth
+                    submitted += 1
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    depth = running.pop(future)
+                    page, links = future.result()
+                    if on_page:
+                        on_page(page, depth)
+                    if 'error' in page:
+                        errors += 1
+                        continue
+                    if page['skipped']:
+                        continue
+                    pages += 1
+                    technologies.update(page['technologies'])
+                    for kind, found in page['entities'].items():
+                        for entity in found:
+                            entities[kind].setdefault(entity.value, entity)
+                    if depth < self.max_depth:
+                        # Ссылки считаются от конечного URL после редиректов
+                        self._enqueue(page['final_url'], links, depth + 1, origin, frontier)
+        elapsed = time.monotonic() - started
+        return {
+            'pages': pages,
+            'errors': errors,
+            'seen': self.seen.count,
+            'technologies': sorted(technologies),
+            'entities': {kind: list(found.values()) for kind, found in entities.items()},
+            'elapsed': elapsed,
+            'pages_per_second': pages / elapsed if elapsed else 0.0,
+            'filter_bytes_per_10k': self.seen.nbytes / self.seen.capacity * 10000,
+            'frontier_peak_bytes': frontier.peak_bytes,
+            'frontier_peak_urls': frontier.peak_length,
+            'peak_rss': peak_rss(),
+        }
@@ -0,0 +1,540 @@
+#!/usr/bin/env python3
+"""
+Режим демона для OSINT CLI Helper
+Один процесс держит прогретые сессии, пулы соединений и кэши и выполняет
+задания, поступающие через локальный HTTP/JSON API (TCP или Unix-сокет).
+Задания ставятся в ограниченную очередь и выполняются пулом потоков;
+вывод задания можно запрашивать по частям или читать потоком.
+TCP API требует токен (Authorization: Bearer), Unix-сокет доступен
+только владельцу
+"""
+
+import hmac
+import itertools
+import json
+import os
+import queue
+import re
+import secrets
+import socket
+import socketserver
+import threading
+import time
+from collections import OrderedDict
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from osint_metrics import get_metrics
+
+DEFAULT_LISTEN = '127.0.0.1:8765'
+DEFAULT_WORKERS = 4
+DEFAULT_QUEUE_SIZE = 100
+
+# Сколько завершенных заданий хранить вместе с выводом
+MAX_FINISHED_JOBS = 1000
+
+# Предел ожидания нового вывода при опросе (секунды)
+MAX_WAIT = 30.0
+
+# Предельный размер тела запроса
+MAX_REQUEST_BYTES = 64 * 1024
+
+# Адреса, при прослушивании которых заголовок Host проверяется на совпадение
+LOOPBACK_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+QUEUED = 'queued'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+CANCELLED = 'cancelled'
+
+_ANSI_RE = re.compile(r'\x1b\[[0-9;]*[A-Za-z]')
+
+
+def strip_ansi(text):
+    """Вывод без цветовых escape-последовательностей"""
+    return _ANSI_RE.sub('', text)
+
+
+def default_token_path():
+    """Файл токена API: ~/.cache/osint_cli/daemon.token (или в XDG_CACHE_HOME)"""
+    base = os.environ.get('XDG_CACHE_HOME') or os.path.join(os.path.expanduser('~'), '.cache')
+    return os.path.join(base, 'osint_cli', 'daemon.token')
+
+
+def new_token():
+    """Случайный токен API"""
+    return secrets.token_urlsafe(32)
+
+
+def write_token(path, token):
+    """Записать токен в файл с правами 0600"""
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    # Старый файл удаляется: O_TRUNC сохранил бы его права
+    if os.path.exists(path):
+        os.remove(path)
+    fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o600)
+    with os.fdopen(fd, 'w') as f:
+        f.write(token + '\n')
+
+
+class Job:
+    """Задание: команда, цель, параметры и накопленный вывод.
+
+    Объект служит буфером ThreadOutput: все, что печатает команда
+    в потоке исполнителя, дописывается в вывод задания.
+    """
+
+    def __init__(self, job_id, command, target, options):
+        self.id = job_id
+        self.command = command
+        self.target = target
+        self.options = options
+        self.status = QUEUED
+        self.error = None
+        self.created = time.time()
+        self.started = None
+        self.finished = None
+        self._chunks = []
+        self._size = 0
+        self._cond = threading.Condition()
+
+    def write(self, text):
+        with self._cond:
+            self._chunks.append(text)
+            self._size += len(text)
+            self._cond.notify_all()
+        return len(text)
+
+    def getvalue(self):
+        with self._cond:
+            return ''.join(self._chunks)
+
+    @property
+    def active(self):
+        return self.status in (QUEUED, RUNNING)
+
+    def set_status(self, status, error=None):
+        with self._cond:
+            self.status = status
+            self.error = error
+            if status == RUNNING:
+                self.started = time.time()
+            elif status != QUEUED:
+                self.finished = time.time()
+            self._cond.notify_all()
+
+    def read(self, offset=0, wait=0):
+        """Вывод начиная с offset; wait - ждать нового вывода или завершения.
+
+        Возвращает (текст, новое смещение, задание завершено).
+        """
+        deadline = time.monotonic() + wait
+        with self._cond:
+            while self._size <= offset and self.active:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            if len(self._chunks) > 1:
+                self._chunks = [''.join(self._chunks)]
+            text = self._chunks[0][offset:] if self._chunks else ''
+            return text, offset + len(text), not self.active
+
+    def to_dict(self):
+        finished = self.finished or time.time()
+        return {
+            'id': self.id,
+            'command': self.command,
+            'target': self.target,
+            'options': self.options,
+            'status': self.status,
+            'error': self.error,
+            'created': self.created,
+            'elapsed': round(finished - self.started, 3) if self.started else None,
+            'output_size': self._size,
+        }
+
+
+class JobManager:
+    """Очередь заданий и пул потоков-исполнителей.
+
+    handlers - словарь команда -> функция(target, **options);
+    allowed_options - словарь команда -> имена параметров, которые можно
+    передать от клиента (остальные отклоняются);
+    router - ThreadOutput, установленный вместо sys.stdout.
+    """
+
+    def __init__(self, handlers, router, allowed_options, workers=DEFAULT_WORKERS,
+                 queue_size=DEFAULT_QUEUE_SIZE, max_finished=MAX_FINISHED_JOBS):
+        self.handlers = handlers
+        self.allowed_options = allowed_options
+        self.router = router
+        self.max_finished = max_finished
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._jobs = OrderedDict()
+        self._lock = threading.Lock()
+        self._ids = itertools.count(1)
+        self.started = time.time()
+        self.completed = 0
+        self.rejected = 0
+        self._threads = []
+        for number in range(max(1, workers)):
+            thread = threading.Thread(target=self._work, name=f'osint-job-{number}', daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def _check_options(self, command, options):
+        """Параметры вне списка разрешенных отклоняются до постановки в очередь"""
+        allowed = self.allowed_options.get(command, ())
+        unknown = [name for name in options if name not in allowed]
+        if unknown:
+            raise ValueError(f"Недопустимые параметры команды {command}: {', '.join(unknown)}")
+
+    def submit(self, command, target, options=None):
+        """Поставить задание в очередь; queue.Full - очередь заполнена"""
+        if command not in self.handlers:
+            raise ValueError(f"Неизвестная команда: {command}")
+        if not isinstance(target, str) or not target.strip():
+            raise ValueError("Не указана цель")
+        options = options or {}
+        if not isinstance(options, dict):
+            raise ValueError("options должен быть объектом JSON")
+        self._check_options(command, options)
+        job = Job(f"{next(self._ids):06d}", command, target.strip(), options)
+        with self._lock:
+            self._jobs[job.id] = job
+        try:
+            self._queue.put_nowait(job)
+        except queue.Full:
+            with self._lock:
+                del self._jobs[job.id]
+            self.rejected += 1
+            raise
+        return job
+
+    def get(self, job_id):
+        with self._lock:
+            return self._jobs.get(job_id)
+
+    def jobs(self):
+        with self._lock:
+            return list(self._jobs.values())
+
+    def cancel(self, job_id):
+        """Отменить задание в очереди или удалить завершенное; False - задание выполняется"""
+        job = self.get(job_id)
+        if job is None or job.status == RUNNING:
+            return False
+        if job.status == QUEUED:
+            job.set_status(CANCELLED)
+        else:
+            with self._lock:
+                self._jobs.pop(job_id, None)
+        return True
+
+    def _forget_finished(self):
+        """Вытеснение самых старых завершенных заданий сверх лимита"""
+        with self._lock:
+            finished = [job_id for job_id, job in self._jobs.items() if not job.active]
+            for job_id in finished[:max(0, len(finished) - self.max_finished)]:
+                del self._jobs[job_id]
+
+    def _work(self):
+        while True:
+            job = self._queue.get()
+            if job is None:
+                return
+            if job.status == CANCELLED:
+                continue
+            job.set_status(RUNNING)
+            self.router.capture(job)
+            try:
+                self.handlers[job.command](job.target, **job.options)
+            except Exception as e:
+                self.router.release()
+                job.set_status(FAILED, f"{type(e).__name__}: {e}")
+            else:
+                self.router.release()
+                job.set_status(DONE)
+            self.completed += 1
+            self._forget_finished()
+
+    def stats(self):
+        jobs = self.jobs()
+        return {
+            'uptime': round(time.time() - self.started, 1),
+            'workers': len(self._threads),
+            'queued': sum(1 for job in jobs if job.status == QUEUED),
+            'running': sum(1 for job in jobs if job.status == RUNNING),
+            'completed': self.completed,
+            'rejected': self.rejected,
+            'queue_size': self._queue.maxsize,
+        }
+
+    def close(self):
+        for _ in self._threads:
+            self._queue.put(None)
+
+
+class DaemonHandler(BaseHTTPRequestHandler):
+    """HTTP API демона.
+
+    Каждый запрос проверяется: Host (при прослушивании loopback-адреса) и
+    токен в Authorization: Bearer (для TCP); POST принимает только
+    Content-Type: application/json. Так страница в браузере не может ни
+    отправить задание (CSRF), ни прочитать ответ через DNS rebinding.
+
+    GET  /health, /commands, /jobs
+    GET  /metrics              ?format=json - метрики (демон запущен с --metrics)
+    POST /jobs                 {"command", "target", "options"}
+    GET  /jobs/<id>            ?offset=N&wait=S&plain=1 - состояние и вывод
+    GET  /jobs/<id>/stream     ?plain=1 - вывод потоком до завершения задания
+    DELETE /jobs/<id>          отмена задания в очереди или удаление завершенного
+    """
+
+    protocol_version = 'HTTP/1.1'
+    server_version = 'osint-daemon/1.0'
+
+    @property
+    def manager(self):
+        return self.server.manager
+
+    def log_message(self, format, *args):
+        # Запросы не логируются: stdout демона занят выводом заданий
+        pass
+
+    def _send_json(self, status, payload, headers=None):
+        body = json.dumps(payload, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _error(self, status, message, headers=None):
+        self._send_json(status, {'error': message}, headers)
+
+    def _route(self):
+        url = urlparse(self.path)
+        parts = [part for part in url.path.split('/') if part]
+        query = {name: values[-1] for name, values in parse_qs(url.query).items()}
+        return parts, query
+
+    def _check_access(self):
+        """Проверка Host и токена; False - ответ с ошибкой уже отправлен"""
+        allowed_hosts = self.server.allowed_hosts
+        if allowed_hosts is not None and (self.headers.get('Host') or '').lower() not in allowed_hosts:
+            self._error(403, "Недопустимый заголовок Host")
+            return False
+        token = self.server.token
+        if token is not None:
+            scheme, _, value = (self.headers.get('Authorization') or '').partition(' ')
+            if scheme.lower() != 'bearer' or not hmac.compare_digest(value.strip().encode(),
+                                                                     token.encode()):
+                self._error(401, "Нужен токен API: Authorization: Bearer <токен>",
+                            {'WWW-Authenticate': 'Bearer'})
+                return False
+        return True
+
+    def _read_body(self):
+        """Тело запроса; None - ответ с ошибкой уже отправлен"""
+        try:
+            length = int(self.headers.get('Content-Length') or 0)
+        except ValueError:
+            length = -1
+        if not 0 <= length <= MAX_REQUEST_BYTES:
+            # Тело не прочитано: после ответа соединение закрывается
+            self.close_connection = True
+            if length < 0:
+                self._error(400, "Неверный Content-Length")
+            else:
+                self._error(413, "Слишком большой запрос")
+            return None
+        return self.rfile.read(length)
+
+    def _job(self, job_id):
+        job = self.manager.get(job_id)
+        if job is None:
+            self._error(404, f"Задание {job_id} не найдено")
+        return job
+
+    def do_GET(self):
+        if not self._check_access():
+            return
+        parts, query = self._route()
+        if parts == ['health']:
+            stats = self.manager.stats()
+            stats.update(self.server.extra_stats())
+            return self._send_json(200, dict(status='ok', **stats))
+        if parts == ['commands']:
+            return self._send_json(200, {'commands': sorted(self.manager.handlers)})
+        if parts == ['metrics']:
+            return self._metrics(query.get('format', 'prometheus'))
+        if parts == ['jobs']:
+            return self._send_json(200, {'jobs': [job.to_dict() for job in self.manager.jobs()]})
+        if len(parts) in (2, 3) and parts[0] == 'jobs':
+            job = self._job(parts[1])
+            if job is None:
+                return
+            plain = query.get('plain') in ('1', 'true')
+            if len(parts) == 3 and parts[2] == 'stream':
+                return self._stream(job, plain)
+            if len(parts) == 2:
+                try:
+                    offset = max(0, int(query.get('offset', 0)))
+                    wait = min(MAX_WAIT, max(0.0, float(query.get('wait', 0))))
+                except ValueError:
+                    return self._error(400, "offset и wait должны быть числами")
+                text, offset, _ = job.read(offset, wait)
+                payload = job.to_dict()
+                payload.update(output=strip_ansi(text) if plain else text, offset=offset)
+                return self._send_json(200, payload)
+        self._error(404, "Неизвестный путь")
+
+    def _metrics(self, fmt):
+        metrics = get_metrics()
+        if metrics is None:
+            return self._error(404, "Метрики не включены: запустите демон с --metrics")
+        if fmt == 'json':
+            return self._send_json(200, metrics.snapshot())
+        body = metrics.to_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _stream(self, job, plain):
+        """Вывод задания chunked-ответом, пока задание не завершится"""
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; charset=utf-8')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.send_header('X-Job-Id', job.id)
+        self.end_headers()
+        offset = 0
+        finished = False
+        try:
+            while not finished:
+                text, offset, finished = job.read(offset, MAX_WAIT)
+                if plain:
+                    text = strip_ansi(text)
+                if text:
+                    data = text.encode('utf-8')
+                    self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n")
+                    self.wfile.flush()
+            trailer = f"\n[{job.status}]" + (f" {job.error}" if job.error else '') + "\n"
+            data = trailer.encode('utf-8')
+            self.wfile.write(f"{len(data):x}\r\n".encode() + data + b"\r\n0\r\n\r\n")
+        except (BrokenPipeError, ConnectionResetError):
+            # Клиент отключился: задание продолжает выполняться
+            self.close_connection = True
+
+    def do_POST(self):
+        # Тело читается до любого ответа, иначе следующий запрос keep-alive
+        # начнется с его остатка
+        body = self._read_body()
+        if body is None or not self._check_access():
+            return
+        parts, _ = self._route()
+        if parts != ['jobs']:
+            return self._error(404, "Неизвестный путь")
+        content_type = (self.headers.get('Content-Type') or '').split(';')[0].strip().lower()
+        if content_type != 'application/json':
+            return self._error(415, "Ожидается Content-Type: application/json")
+        try:
+            request = json.loads(body or b'{}')
+            if not isinstance(request, dict):
+                raise ValueError("ожидается объект JSON")
+            job = self.manager.submit(request.get('command'), request.get('target'),
+                                      request.get('options'))
+        except queue.Full:
+            return self._error(503, "Очередь заданий заполнена", {'Retry-After': '1'})
+        except ValueError as e:
+            return self._error(400, str(e))
+        self._send_json(202, job.to_dict(), {'Location': f"/jobs/{job.id}"})
+
+    def do_DELETE(self):
+        if not self._check_access():
+            return
+        parts, _ = self._route()
+        if len(parts) != 2 or parts[0] != 'jobs':
+            return self._error(404, "Неизвестный путь")
+        job = self._job(parts[1])
+        if job is None:
+            return
+        if not self.manager.cancel(job.id):
+            return self._error(409, "Задание выполняется и не может быть отменено")
+        self._send_json(200, job.to_dict())
+
+
+class _DaemonServerMixin:
+    daemon_threads = True
+
+    def extra_stats(self):
+        return self.stats_callback() if self.stats_callback else {}
+
+
+class DaemonHTTPServer(_DaemonServerMixin, ThreadingHTTPServer):
+    pass
+
+
+class DaemonHTTP6Server(DaemonHTTPServer):
+    """HTTP API на IPv6-адресе ([::1]:порт)"""
+    address_family = socket.AF_INET6
+
+
+if hasattr(socketserver, 'UnixStreamServer'):
+    class DaemonUnixServer(_DaemonServerMixin, socketserver.ThreadingMixIn,
+                           socketserver.UnixStreamServer):
+        """HTTP API поверх Unix-сокета: доступ ограничен правами на файл"""
+
+        def get_request(self):
+            request, _ = super().get_request()
+            # BaseHTTPRequestHandler ожидает адрес клиента в виде (хост, порт)
+            return request, ('unix', 0)
+else:
+    DaemonUnixServer = None
+
+
+def create_server(listen, manager, stats_callback=None, token=None):
+    """Сервер API: 'хост:порт' или 'unix:/путь/к/сокету'.
+
+    Для TCP нужен token: запросы без него отклоняются. Unix-сокет создается
+    сразу с правами 0600, токен для него не требуется.
+    """
+    allowed_hosts = None
+    if listen.startswith('unix:'):
+        if DaemonUnixServer is None:
+            raise ValueError("Unix-сокеты не поддерживаются на этой платформе")
+        path = listen[5:]
+        if os.path.exists(path):
+            os.remove(path)
+        # umask на время bind: сокет ни на миг не бывает доступен другим пользователям
+        umask = os.umask(0o177)
+        try:
+            server = DaemonUnixServer(path, DaemonHandler)
+        finally:
+            os.umask(umask)
+        token = None
+    else:
+        host, _, port = listen.rpartition(':')
+        if not port.isdigit():
+            raise ValueError(f"Неверный адрес: {listen} (ожидается хост:порт или unix:/путь)")
+        if not token:
+            raise ValueError("Для TCP-адреса нужен токен API")
+        host = (host or '127.0.0.1').strip('[]')
+        server_class = DaemonHTTP6Server if ':' in host else DaemonHTTPServer
+        server = server_class((host, int(port)), DaemonHandler)
+        if host in LOOPBACK_HOSTS:
+            # Защита от DNS rebinding: имя в Host должно указывать на loopback
+            allowed_hosts = {f"{name}:{port}" for name in ('127.0.0.1', 'localhost', '[::1]')}
+    server.manager = manager
+    server.stats_callback = stats_callback
+    server.token = token
+    server.allowed_hosts = allowed_hosts
+    return server
@@ -0,0 +1,275 @@
+#!/usr/bin/env python3
+"""
+DNS-модуль для OSINT CLI Helper
+Общий кэш DNS-ответов с учетом TTL, негативным кэшированием
+и объединением одинаковых параллельных запросов
+"""
+
+import asyncio
+import random
+import string
+import sys
+import threading
+import time
+
+import dns.asyncresolver
+import dns.exception
+import dns.rdatatype
+import dns.resolver
+
+from osint_metrics import count, observe
+
+# TTL негативного ответа, если в ответе нет SOA
+DEFAULT_NEGATIVE_TTL = 60
+
+# Список популярных поддоменов (словарь по умолчанию)
+COMMON_SUBDOMAINS = [
+    'www', 'mail', 'ftp', 'admin', 'blog', 'dev', 'test', 'staging',
+    'api', 'cdn', 'static', 'img', 'images', 'media', 'files',
+    'support', 'help', 'docs', 'wiki', 'forum', 'shop', 'store',
+    'app', 'mobile', 'web', 'secure', 'login', 'portal', 'dashboard'
+]
+
+# Сколько случайных меток проверять при поиске wildcard DNS
+WILDCARD_PROBES = 3
+
+
+class DNSCache:
+    """Кэш DNS-ответов поверх dns.resolver.Resolver"""
+
+    def __init__(self, resolver=None, max_entries=10000, negative_ttl=DEFAULT_NEGATIVE_TTL):
+        self.resolver = resolver or dns.resolver.Resolver()
+        self.max_entries = max_entries
+        self.negative_ttl = negative_ttl
+        # (имя, тип) -> (момент истечения, ответ, исключение)
+        self._entries = {}
+        # (имя, тип) -> событие завершения запроса в полете
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.negative_hits = 0
+        self.coalesced = 0
+
+    def resolve(self, qname, rdtype='A'):
+        """Разрешение имени с кэшем, интерфейс как у dns.resolver.resolve"""
+        key = (str(qname).lower().rstrip('.'), str(rdtype).upper())
+        waited = False
+        while True:
+            with self._lock:
+                entry = self._entries.get(key)
+                if entry and entry[0] > time.monotonic():
+                    if not waited:
+                        self.hits += 1
+                        count('dns.cache_hits')
+                        if entry[2] is not None:
+                            self.negative_hits += 1
+                    if entry[2] is not None:
+                        raise entry[2].with_traceback(None)
+                    return entry[1]
+                event = self._inflight.get(key)
+                if event is None:
+                    event = self._inflight[key] = threading.Event()
+                    self.misses += 1
+                    break
+                self.coalesced += 1
+            # Такой же запрос уже выполняется в другом потоке - ждем его результат
+            event.wait()
+            waited = True
+
+        count('dns.queries')
+        started = time.perf_counter()
+        failed = True
+        try:
+            answer = self.resolver.resolve(qname, rdtype)
+            failed = False
+            ttl = max(0, answer.expiration - time.time())
+            self._store(key, ttl, answer, None)
+            return answer
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer) as e:
+            # Отрицательный ответ - тоже ответ сервера, не ошибка
+            failed = False
+            self._store(key, self._negative_ttl(e), None, e)
+            raise
+        finally:
+            observe('dns', time.perf_counter() - started, failed)
+            with self._lock:
+                del self._inflight[key]
+            event.set()
+
+    def _negative_ttl(self, error):
+        """TTL негативного ответа: минимум SOA из секции authority"""
+        try:
+            if isinstance(error, dns.resolver.NXDOMAIN):
+                responses = list(error.responses().values())
+            else:
+                responses = [error.response()]
+        except (KeyError, AttributeError, TypeError):
+            responses = []
+        for response in responses:
+            for rrset in getattr(response, 'authority', []):
+                if rrset.rdtype == dns.rdatatype.SOA:
+                    return min(rrset.ttl, rrset[0].minimum)
+        return self.negative_ttl
+
+    def _store(self, key, ttl, answer, error):
+        """Сохранение записи с вытеснением устаревших и самых старых"""
+        with self._lock:
+            if len(self._entries) >= self.max_entries:
+                now = time.monotonic()
+                for old_key in [k for k, v in self._entries.items() if v[0] <= now]:
+                    del self._entries[old_key]
+                while len(self._entries) >= self.max_entries:
+                    del self._entries[next(iter(self._entries))]
+            self._entries[key] = (time.monotonic() + ttl, answer, error)
+
+    def stats(self):
+        """Счетчики кэша"""
+        with self._lock:
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'negative_hits': self.negative_hits,
+                'coalesced': self.coalesced,
+                'entries': len(self._entries),
+            }
+
+
+_shared_cache = None
+_shared_lock = threading.Lock()
+
+
+def get_shared_cache():
+    """Общий для всего процесса экземпляр DNSCache"""
+    global _shared_cache
+    with _shared_lock:
+        if _shared_cache is None:
+            _shared_cache = DNSCache()
+        return _shared_cache
+
+
+def iter_wordlist(path):
+    """Потоковое чтение словаря поддоменов без загрузки в память"""
+    with open(path, encoding='utf-8', errors='ignore') as f:
+        for line in f:
+            label = line.strip().lower().rstrip('.')
+            if label and not label.startswith('#'):
+                yield label
+
+
+def parse_nameserver(value):
+    """Разбор адреса DNS-сервера вида IP или IP:PORT"""
+    if value.count(':') == 1:
+        host, port = value.split(':')
+        return host, int(port)
+    return value, 53
+
+
+def create_resolver(nameserver):
+    """Синхронный резолвер с одним DNS-сервером вида IP или IP:PORT"""
+    host, port = parse_nameserver(nameserver)
+    resolver = dns.resolver.Resolver(configure=False)
+    resolver.nameservers = [host]
+    resolver.port = port
+    return resolver
+
+
+class SubdomainBruteForcer:
+    """Асинхронный перебор поддоменов по словарю с обнаружением wildcard DNS"""
+
+    def __init__(self, nameservers=None, port=53, concurrency=500, timeout=2.0, progress=None):
+        if nameservers:
+            self.resolver = dns.asyncresolver.Resolver(configure=False)
+            self.resolver.nameservers = list(nameservers)
+            self.resolver.port = port
+        else:
+            self.resolver = dns.asyncresolver.Resolver()
+        self.resolver.lifetime = timeout
+        self.concurrency = max(1, concurrency)
+        # Прогресс выводим только в интерактивный терминал
+        self.progress = sys.stderr.isatty() if progress is None else progress
+        self.checked = 0
+        self.found = 0
+        self.errors = 0
+
+    async def _resolve(self, name):
+        """Множество A-адресов имени или None, если имя не существует"""
+        count('dns.queries')
+        started = time.perf_counter()
+        failed = False
+        try:
+            answer = await self.resolver.resolve(name, 'A')
+            return {rdata.to_text() for rdata in answer}
+        except (dns.resolver.NXDOMAIN, dns.resolver.NoAnswer):
+            return None
+        except dns.exception.DNSException:
+            self.errors += 1
+            failed = True
+            return None
+        finally:
+            observe('dns', time.perf_counter() - started, failed)
+
+    async def detect_wildcard(self, domain):
+        """Адреса, на которые отвечает catch-all зона (пусто, если wildcard нет)"""
+        labels = [''.join(random.choices(string.ascii_lowercase + string.digits, k=16))
+                  for _ in range(WILDCARD_PROBES)]
+        results = await asyncio.gather(*(self._resolve(f"{label}.{domain}") for label in labels))
+        wildcard = set()
+        for ips in results:
+            if ips:
+                wildcard |= ips
+        return wildcard
+
+    def _report_progress(self, started, final=False):
+        elapsed = max(time.monotonic() - started, 1e-6)
+        sys.stderr.write(f"\rПроверено: {self.checked}  найдено: {self.found}  "
+                         f"скорость: {self.checked / elapsed:.0f} запросов/с ")
+        if final:
+            sys.stderr.write("\n")
+        sys.stderr.flush()
+
+    async def run(self, domain, labels, on_found, on_wildcard=None):
+        """Перебор меток; on_found(name, ips) вызывается для каждого найденного имени"""
+        domain = domain.lower().rstrip('.')
+        wildcard = await self.detect_wildcard(domain)
+        if wildcard and on_wildcard:
+            on_wildcard(wildcard)
+        # Общий итератор: воркеры забирают метки по одной, словарь не читается целиком
+        labels = iter(labels)
+        started = time.monotonic()
+
+        async def worker():
+            for label in labels:
+                name = f"{label}.{domain}"
+                ips = await self._resolve(name)
+                self.checked += 1
+                # Адреса catch-all зоны не считаем находкой
+                if ips and not (ips & wildcard):
+                    self.found += 1
+                    on_found(name, ips)
+
+        async def progress():
+            while True:
+                await asyncio.sleep(1)
+                self._report_progress(started)
+
+        reporter = asyncio.ensure_future(progress()) if self.progress else None
+        try:
+            await asyncio.gather(*(worker() for _ in range(self.concurrency)))
+        finally:
+            if reporter:
+                reporter.cancel()
+                self._report_progress(started, final=True)
+        return wildcard
+
+    def scan(self, domain, labels, on_found=None, on_wildcard=None):
+        """Синхронная обертка: возвращает список (имя, адреса)"""
+        found = []
+
+        def collect(name, ips):
+            found.append((name, ips))
+            if on_found:
+                on_found(name, ips)
+
+        asyncio.run(self.run(domain, labels, collect, on_wildcard))
+        return found
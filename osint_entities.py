@@ -0,0 +1,290 @@
+#!/usr/bin/env python3
+"""
+Извлечение сущностей из текста для OSINT CLI Helper
+Email, телефоны, URL, IP-адреса, профили соцсетей и криптоадреса
+ищутся за одно чтение текста, в том числе потоково: по куску
+проходит отдельное быстрое выражение на каждый тип
+"""
+
+import hashlib
+import heapq
+import ipaddress
+import re
+from collections import namedtuple
+from urllib.parse import urlparse
+
+from osint_stream import RegexStreamScanner
+
+# Найденная сущность: тип, значение, позиция в тексте
+Entity = namedtuple('Entity', 'kind value start end')
+
+# Типы сущностей в порядке вывода
+KINDS = ('email', 'phone', 'url', 'ip', 'social', 'crypto')
+
+# Сколько уникальных значений каждого типа хранить
+DEFAULT_MAX_UNIQUE = 1000
+
+# Максимальная длина URL; она же определяет перекрытие кусков потока
+MAX_URL_LENGTH = 2000
+
+# Соцсети, ссылки на которые считаются профилями
+SOCIAL_HOSTS = {
+    'twitter.com', 'x.com', 'instagram.com', 'facebook.com', 'github.com',
+    'tiktok.com', 'linkedin.com', 't.me', 'vk.com', 'youtube.com'
+}
+
+# Первые сегменты пути, которые не являются именем профиля
+SOCIAL_RESERVED = {
+    'share', 'sharer', 'sharer.php', 'intent', 'home', 'login', 'signup', 'search',
+    'hashtag', 'explore', 'about', 'help', 'privacy', 'legal', 'watch', 'in', 'company',
+    'channel', 'c', 'user', 'p', 'reel', 'dialog', 'plugins', 'tr', 'i', 'embed'
+}
+
+_SOCIAL_DOMAINS = r'(?:twitter|x|instagram|facebook|github|tiktok|linkedin|vk|youtube)\.com|t\.me'
+_SOCIAL_HINT = re.compile(_SOCIAL_DOMAINS, re.IGNORECASE)
+
+# Отдельное выражение на каждый тип, в порядке приоритета: если совпадения
+# разных типов начинаются в одном месте, берется первое. Каждое выражение
+# начинается с символа, по которому re быстро пропускает текст, а проверка
+# границы слова стоит сразу после него. Email и профили соцсетей сначала
+# ищутся по редкому якорю ('@', '.com/'), и только рядом с ним проверяется
+# выражение целиком. needle - подстрока, без которой кусок не просматривается.
+_PASSES = [
+    {'pattern': r'(?P<url>h(?<!\wh)ttps?://[^\s<>"\'`]{1,%d})' % MAX_URL_LENGTH, 'needle': '://'},
+    {'pattern': r'(?P<social>(?<![\w./@-])(?:www\.)?(?:%s)/@?[A-Za-z0-9_.-]{2,64})' % _SOCIAL_DOMAINS,
+     'head': r'(?<![\w./@-])(?:www\.)?(?:%s)/\Z' % _SOCIAL_DOMAINS,
+     'anchor': r'\.(?:com|me)/', 'back': 32},
+    {'pattern': r'(?P<email>(?<![\w.%+-])[A-Za-z0-9._%+-]{1,64}'
+                r'@[A-Za-z0-9-]{1,63}(?:\.[A-Za-z0-9-]{1,63})*\.[A-Za-z]{2,24}\b)',
+     'head': r'(?<![\w.%+-])[A-Za-z0-9._%+-]{1,64}@\Z', 'anchor': r'@(?=[A-Za-z0-9-]{1,63}\.)', 'back': 65, 'needle': '@'},
+    {'pattern': r'(?P<ip>\d(?<![\w.]\d)\d{0,2}\.(?:\d{1,3}\.){2}\d{1,3}(?![\w]|\.\d))', 'needle': '.'},
+    {'pattern': r'(?P<eth>0(?<!\w0)x[a-fA-F0-9]{40}(?!\w))', 'needle': '0x'},
+    {'pattern': r'(?P<bech32>b(?<!\wb)c1[02-9ac-hj-np-z]{11,71}(?!\w))', 'needle': 'bc1'},
+    {'pattern': r'(?P<btc>[13](?<!\w[13])[1-9A-HJ-NP-Za-km-z]{25,34}(?!\w))'},
+    # Перед кодом в скобках может стоять префикс выхода на межгород: 8 (495) 123-45-67
+    {'pattern': r'(?P<phone>(?=[+(\d])(?<![\w+.-])(?:\+\d{1,3}[ \t.\-\u00a0]?|\d{1,2}[ \t\-\u00a0]?(?=\())?'
+                r'(?:\(\d{1,5}\)[ \t.\-\u00a0]?)?\d{1,5}(?:[ \t.\-\u00a0]\d{1,5}){0,5}(?![\w]))'},
+]
+
+
+class EntityPass:
+    """Поиск сущностей одного типа.
+
+    Если задан якорь, выражение проверяется только у его вхождений: head
+    находит начало сущности не дальше back символов до конца якоря.
+    """
+
+    def __init__(self, pattern, needle=None, anchor=None, head=None, back=0):
+        self.pattern = re.compile(pattern)
+        self.needle = needle
+        self.anchor = re.compile(anchor) if anchor else None
+        self.head = re.compile(head) if head else None
+        self.back = back
+
+    def finditer(self, text):
+        if self.needle and self.needle not in text:
+            return
+        if self.anchor is None:
+            yield from self.pattern.finditer(text)
+            return
+        position = 0
+        for anchor in self.anchor.finditer(text):
+            if anchor.start() < position:
+                continue
+            # endpos обрезает текст по якорю, поэтому \Z в head совпадает на его конце
+            head = self.head.search(text, max(position, anchor.end() - self.back), anchor.end())
+            if head is None:
+                continue
+            match = self.pattern.match(text, head.start())
+            if match is not None:
+                position = match.end()
+                yield match
+
+
+class EntityPatterns:
+    """Проходы всех типов с общим интерфейсом finditer, как у одного выражения.
+
+    Совпадения проходов объединяются слева направо; пересекающееся с уже
+    принятым совпадение отбрасывается, при одинаковом начале побеждает тип
+    с большим приоритетом.
+    """
+
+    def __init__(self, passes=_PASSES):
+        self.passes = [EntityPass(**spec) for spec in passes]
+
+    @staticmethod
+    def _keyed(priority, matches):
+        for match in matches:
+            yield match.start(), priority, match
+
+    def finditer(self, text):
+        # Проходы идут лениво: сканер потока может остановиться у конца окна.
+        # У совпадений одного прохода начала различаются, до match сравнение не доходит
+        merged = heapq.merge(*(self._keyed(priority, entity_pass.finditer(text))
+                               for priority, entity_pass in enumerate(self.passes)))
+        end = 0
+        for start, _, match in merged:
+            if start >= end:
+                end = match.end()
+                yield match
+
+
+ENTITY_PATTERNS = EntityPatterns()
+
+_DATE_PATTERN = re.compile(r'\d{4}[-./]\d{1,2}[-./]\d{1,2}|^\d{1,2}[-./]\d{1,2}[-./]\d{2,4}$')
+_PHONE_GROUPS = re.compile(r'\d+')
+# Окончания номера без '+' и скобок (длины последних групп цифр):
+# 555-123-4567, 8 800 555-35-35 и 123-45-67, 01 23 45 67 89
+_PHONE_TAILS = ((3, 4), (3, 2, 2), (2, 2, 2))
+_BASE58 = '123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz'
+
+
+def valid_phone(value):
+    """Похоже ли значение на телефонный номер, а не на произвольное число"""
+    groups = _PHONE_GROUPS.findall(value)
+    digits = sum(len(group) for group in groups)
+    if not 7 <= digits <= 15 or _DATE_PATTERN.search(value):
+        return False
+    if value.startswith('+') or '(' in value:
+        return True
+    # Без '+' и скобок точки скорее разделяют разряды и дроби (12.500.000,
+    # координаты), а группы должны складываться в обычную запись номера,
+    # а не в цену, разрешение экрана или другие числа через пробел
+    if '.' in value or len(groups) < 3:
+        return False
+    shape = tuple(len(group) for group in groups)
+    if any(shape[-len(tail):] == tail for tail in _PHONE_TAILS):
+        return True
+    # 020 7946 0958: код с ведущим нулем и две группы по четыре цифры
+    return shape[-2:] == (4, 4) and groups[0].startswith('0')
+
+
+def valid_ipv4(value):
+    try:
+        ipaddress.IPv4Address(value)
+        return True
+    except ValueError:
+        return False
+
+
+def valid_base58check(value):
+    """Проверка контрольной суммы Base58Check (адреса Bitcoin P2PKH/P2SH)"""
+    number = 0
+    for ch in value:
+        number = number * 58 + _BASE58.index(ch)
+    raw = number.to_bytes(25, 'big') if number.bit_length() <= 200 else None
+    if raw is None:
+        return False
+    payload, checksum = raw[:-4], raw[-4:]
+    return hashlib.sha256(hashlib.sha256(payload).digest()).digest()[:4] == checksum
+
+
+def social_profile(url):
+    """Нормализованный профиль соцсети из ссылки или None"""
+    if '://' not in url:
+        url = 'https://' + url
+    parsed = urlparse(url)
+    host = (parsed.hostname or '').lower()
+    if host.startswith('www.'):
+        host = host[4:]
+    if host not in SOCIAL_HOSTS:
+        return None
+    segments = [segment for segment in parsed.path.split('/') if segment]
+    if not segments:
+        return None
+    name = segments[0]
+    if host == 'linkedin.com' and name == 'in' and len(segments) > 1:
+        name = segments[1]
+    name = name.rstrip('.')
+    if name.lower() in SOCIAL_RESERVED or len(name.lstrip('@')) < 2:
+        return None
+    return f"{host}/{name}"
+
+
+class EntityScanner:
+    """Потоковый сканер: дедупликация на лету с ограничением памяти"""
+
+    def __init__(self, kinds=KINDS, max_unique=DEFAULT_MAX_UNIQUE):
+        self.kinds = set(kinds)
+        self.max_unique = max_unique
+        # тип -> {значение: Entity первого вхождения}
+        self.found = {kind: {} for kind in KINDS}
+        # тип -> сколько раз встретилось (включая повторы)
+        self.counts = {kind: 0 for kind in KINDS}
+        # Уникальные значения, не поместившиеся в лимит
+        self.dropped = 0
+        self._stream = RegexStreamScanner(ENTITY_PATTERNS, overlap=MAX_URL_LENGTH + 64,
+                                          on_match=self._on_match)
+
+    def feed(self, text):
+        self._stream.feed(text)
+
+    def finish(self):
+        self._stream.finish()
+
+    def _add(self, kind, value, start, end):
+        if kind not in self.kinds:
+            return
+        self.counts[kind] += 1
+        seen = self.found[kind]
+        if value in seen:
+            return
+        if len(seen) >= self.max_unique:
+            self.dropped += 1
+            return
+        seen[value] = Entity(kind, value, start, end)
+
+    def _on_match(self, match, offset):
+        kind = match.lastgroup
+        value = match.group(kind)
+        start, end = offset + match.start(), offset + match.end()
+        if kind == 'url':
+            value = value.rstrip('.,;:!?)]}')
+            self._add('url', value, start, start + len(value))
+            # urlparse дорогой: ссылка разбирается, только если в ней есть домен соцсети
+            profile = social_profile(value) if _SOCIAL_HINT.search(value) else None
+            if profile:
+                self._add('social', profile, start, start + len(value))
+        elif kind == 'social':
+            profile = social_profile(value)
+            if profile:
+                self._add('social', profile, start, end)
+        elif kind == 'email':
+            self._add('email', value.lower(), start, end)
+        elif kind == 'ip':
+            if valid_ipv4(value):
+                self._add('ip', value, start, end)
+        elif kind in ('eth', 'bech32'):
+            self._add('crypto', value, start, end)
+        elif kind == 'btc':
+            if valid_base58check(value):
+                self._add('crypto', value, start, end)
+        elif kind == 'phone':
+            if valid_phone(value):
+                self._add('phone', value, start, end)
+
+    def results(self):
+        """Словарь тип -> список Entity в порядке первого появления"""
+        return {kind: list(self.found[kind].values()) for kind in KINDS if kind in self.kinds}
+
+
+class EntityExtractor:
+    """Извлечение сущностей из текста (целиком или потоково)"""
+
+    def __init__(self, kinds=KINDS, max_unique=DEFAULT_MAX_UNIQUE):
+        unknown = set(kinds) - set(KINDS)
+        if unknown:
+            raise ValueError(f"Неизвестные типы сущностей: {', '.join(sorted(unknown))}")
+        self.kinds = tuple(kinds)
+        self.max_unique = max_unique
+
+    def scanner(self):
+        """Новый потоковый сканер"""
+        return EntityScanner(self.kinds, self.max_unique)
+
+    def extract(self, text):
+        """Все уникальные сущности текста целиком"""
+        scanner = self.scanner()
+        scanner.feed(text)
+        scanner.finish()
+        return scanner.results()
@@ -0,0 +1,271 @@
+#!/usr/bin/env python3
+"""
+Определение технологий веб-сайта для OSINT CLI Helper
+Все сигнатуры тела страницы ищутся за один проход: автоматом Ахо-Корасик
+из pyahocorasick, если он установлен, иначе регулярным выражением,
+построенным по префиксному дереву сигнатур
+"""
+
+import json
+import os
+import re
+
+# База сигнатур по умолчанию (рядом с модулем)
+DEFAULT_SIGNATURES = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'technologies.json')
+
+# Сколько символов до совпадения хранить для проверки тега (<script>, <meta>)
+CONTEXT_CHARS = 2048
+
+
+def load_signatures(path=None):
+    """Загрузка базы сигнатур технологий (JSON)"""
+    with open(path or DEFAULT_SIGNATURES, encoding='utf-8') as f:
+        return json.load(f)
+
+
+class NeedleMatcher:
+    """Поиск множества подстрок одним регулярным выражением, построенным по префиксному дереву.
+
+    Выражение повторяет дерево: в каждом узле ветви начинаются с разных
+    символов, поэтому с каждой позиции текста re проверяет не больше одной
+    ветви на уровень, и время поиска почти не зависит от числа подстрок.
+    Совпадение с позиции - самая длинная подстрока; более короткие
+    подстроки, которые являются ее началом, берутся из таблицы, собранной
+    по тому же дереву. Сам перебор текста выполняется внутри модуля re.
+    """
+
+    def __init__(self, needles):
+        self.needles = list(needles)
+        # Узел дерева: символ -> дочерний узел, ключ '' - номера подстрок, которые здесь кончаются
+        root = {}
+        for index, needle in enumerate(self.needles):
+            if not needle:
+                continue
+            node = root
+            for ch in needle:
+                node = node.setdefault(ch, {})
+            node.setdefault('', []).append(index)
+        self._pattern = re.compile(_trie_pattern(root)) if root else None
+        # Найденная подстрока -> (номер, длина) всех подстрок, которые являются ее началом
+        self._prefixes = {}
+        for needle in self.needles:
+            if not needle or needle in self._prefixes:
+                continue
+            node = root
+            prefixes = []
+            for length, ch in enumerate(needle, 1):
+                node = node[ch]
+                prefixes.extend((index, length) for index in node.get('', ()))
+            self._prefixes[needle] = prefixes
+        self.overlap = max((len(needle) for needle in self.needles), default=1) - 1
+
+    def scan(self, text, state=''):
+        """Поиск в тексте с учетом хвоста предыдущего куска.
+
+        Возвращает ([(индекс конца совпадения, номер подстроки)], состояние),
+        состояние (хвост текста) передается в следующий вызов, чтобы находить
+        совпадения на границе кусков потока. Индекс конца считается от
+        начала text; совпадения, целиком лежащие в хвосте, уже были найдены.
+        """
+        window = state + text
+        shift = len(state)
+        matches = []
+        if self._pattern is None:
+            return matches, ''
+        search = self._pattern.search
+        match = search(window)
+        while match is not None:
+            start = match.start()
+            for index, length in self._prefixes[match.group()]:
+                end = start + length - 1
+                if end >= shift:
+                    matches.append((end - shift, index))
+            # Следующее совпадение может начинаться внутри текущего
+            match = search(window, start + 1)
+        matches.sort()
+        return matches, window[-self.overlap:] if self.overlap else ''
+
+
+class AhoCorasickMatcher:
+    """Тот же интерфейс на автомате pyahocorasick (C): время поиска не зависит от числа подстрок"""
+
+    def __init__(self, needles, ahocorasick):
+        self.needles = list(needles)
+        self._automaton = None
+        if any(self.needles):
+            self._automaton = ahocorasick.Automaton()
+            for index, needle in enumerate(self.needles):
+                if needle:
+                    found = self._automaton.get(needle, [])
+                    self._automaton.add_word(needle, found + [index])
+            self._automaton.make_automaton()
+        self.overlap = max((len(needle) for needle in self.needles), default=1) - 1
+
+    def scan(self, text, state=''):
+        """Как NeedleMatcher.scan"""
+        if self._automaton is None:
+            return [], ''
+        window = state + text
+        shift = len(state)
+        matches = [(end - shift, index) for end, indices in self._automaton.iter(window)
+                   if end >= shift for index in indices]
+        matches.sort()
+        return matches, window[-self.overlap:] if self.overlap else ''
+
+
+def create_matcher(needles):
+    """Поиск подстрок: pyahocorasick, если установлен, иначе выражение по префиксному дереву"""
+    try:
+        import ahocorasick
+    except ImportError:
+        return NeedleMatcher(needles)
+    return AhoCorasickMatcher(needles, ahocorasick)
+
+
+def _trie_pattern(node):
+    """Выражение для поддерева: ветви по первому символу, окончания - в классе символов"""
+    branches = []
+    chars = []
+    for ch, child in sorted((key, value) for key, value in node.items() if key):
+        if len(child) == 1 and '' in child:
+            chars.append(ch)
+        else:
+            branches.append(re.escape(ch) + _trie_pattern(child))
+    if len(chars) == 1:
+        branches.append(re.escape(chars[0]))
+    elif chars:
+        branches.append('[' + ''.join(_class_char(ch) for ch in chars) + ']')
+    pattern = branches[0] if len(branches) == 1 else '(?:' + '|'.join(branches) + ')'
+    if '' in node:
+        # Подстрока кончается в этом узле: продолжение необязательно (жадно - сначала длинная)
+        pattern = '(?:' + pattern + ')?'
+    return pattern
+
+
+def _class_char(ch):
+    return '\\' + ch if ch in '\\]^-[' else ch
+
+
+class FingerprintEngine:
+    """Скомпилированная база сигнатур технологий"""
+
+    def __init__(self, signatures):
+        self.categories = {}
+        # Сигнатуры заголовков: имя заголовка -> [(подстрока значения, технология)]
+        self.header_rules = {}
+        # Сигнатуры cookie: имя cookie -> [технология]
+        self.cookie_rules = {}
+        # Сигнатуры тела: подстрока -> [(место, технология, имя meta)]
+        body_rules = {}
+        for tech, rules in signatures.items():
+            self.categories[tech] = rules.get('cats', [])
+            for header, needle in rules.get('headers', {}).items():
+                self.header_rules.setdefault(header.lower(), []).append((needle.lower(), tech))
+            for cookie in rules.get('cookies', []):
+                self.cookie_rules.setdefault(cookie.lower(), []).append(tech)
+            for needle in rules.get('html', []):
+                body_rules.setdefault(needle.lower(), []).append(('html', tech, None))
+            for needle in rules.get('scripts', []):
+                body_rules.setdefault(needle.lower(), []).append(('script', tech, None))
+            for name, needle in rules.get('meta', {}).items():
+                body_rules.setdefault(needle.lower(), []).append(('meta', tech, name.lower()))
+        self.needles = list(body_rules)
+        self.body_rules = [body_rules[needle] for needle in self.needles]
+        self.matcher = create_matcher(self.needles)
+
+    def scanner(self):
+        """Новый потоковый сканер для одной страницы"""
+        return FingerprintScanner(self)
+
+    def detect(self, headers, body):
+        """Технологии по заголовкам и телу страницы целиком"""
+        scanner = self.scanner()
+        scanner.feed_headers(headers)
+        scanner.feed(body)
+        return scanner.result()
+
+
+class FingerprintScanner:
+    """Сканер одной страницы: заголовки, cookie, затем тело кусками"""
+
+    def __init__(self, engine):
+        self.engine = engine
+        self.detected = set()
+        self._state = ''
+        self._context = ''
+        # Сколько символов тела уже просмотрено
+        self._consumed = 0
+        # meta-теги, у которых атрибут name может идти после совпадения
+        self._pending_meta = []
+
+    def feed_headers(self, headers):
+        """Проверка заголовков ответа и cookie из Set-Cookie"""
+        for name, value in headers.items():
+            name = name.lower()
+            value = str(value).lower()
+            for needle, tech in self.engine.header_rules.get(name, ()):
+                if needle in value:
+                    self.detected.add(tech)
+            if name == 'set-cookie':
+                self._feed_cookies(value)
+
+    def _feed_cookies(self, value):
+        # requests склеивает несколько Set-Cookie через запятую
+        for part in value.split(','):
+            cookie = part.split('=', 1)[0].strip()
+            for tech in self.engine.cookie_rules.get(cookie, ()):
+                self.detected.add(tech)
+
+    def feed(self, chunk):
+        """Очередной кусок тела страницы"""
+        text = chunk.lower()
+        # Окно: хвост прошлых кусков + новый кусок, base - его абсолютное начало
+        window = self._context + text
+        base = self._consumed - len(self._context)
+        matches, self._state = self.engine.matcher.scan(text, self._state)
+        for end, index in matches:
+            start = self._consumed + end + 1 - len(self.engine.needles[index])
+            for place, tech, meta_name in self.engine.body_rules[index]:
+                if tech in self.detected or place == 'html':
+                    self.detected.add(tech)
+                    continue
+                tag = self._enclosing_tag(window, start - base)
+                if tag is None:
+                    continue
+                if place == 'script' and window.startswith('<script', tag):
+                    self.detected.add(tech)
+                elif place == 'meta' and window.startswith('<meta', tag):
+                    self._pending_meta.append((base + tag, tech, meta_name))
+        self._consumed += len(text)
+        self._check_meta(window, base)
+        self._context = window[-CONTEXT_CHARS:]
+
+    @staticmethod
+    def _enclosing_tag(window, position):
+        """Начало тега, внутри которого находится позиция, или None"""
+        tag = window.rfind('<', 0, max(position, 0))
+        if tag < 0 or window.find('>', tag, position) >= 0:
+            return None
+        return tag
+
+    def _check_meta(self, window, base):
+        """Проверка отложенных meta-тегов, конец которых уже прочитан"""
+        pending = []
+        for position, tech, meta_name in self._pending_meta:
+            tag = position - base
+            end = window.find('>', tag)
+            if end >= 0:
+                if meta_name in window[tag:end]:
+                    self.detected.add(tech)
+            elif len(window) - tag < CONTEXT_CHARS:
+                # Тег еще не закончился и помещается в окно: ждем следующий кусок
+                pending.append((position, tech, meta_name))
+        self._pending_meta = pending
+
+    def finish(self):
+        """Конец тела страницы: незакрытые meta-теги отбрасываются"""
+        self._pending_meta = []
+
+    def result(self):
+        """Найденные технологии в алфавитном порядке"""
+        return sorted(self.detected)
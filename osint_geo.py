@@ -0,0 +1,347 @@
+#!/usr/bin/env python3
+"""
+Геолокация IP-адресов для OSINT CLI Helper
+Адреса собираются в пачки и отправляются в пакетный API ip-api.com
+(до 100 адресов на запрос), результаты раздаются ожидающим вызовам.
+Офлайн-режим: бинарный индекс диапазонов IPv4, отображаемый в память
+"""
+
+import csv
+import ipaddress
+import mmap
+import os
+import struct
+import sys
+import threading
+import time
+from array import array
+from bisect import bisect_right
+from concurrent.futures import Future
+
+from osint_ratelimit import TokenBucket
+
+IP_API_URL = "http://ip-api.com"
+
+# Адресов в одном пакетном запросе (ограничение ip-api)
+BATCH_SIZE = 100
+
+# Сколько ждать новых адресов, прежде чем отправить неполную пачку
+BATCH_DELAY = 0.05
+
+# Бесплатный тариф ip-api: 15 пакетных запросов в минуту
+BATCH_RATE = 15 / 60
+BATCH_BURST = 15
+
+# Сколько готовых ответов помнить для повторных адресов
+MAX_RESULTS = 100000
+
+# Повторные отправки пачки после 429/5xx (сверх повторов самой сессии)
+BATCH_RETRIES = 2
+# Задержка перед повтором без Retry-After: BATCH_BACKOFF * 2^попытка, не больше MAX_RETRY_DELAY
+BATCH_BACKOFF = 1.0
+MAX_RETRY_DELAY = 60.0
+
+
+def retry_delay(response, attempt):
+    """Пауза перед повтором: Retry-After в секундах или экспоненциальная задержка"""
+    try:
+        delay = float(response.headers['Retry-After'])
+    except (KeyError, ValueError):
+        delay = BATCH_BACKOFF * 2 ** attempt
+    return min(max(delay, 0.0), MAX_RETRY_DELAY)
+
+
+class GeoBatcher:
+    """Сборщик адресов в пакетные запросы с фоновым потоком отправки.
+
+    submit() возвращает Future; один и тот же адрес в пачке, в полете
+    и среди готовых ответов запрашивается только один раз. Пачка, на
+    которую ip-api ответил 429 или 5xx, отправляется повторно.
+    """
+
+    def __init__(self, session, base_url=IP_API_URL, batch_size=BATCH_SIZE, delay=BATCH_DELAY,
+                 rate=BATCH_RATE, burst=BATCH_BURST, max_results=MAX_RESULTS,
+                 retries=BATCH_RETRIES):
+        self.session = session
+        self.retries = retries
+        self.base_url = base_url.rstrip('/')
+        self.batch_size = min(batch_size, BATCH_SIZE)
+        self.delay = delay
+        self.limiter = TokenBucket(rate, burst)
+        self.max_results = max_results
+        # Адрес -> Future: ожидают отправки или уже в полете
+        self._pending = {}
+        self._queue = []
+        self._results = {}
+        # Адрес -> сколько раз он запрошен через prefetch и еще не через lookup
+        self._prefetched = {}
+        self._cond = threading.Condition()
+        self._thread = None
+        self._closed = False
+        self.batches = 0
+        self.deduplicated = 0
+
+    def submit(self, ip, prefetch=False):
+        """Future с ответом ip-api для адреса (dict или None).
+
+        prefetch - адрес запрашивается заранее: его следующий submit тот же
+        запрос, а не повторный адрес, и в deduplicated не считается.
+        """
+        with self._cond:
+            if ip in self._results or ip in self._pending:
+                if prefetch or not self._prefetched.get(ip):
+                    self.deduplicated += 1
+                else:
+                    # lookup адреса, уже запрошенного заранее, - не повтор
+                    self._prefetched[ip] -= 1
+                    if not self._prefetched[ip]:
+                        del self._prefetched[ip]
+                if prefetch:
+                    self._prefetched[ip] = self._prefetched.get(ip, 0) + 1
+                if ip in self._pending:
+                    return self._pending[ip]
+                future = Future()
+                future.set_result(self._results[ip])
+                return future
+            if self._closed:
+                raise RuntimeError("GeoBatcher закрыт")
+            if prefetch:
+                self._prefetched[ip] = self._prefetched.get(ip, 0) + 1
+            future = self._pending[ip] = Future()
+            self._queue.append(ip)
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='geo-batcher', daemon=True)
+                self._thread.start()
+            self._cond.notify()
+            return future
+
+    def lookup(self, ip, timeout=None):
+        """Блокирующий запрос геолокации одного адреса"""
+        return self.submit(ip).result(timeout)
+
+    def _take_batch(self):
+        """Следующая пачка: полная или та, что набралась за delay"""
+        with self._cond:
+            while not self._queue and not self._closed:
+                self._cond.wait()
+            deadline = time.monotonic() + self.delay
+            while len(self._queue) < self.batch_size and not self._closed:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    break
+                self._cond.wait(remaining)
+            batch = self._queue[:self.batch_size]
+            del self._queue[:self.batch_size]
+            return batch
+
+    def _run(self):
+        while True:
+            batch = self._take_batch()
+            if not batch:
+                return
+            try:
+                results = self._send(batch)
+            except Exception as e:
+                self._finish(batch, error=e)
+            else:
+                self._finish(batch, results)
+
+    def _send(self, batch):
+        from osint_http import RETRY_STATUSES
+        for attempt in range(self.retries + 1):
+            self.limiter.acquire()
+            self.batches += 1
+            response = self.session.post(f"{self.base_url}/batch", json=batch)
+            # X-Rl - запросов до сброса лимита, X-Ttl - секунд до сброса
+            if response.headers.get('X-Rl') == '0':
+                time.sleep(float(response.headers.get('X-Ttl', 60)))
+            if response.status_code == 200:
+                return {item.get('query'): item for item in response.json()}
+            if response.status_code not in RETRY_STATUSES or attempt == self.retries:
+                raise ValueError(f"ip-api вернул статус {response.status_code}")
+            time.sleep(retry_delay(response, attempt))
+
+    def _finish(self, batch, results=None, error=None):
+        with self._cond:
+            futures = [(ip, self._pending.pop(ip)) for ip in batch]
+            if results is not None:
+                for ip in batch:
+                    if len(self._results) >= self.max_results:
+                        # Вытесняется самый старый ответ
+                        del self._results[next(iter(self._results))]
+                    self._results[ip] = results.get(ip)
+        for ip, future in futures:
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(results.get(ip))
+
+    def close(self):
+        """Отправить оставшиеся адреса и остановить поток"""
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+            thread = self._thread
+        if thread:
+            thread.join()
+
+
+# Офлайн-индекс диапазонов IPv4: заголовок, затем столбцы uint32
+# (начало, конец, страна, ASN, организация) и таблица строк.
+# Все числа little-endian: индекс переносится между машинами
+INDEX_MAGIC = b'OSGEOIDX'
+INDEX_VERSION = 2
+INDEX_HEADER = struct.Struct('<8sIII')
+INDEX_COLUMNS = ('start', 'end', 'country', 'asn', 'org')
+
+# На big-endian машине столбцы переставляются при записи и чтении
+_SWAP_BYTES = sys.byteorder != 'little'
+
+
+def _column_bytes(values):
+    """Столбец uint32 в little-endian"""
+    column = array('I', values)
+    if _SWAP_BYTES:
+        column.byteswap()
+    return column.tobytes()
+
+
+def _parse_ipv4(value):
+    value = value.strip()
+    if value.isdigit():
+        return int(value)
+    return int(ipaddress.IPv4Address(value))
+
+
+def _parse_asn(value):
+    value = value.strip().upper()
+    if value.startswith('AS'):
+        value = value[2:]
+    return int(value) if value else 0
+
+
+def build_geo_index(csv_path, index_path):
+    """Сборка бинарного индекса из CSV: start,end,country,asn,org.
+
+    Адреса - в виде строк IPv4 или целых чисел; строка заголовка
+    пропускается. Возвращает число диапазонов.
+    """
+    rows = []
+    strings = {'': 0}
+    with open(csv_path, newline='', encoding='utf-8') as f:
+        for number, row in enumerate(csv.reader(f), 1):
+            if not row or row[0].startswith('#'):
+                continue
+            try:
+                start, end = _parse_ipv4(row[0]), _parse_ipv4(row[1])
+            except (ValueError, IndexError):
+                if number == 1:
+                    continue
+                raise ValueError(f"{csv_path}:{number}: неверный диапазон адресов")
+            if end < start:
+                raise ValueError(f"{csv_path}:{number}: конец диапазона меньше начала")
+            row = row + [''] * (5 - len(row))
+            country = strings.setdefault(row[2].strip(), len(strings))
+            org = strings.setdefault(row[4].strip(), len(strings))
+            rows.append((start, end, country, _parse_asn(row[3]), org))
+    rows.sort()
+    for previous, current in zip(rows, rows[1:]):
+        if current[0] <= previous[1]:
+            raise ValueError(f"Диапазоны пересекаются: {ipaddress.IPv4Address(current[0])}")
+
+    blob = bytearray()
+    offsets = [0]
+    for text in strings:
+        blob += text.encode('utf-8')
+        offsets.append(len(blob))
+    tmp = index_path + '.tmp'
+    with open(tmp, 'wb') as f:
+        f.write(INDEX_HEADER.pack(INDEX_MAGIC, INDEX_VERSION, len(rows), len(strings)))
+        for column in range(len(INDEX_COLUMNS)):
+            f.write(_column_bytes(row[column] for row in rows))
+        f.write(_column_bytes(offsets))
+        f.write(blob)
+    os.replace(tmp, index_path)
+    return len(rows)
+
+
+class GeoIndex:
+    """Поиск по офлайн-индексу: файл отображается в память, поиск - бинарный.
+
+    Данные не загружаются в объекты Python: столбцы читаются прямо
+    из отображения через memoryview, открытие индекса почти бесплатно.
+    На big-endian машине столбцы копируются в массивы с перестановкой байт.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, version, count, nstrings = INDEX_HEADER.unpack_from(self._mmap)
+        if magic != INDEX_MAGIC:
+            raise ValueError(f"{path}: не индекс геолокации")
+        if version != INDEX_VERSION:
+            raise ValueError(f"{path}: индекс версии {version}, пересоберите его командой geoindex")
+        self.count = count
+        self._views = []
+        offset = INDEX_HEADER.size
+        columns = []
+        for _ in INDEX_COLUMNS:
+            columns.append(self._column(offset, count))
+            offset += 4 * count
+        self._starts, self._ends, self._countries, self._asns, self._orgs = columns
+        self._offsets = self._column(offset, nstrings + 1)
+        self._blob = offset + 4 * (nstrings + 1)
+
+    def _column(self, offset, length):
+        view = memoryview(self._mmap)[offset:offset + 4 * length]
+        if not _SWAP_BYTES:
+            column = view.cast('I')
+            self._views.append(column)
+            return column
+        column = array('I', view.tobytes())
+        column.byteswap()
+        view.release()
+        return column
+
+    def _string(self, index):
+        start = self._blob + self._offsets[index]
+        end = self._blob + self._offsets[index + 1]
+        return self._mmap[start:end].decode('utf-8')
+
+    def find(self, number):
+        """Номер диапазона, содержащего адрес (целое число), или -1"""
+        position = bisect_right(self._starts, number) - 1
+        if position >= 0 and self._ends[position] >= number:
+            return position
+        return -1
+
+    def lookup(self, ip):
+        """Ответ в формате ip-api (status, country, as, org) или None"""
+        try:
+            number = int(ipaddress.IPv4Address(ip))
+        except ValueError:
+            return None
+        position = self.find(number)
+        if position < 0:
+            return None
+        asn = self._asns[position]
+        return {
+            'status': 'success',
+            'query': ip,
+            'country': self._string(self._countries[position]),
+            'as': f"AS{asn}" if asn else '',
+            'org': self._string(self._orgs[position]),
+        }
+
+    def close(self):
+        # memoryview держат ссылку на отображение: сначала освобождаются они
+        for view in self._views:
+            view.release()
+        self._mmap.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
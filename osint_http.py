@@ -0,0 +1,178 @@
+#!/usr/bin/env python3
+"""
+Общий HTTP-транспорт для OSINT CLI Helper
+Сессия с пулом соединений на хост, таймаутами по умолчанию,
+повторами с экспоненциальной задержкой и статистикой задержек по хостам
+"""
+
+import threading
+from collections import deque
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.util.retry import Retry
+
+from osint_metrics import count, observe, get_metrics
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36'
+
+# Таймауты (подключение, чтение) для запросов без явного timeout
+DEFAULT_TIMEOUT = (5, 15)
+
+# Повторы: число попыток, базовая задержка и разброс задержки в секундах
+DEFAULT_RETRIES = 3
+DEFAULT_BACKOFF = 0.5
+DEFAULT_JITTER = 0.5
+
+# Ответы, после которых запрос повторяется (с учетом Retry-After)
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Сколько последних замеров хранить на хост для перцентилей
+LATENCY_SAMPLES = 256
+
+
+class HostStats:
+    """Статистика задержек ответов по хостам (потокобезопасная)"""
+
+    def __init__(self, samples=LATENCY_SAMPLES):
+        self.samples = samples
+        self._hosts = {}
+        self._lock = threading.Lock()
+
+    def record(self, host, seconds, status):
+        with self._lock:
+            entry = self._hosts.get(host)
+            if entry is None:
+                entry = self._hosts[host] = {'requests': 0, 'errors': 0, 'total': 0.0,
+                                             'max': 0.0, 'recent': deque(maxlen=self.samples)}
+            entry['requests'] += 1
+            if status >= 400:
+                entry['errors'] += 1
+            entry['total'] += seconds
+            entry['max'] = max(entry['max'], seconds)
+            entry['recent'].append(seconds)
+
+    def hook(self, response, *args, **kwargs):
+        """Хук requests: замер времени до получения заголовков ответа"""
+        host = urlparse(response.url).netloc.lower()
+        seconds = response.elapsed.total_seconds()
+        self.record(host, seconds, response.status_code)
+        observe('http', seconds, response.status_code >= 400)
+
+    def stats(self):
+        """Словарь хост -> число запросов, ошибок, среднее, p50, p95, максимум"""
+        with self._lock:
+            result = {}
+            for host, entry in self._hosts.items():
+                recent = sorted(entry['recent'])
+                result[host] = {
+                    'requests': entry['requests'],
+                    'errors': entry['errors'],
+                    'mean': entry['total'] / entry['requests'],
+                    'p50': recent[len(recent) // 2],
+                    'p95': recent[min(len(recent) - 1, int(len(recent) * 0.95))],
+                    'max': entry['max'],
+                }
+            return result
+
+
+class TimeoutSession(requests.Session):
+    """Сессия, подставляющая таймаут в запросы без явного timeout"""
+
+    def __init__(self, timeout=DEFAULT_TIMEOUT):
+        super().__init__()
+        self.timeout = timeout
+
+    def request(self, method, url, **kwargs):
+        if kwargs.get('timeout') is None:
+            kwargs['timeout'] = self.timeout
+        return super().request(method, url, **kwargs)
+
+
+def make_retry(retries=DEFAULT_RETRIES, backoff=DEFAULT_BACKOFF, jitter=DEFAULT_JITTER,
+               methods=()):
+    """Политика повторов urllib3: 429/5xx, Retry-After, задержка с разбросом.
+
+    methods - методы сверх безопасных по умолчанию (GET, HEAD, ...), которые
+    тоже можно повторять, например POST идемпотентного API.
+    """
+    options = {
+        'total': retries,
+        'allowed_methods': Retry.DEFAULT_ALLOWED_METHODS | set(methods),
+        'connect': retries,
+        'read': retries,
+        'status': retries,
+        'backoff_factor': backoff,
+        'status_forcelist': RETRY_STATUSES,
+        'respect_retry_after_header': True,
+        # После исчерпания попыток возвращается последний ответ, а не исключение
+        'raise_on_status': False,
+    }
+    try:
+        return Retry(backoff_jitter=jitter, **options)
+    except TypeError:
+        # urllib3 1.x: разброс задержки не поддерживается
+        return Retry(**options)
+
+
+class _MeteredHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        count('sockets.http')
+        return super()._new_conn()
+
+
+class _MeteredHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        count('sockets.http')
+        return super()._new_conn()
+
+
+class MeteredAdapter(HTTPAdapter):
+    """Адаптер со счетчиками метрик: новые соединения и байты тел ответов.
+
+    Тела потоковых ответов (stream=True) считают читатели из osint_stream.
+    """
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {'http': _MeteredHTTPConnectionPool,
+                                                   'https': _MeteredHTTPSConnectionPool}
+
+    def send(self, request, stream=False, **kwargs):
+        response = super().send(request, stream=stream, **kwargs)
+        if get_metrics() is not None:
+            count('http.requests')
+            if not stream:
+                # Сессия все равно читает тело сразу после ответа
+                count('http.bytes', len(response.content))
+        return response
+
+
+_shared_stats = HostStats()
+
+
+def get_host_stats():
+    """Статистика задержек, общая для всех сессий процесса"""
+    return _shared_stats
+
+
+def create_session(pool_size=10, timeout=DEFAULT_TIMEOUT, retries=DEFAULT_RETRIES,
+                   backoff=DEFAULT_BACKOFF, stats=None, retry_methods=()):
+    """Сессия с пулом pool_size соединений на хост, таймаутами и повторами.
+
+    retry_methods - дополнительные методы для повторов (POST только для
+    API, где повтор запроса безопасен).
+    """
+    session = TimeoutSession(timeout)
+    session.headers.update({'User-Agent': USER_AGENT})
+    # pool_connections - сколько хостов держать в пуле, pool_maxsize - соединений на хост
+    adapter = MeteredAdapter(pool_connections=max(pool_size, 10), pool_maxsize=pool_size,
+                          max_retries=make_retry(retries, backoff, methods=retry_methods))
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    stats = stats or get_host_stats()
+    session.hooks['response'].append(stats.hook)
+    session.stats = stats
+    return session
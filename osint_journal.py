@@ -0,0 +1,181 @@
+#!/usr/bin/env python3
+"""
+Журнал сканирования сети для OSINT CLI Helper
+Завершенные цели (отрезки номеров в порядке обхода) и найденные открытые
+порты периодически дописываются в файл строками JSON; прерванное
+сканирование продолжается с места остановки без повторных проверок
+"""
+
+import hashlib
+import json
+import os
+import time
+
+from osint_targets import _merge
+
+JOURNAL_FORMAT = 'osint-scan-journal'
+JOURNAL_VERSION = 1
+
+# Как часто сбрасывать прогресс на диск (секунды)
+FLUSH_INTERVAL = 5.0
+
+
+def _intervals(numbers):
+    """Отсортированные числа -> отрезки [начало, конец]"""
+    result = []
+    for number in numbers:
+        if result and number == result[-1][1] + 1:
+            result[-1][1] = number
+        else:
+            result.append([number, number])
+    return result
+
+
+def scan_params(target, exclude, ports, randomize, seed, size):
+    """Параметры, от которых зависит порядок обхода: по ним журнал сверяется со сканированием"""
+    return {
+        'target': target,
+        'exclude': exclude,
+        'ports': _intervals(sorted(ports)),
+        'randomize': bool(randomize),
+        'seed': seed if randomize else 0,
+        'size': size,
+    }
+
+
+def default_journal_path(params):
+    """Имя журнала по параметрам: повторный запуск с теми же аргументами находит его сам"""
+    raw = json.dumps(params, sort_keys=True)
+    return f"scan_{hashlib.sha1(raw.encode('utf-8')).hexdigest()[:12]}.journal"
+
+
+class ScanJournal:
+    """Журнал: строка-заголовок с параметрами, затем записи прогресса.
+
+    Запись - {"done": [[начало, конец], ...], "open": [[ip, порт], ...]}
+    с тем, что завершено после предыдущей записи. Номер цели - ее позиция
+    в порядке обхода TargetSet, поэтому завершенная часть сканирования
+    хранится несколькими отрезками независимо от числа адресов.
+    """
+
+    def __init__(self, path, params, resume=False, interval=FLUSH_INTERVAL):
+        self.path = path
+        self.params = params
+        self.interval = interval
+        # Завершенные номера целей (слитые отрезки) и открытые порты
+        self.done = []
+        self.open_ports = []
+        self._open_seen = set()
+        self._new_done = []
+        self._new_open = []
+        # Адрес -> номер для целей, которые сейчас сканируются
+        self._inflight = {}
+        self._last_flush = time.monotonic()
+        self.resumed = resume and os.path.exists(path)
+        if self.resumed:
+            self._load()
+        # Новый журнал или сжатие прочитанного в одну запись
+        self._rewrite()
+        self._file = open(path, 'a', encoding='utf-8')
+
+    def _load(self):
+        with open(self.path, encoding='utf-8') as f:
+            try:
+                header = json.loads(f.readline())
+            except ValueError:
+                raise ValueError(f"{self.path}: не журнал сканирования")
+            if header.get('format') != JOURNAL_FORMAT or header.get('version') != JOURNAL_VERSION:
+                raise ValueError(f"{self.path}: не журнал сканирования")
+            if header.get('params') != self.params:
+                raise ValueError(f"Журнал {self.path} относится к другому сканированию "
+                                 f"(цели, порты или порядок обхода отличаются)")
+            done = []
+            for line in f:
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    # Недописанная строка: процесс прервался во время записи
+                    break
+                done.extend(record.get('done', []))
+                for ip, port in record.get('open', []):
+                    self._add_open(ip, port)
+        self.done = _merge(done)
+
+    def _add_open(self, ip, port):
+        key = (ip, port)
+        if key in self._open_seen:
+            return False
+        self._open_seen.add(key)
+        self.open_ports.append(key)
+        return True
+
+    def _rewrite(self):
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            f.write(json.dumps({'format': JOURNAL_FORMAT, 'version': JOURNAL_VERSION,
+                                'params': self.params}) + '\n')
+            if self.done or self.open_ports:
+                f.write(json.dumps({'done': self.done,
+                                    'open': [list(item) for item in self.open_ports]},
+                                   separators=(',', ':')) + '\n')
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp, self.path)
+
+    @property
+    def completed(self):
+        """Число завершенных целей"""
+        return sum(end - start + 1 for start, end in self.done)
+
+    def track(self, items):
+        """Пары (номер, адрес) -> адреса; номер запоминается до завершения цели"""
+        for position, ip in items:
+            self._inflight[ip] = position
+            yield ip
+
+    def host_done(self, ip):
+        """Цель просканирована полностью"""
+        position = self._inflight.pop(ip, None)
+        if position is not None:
+            self.position_done(position)
+
+    def position_done(self, position):
+        """Цель с номером position просканирована полностью"""
+        self._new_done.append(position)
+        if time.monotonic() - self._last_flush >= self.interval:
+            self.flush()
+
+    def add_open(self, ip, port):
+        """Открытый порт; False - уже записан (хост сканируется повторно после сбоя)"""
+        if not self._add_open(ip, port):
+            return False
+        self._new_open.append([ip, port])
+        return True
+
+    def flush(self):
+        """Дописать прогресс с предыдущей записи и сбросить файл на диск"""
+        self._last_flush = time.monotonic()
+        if not self._new_done and not self._new_open:
+            return
+        self._new_done.sort()
+        done = _intervals(self._new_done)
+        self._file.write(json.dumps({'done': done, 'open': self._new_open},
+                                    separators=(',', ':')) + '\n')
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        self.done = _merge(self.done + done)
+        self._new_done = []
+        self._new_open = []
+
+    @property
+    def closed(self):
+        return self._file.closed
+
+    def close(self, remove=False):
+        """Записать остаток; remove=True - сканирование завершено, журнал не нужен"""
+        if self.closed:
+            return
+        self.flush()
+        self._file.close()
+        if remove and os.path.exists(self.path):
+            os.remove(self.path)
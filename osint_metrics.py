@@ -0,0 +1,261 @@
+#!/usr/bin/env python3
+"""
+Метрики и профилирование для OSINT CLI Helper
+Интервалы времени по этапам (WHOIS, DNS, HTTP, сканирование, команды)
+и счетчики запросов, байт, сокетов, попаданий в кэш и ошибок.
+Пока метрики не включены (--metrics), count/observe/span ничего не делают
+"""
+
+import functools
+import sys
+import threading
+import time
+import warnings
+from contextlib import contextmanager, nullcontext
+
+# Формат вывода метрик
+FORMATS = ('json', 'prometheus')
+
+# Сколько строк в каждом разделе отчета профилировщика
+PROFILE_LIMIT = 40
+
+# Префикс имен метрик в формате Prometheus
+PROMETHEUS_PREFIX = 'osint_'
+
+
+class Metrics:
+    """Счетчики и интервалы времени (потокобезопасные)"""
+
+    def __init__(self):
+        self.started = time.time()
+        self._counters = {}
+        # имя интервала -> [число, сумма секунд, максимум, ошибок]
+        self._spans = {}
+        self._lock = threading.Lock()
+
+    def count(self, name, value=1):
+        with self._lock:
+            self._counters[name] = self._counters.get(name, 0) + value
+
+    def observe(self, name, seconds, error=False):
+        """Завершенный интервал name длительностью seconds"""
+        with self._lock:
+            entry = self._spans.get(name)
+            if entry is None:
+                entry = self._spans[name] = [0, 0.0, 0.0, 0]
+            entry[0] += 1
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+            if error:
+                entry[3] += 1
+
+    @contextmanager
+    def span(self, name):
+        """Замер блока кода; исключение считается ошибкой интервала"""
+        started = time.perf_counter()
+        error = False
+        try:
+            yield
+        except BaseException:
+            error = True
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - started, error)
+
+    def snapshot(self):
+        """Словарь со счетчиками и интервалами.
+
+        Время параллельных интервалов (DNS-запросы перебора, HTTP из
+        нескольких потоков) суммируется, поэтому total может быть больше
+        времени работы.
+        """
+        with self._lock:
+            counters = dict(sorted(self._counters.items()))
+            spans = {name: {'count': count, 'total': round(total, 6), 'max': round(peak, 6),
+                            'errors': errors}
+                     for name, (count, total, peak, errors) in sorted(self._spans.items())}
+        return {'uptime': round(time.time() - self.started, 3), 'counters': counters,
+                'spans': spans}
+
+    def to_json(self):
+        import json
+        return json.dumps(self.snapshot(), ensure_ascii=False, indent=2)
+
+    def to_prometheus(self):
+        """Текстовый формат Prometheus"""
+        data = self.snapshot()
+        lines = [f"# TYPE {PROMETHEUS_PREFIX}uptime_seconds gauge",
+                 f"{PROMETHEUS_PREFIX}uptime_seconds {data['uptime']}"]
+        for name, value in data['counters'].items():
+            metric = _prometheus_name(name) + '_total'
+            lines.append(f"# TYPE {metric} counter")
+            lines.append(f"{metric} {value}")
+        if data['spans']:
+            metric = PROMETHEUS_PREFIX + 'span_seconds'
+            lines.append(f"# TYPE {metric} summary")
+            for name, span in data['spans'].items():
+                label = _prometheus_label(name)
+                lines.append(f"{metric}_count{{span=\"{label}\"}} {span['count']}")
+                lines.append(f"{metric}_sum{{span=\"{label}\"}} {span['total']}")
+            for suffix, key, kind in (('max_seconds', 'max', 'gauge'),
+                                      ('errors_total', 'errors', 'counter')):
+                lines.append(f"# TYPE {PROMETHEUS_PREFIX}span_{suffix} {kind}")
+                for name, span in data['spans'].items():
+                    lines.append(f"{PROMETHEUS_PREFIX}span_{suffix}"
+                                 f"{{span=\"{_prometheus_label(name)}\"}} {span[key]}")
+        return '\n'.join(lines) + '\n'
+
+    def render(self, fmt):
+        return self.to_prometheus() if fmt == 'prometheus' else self.to_json() + '\n'
+
+    def write(self, fmt, path=None):
+        """Записать метрики в файл path или в stderr"""
+        text = self.render(fmt)
+        if path:
+            with open(path, 'w', encoding='utf-8') as f:
+                f.write(text)
+        else:
+            sys.stderr.write(text)
+
+
+def _prometheus_name(name):
+    return PROMETHEUS_PREFIX + ''.join(c if c.isalnum() else '_' for c in name.lower())
+
+
+def _prometheus_label(value):
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+_metrics = None
+_enable_lock = threading.Lock()
+
+
+def enable():
+    """Включить сбор метрик в процессе; возвращает общий экземпляр Metrics"""
+    global _metrics
+    with _enable_lock:
+        if _metrics is None:
+            _metrics = Metrics()
+        return _metrics
+
+
+def get_metrics():
+    """Общий экземпляр Metrics или None, если метрики не включены"""
+    return _metrics
+
+
+def count(name, value=1):
+    metrics = _metrics
+    if metrics is not None:
+        metrics.count(name, value)
+
+
+def observe(name, seconds, error=False):
+    metrics = _metrics
+    if metrics is not None:
+        metrics.observe(name, seconds, error)
+
+
+def span(name):
+    """Контекстный менеджер замера этапа (пустой, если метрики выключены)"""
+    metrics = _metrics
+    return metrics.span(name) if metrics is not None else nullcontext()
+
+
+def traced(name=None):
+    """Декоратор: вызов функции - интервал name (по умолчанию Класс.метод)"""
+    def decorator(func):
+        stage = name or func.__qualname__
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            metrics = _metrics
+            if metrics is None:
+                return func(*args, **kwargs)
+            with metrics.span(stage):
+                return func(*args, **kwargs)
+        return wrapper
+    return decorator
+
+
+class _Snapshot:
+    """Статистика профиля потока в виде, который принимает pstats.Stats"""
+
+    def __init__(self, profile):
+        profile.snapshot_stats()
+        self.stats = profile.stats
+
+    def create_stats(self):
+        pass
+
+
+# С Python 3.12 cProfile работает через sys.monitoring: профиль один на
+# процесс и сам видит все потоки, второй одновременно включить нельзя
+PER_THREAD_PROFILES = sys.version_info < (3, 12)
+
+
+class Profiler:
+    """cProfile для основного и всех запущенных после start() потоков.
+
+    До Python 3.12 в каждом новом потоке первым событием профилирования
+    создается свой cProfile.Profile; при сохранении статистика потоков
+    объединяется. Начиная с 3.12 все потоки пишут в профиль основного.
+    """
+
+    def __init__(self):
+        self._main = None
+        self._threads = []
+        self._lock = threading.Lock()
+
+    def _start_thread(self, frame, event, arg):
+        import cProfile
+        sys.setprofile(None)
+        profile = cProfile.Profile()
+        try:
+            profile.enable()
+        except ValueError as e:
+            # Уже активен другой профилировщик: поток остается без профиля
+            warnings.warn(f"Поток {threading.current_thread().name} не профилируется: {e}",
+                          RuntimeWarning)
+            return
+        with self._lock:
+            self._threads.append(profile)
+
+    def start(self):
+        import cProfile
+        if PER_THREAD_PROFILES:
+            threading.setprofile(self._start_thread)
+        self._main = cProfile.Profile()
+        self._main.enable()
+
+    def stop(self):
+        self._main.disable()
+        if PER_THREAD_PROFILES:
+            threading.setprofile(None)
+
+    def stats(self):
+        """Объединенная статистика pstats.Stats"""
+        import pstats
+        stats = pstats.Stats(self._main)
+        with self._lock:
+            profiles = list(self._threads)
+        for profile in profiles:
+            # Поток может еще работать: берется снимок без отключения профиля
+            stats.add(_Snapshot(profile))
+        return stats
+
+    def write_report(self, path, limit=PROFILE_LIMIT):
+        """Отчет: функции по собственному и по накопленному времени.
+
+        Файл с расширением .prof - двоичная статистика для pstats/snakeviz.
+        """
+        stats = self.stats()
+        if path.endswith('.prof'):
+            stats.dump_stats(path)
+            return
+        with open(path, 'w', encoding='utf-8') as f:
+            stats.stream = f
+            f.write("Горячие функции (собственное время)\n")
+            stats.sort_stats('tottime').print_stats(limit)
+            f.write("\nПути вызовов (накопленное время)\n")
+            stats.sort_stats('cumulative').print_stats(limit)
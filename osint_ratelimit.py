@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""
+Ограничение частоты запросов для OSINT CLI Helper
+Потокобезопасные token bucket и набор bucket'ов по ключу (платформа, хост)
+"""
+
+import threading
+import time
+
+
+class TokenBucket:
+    """Token bucket: rate токенов в секунду, не более burst подряд"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = float(rate)
+        self.burst = max(1.0, float(burst))
+        self._tokens = self.burst
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self):
+        """Забрать токен, вернуть сколько секунд нужно подождать до его появления"""
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            # Токен берется в долг: следующий ожидающий встанет в очередь за ним
+            self._tokens -= 1
+            if self._tokens >= 0:
+                return 0.0
+            return -self._tokens / self.rate
+
+    def acquire(self):
+        """Блокирующее получение токена"""
+        delay = self.reserve()
+        if delay > 0:
+            time.sleep(delay)
+
+
+class KeyedRateLimiter:
+    """Отдельный TokenBucket на каждый ключ с общими настройками"""
+
+    def __init__(self, rate, burst=1):
+        self.rate = rate
+        self.burst = burst
+        self._buckets = {}
+        self._lock = threading.Lock()
+
+    def bucket(self, key):
+        with self._lock:
+            bucket = self._buckets.get(key)
+            if bucket is None:
+                bucket = self._buckets[key] = TokenBucket(self.rate, self.burst)
+            return bucket
+
+    def acquire(self, key):
+        """Блокирующее получение токена для ключа"""
+        self.bucket(key).acquire()
@@ -0,0 +1,509 @@
+#!/usr/bin/env python3
+"""
+Асинхронный движок сканирования портов для OSINT CLI Helper
+Держит тысячи попыток соединения одновременно с глобальным лимитом
+и лимитом на хост, выдает результаты по мере готовности.
+Таймауты подстраиваются под измеренное время ответа (как RTO в TCP),
+хосты без признаков жизни отбрасываются после первой проверки
+"""
+
+import asyncio
+import errno
+import ipaddress
+import json
+import os
+import socket
+import ssl
+
+from osint_metrics import count, traced
+
+# Таблица портов по частоте открытия (рядом с модулем)
+DEFAULT_PORT_TABLE = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'ports.json')
+
+# Популярные порты, общие для ip_info и network_scan
+COMMON_PORTS = [21, 22, 23, 25, 53, 80, 110, 143, 443, 993, 995, 3306, 3389, 5432, 8080]
+
+# Словарь с названиями портов
+PORT_NAMES = {
+    21: "FTP", 22: "SSH", 23: "Telnet", 25: "SMTP", 53: "DNS",
+    80: "HTTP", 110: "POP3", 143: "IMAP", 443: "HTTPS",
+    993: "IMAPS", 995: "POP3S", 3306: "MySQL", 3389: "RDP",
+    5432: "PostgreSQL", 8080: "HTTP-Proxy"
+}
+
+# Состояния порта
+OPEN = "open"
+CLOSED = "closed"
+FILTERED = "filtered"
+
+# Порты, на которых служба обычно работает поверх TLS
+TLS_PORTS = {443, 465, 636, 853, 990, 993, 995, 5986, 8443, 9443}
+
+# Лимиты второго этапа: чтение баннера и пробы протоколов
+BANNER_CONCURRENCY = 100
+BANNER_TIMEOUT = 3.0
+BANNER_MAX_BYTES = 1024
+# Сколько ждать приветствия сервера, прежде чем отправить пробу
+GREETING_WAIT = 1.0
+
+# Запас дескрипторов под служебные нужды процесса
+_FD_RESERVE = 64
+
+# Порты для проверки доступности хоста, в порядке предпочтения
+DISCOVERY_PORTS = (80, 443, 22, 445, 3389, 25, 21, 8080)
+DISCOVERY_COUNT = 3
+
+# Границы адаптивного таймаута и коэффициенты оценки RTT (RFC 6298)
+MIN_TIMEOUT = 0.1
+RTT_ALPHA = 1 / 8
+RTT_BETA = 1 / 4
+RTT_GRANULARITY = 0.01
+
+
+_port_table = None
+
+
+def load_port_table(path=None):
+    """Таблица [(порт, служба)] в порядке убывания частоты"""
+    global _port_table
+    if path is None and _port_table is not None:
+        return _port_table
+    with open(path or DEFAULT_PORT_TABLE, encoding='utf-8') as f:
+        table = [(int(port), name) for port, name in json.load(f)['ports']]
+    if path is None:
+        _port_table = table
+    return table
+
+
+def port_name(port):
+    """Название службы по номеру порта"""
+    if port in PORT_NAMES:
+        return PORT_NAMES[port]
+    for number, name in load_port_table():
+        if number == port:
+            return name
+    try:
+        return socket.getservbyport(port, 'tcp')
+    except OSError:
+        return "unknown"
+
+
+def parse_ports(spec):
+    """Список портов из спецификации: '1-1024,3306,top-100', 'all'.
+
+    Порядок сохраняется (top-N - по убыванию частоты), повторы удаляются.
+    """
+    if spec is None:
+        return list(COMMON_PORTS)
+    if not isinstance(spec, str):
+        return list(dict.fromkeys(int(port) for port in spec))
+    ports = {}
+    for item in spec.replace(' ', '').split(','):
+        if not item:
+            continue
+        lower = item.lower()
+        if lower == 'all':
+            numbers = range(1, 65536)
+        elif lower.startswith('top-') and lower[4:].isdigit():
+            table = load_port_table()
+            top_n = int(lower[4:])
+            if top_n > len(table):
+                raise ValueError(f"В таблице портов только {len(table)} записей: {item}")
+            numbers = [port for port, _ in table[:top_n]]
+        else:
+            first, _, last = item.partition('-')
+            if not first.isdigit() or not (last or first).isdigit():
+                raise ValueError(f"Неверная спецификация портов: {item}")
+            numbers = range(int(first), int(last or first) + 1)
+        for port in numbers:
+            if not 1 <= port <= 65535:
+                raise ValueError(f"Неверный номер порта: {port}")
+            ports[port] = None
+    if not ports:
+        raise ValueError("Пустой список портов")
+    return list(ports)
+
+
+def raise_fd_limit(wanted):
+    """Поднятие мягкого лимита дескрипторов, возвращает доступный лимит"""
+    try:
+        import resource
+    except ImportError:
+        # Windows: лимита RLIMIT_NOFILE нет
+        return wanted + _FD_RESERVE
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    target = wanted + _FD_RESERVE
+    if soft != resource.RLIM_INFINITY and soft < target:
+        new_soft = target if hard == resource.RLIM_INFINITY else min(target, hard)
+        try:
+            resource.setrlimit(resource.RLIMIT_NOFILE, (new_soft, hard))
+            soft = new_soft
+        except (ValueError, OSError):
+            pass
+    return soft if soft != resource.RLIM_INFINITY else target
+
+
+def subnet_of(ip):
+    """Подсеть адреса для общей оценки RTT: /24 для IPv4, /64 для IPv6"""
+    if ':' in ip:
+        return str(ipaddress.IPv6Network(f"{ip}/64", strict=False).network_address)
+    return ip.rsplit('.', 1)[0]
+
+
+class RTTEstimator:
+    """Оценка времени ответа и таймаута по хостам и подсетям.
+
+    SRTT и RTTVAR считаются как в TCP (RFC 6298); для хоста без замеров
+    берется оценка его подсети, для новой подсети - начальный таймаут.
+    """
+
+    def __init__(self, initial, min_timeout=MIN_TIMEOUT, max_timeout=None):
+        self.initial = initial
+        self.min_timeout = min_timeout
+        self.max_timeout = max_timeout or initial
+        # Ключ -> [srtt, rttvar]
+        self._estimates = {}
+        self.samples = 0
+
+    def _update(self, key, rtt):
+        estimate = self._estimates.get(key)
+        if estimate is None:
+            self._estimates[key] = [rtt, rtt / 2]
+            return
+        srtt, rttvar = estimate
+        estimate[1] = (1 - RTT_BETA) * rttvar + RTT_BETA * abs(srtt - rtt)
+        estimate[0] = (1 - RTT_ALPHA) * srtt + RTT_ALPHA * rtt
+
+    def update(self, ip, rtt):
+        """Замер: ответ (SYN-ACK или RST) пришел через rtt секунд"""
+        self.samples += 1
+        for key in (ip, subnet_of(ip)):
+            self._update(key, rtt)
+
+    def timeout(self, ip):
+        """Таймаут попытки соединения с хостом"""
+        for key in (ip, subnet_of(ip)):
+            estimate = self._estimates.get(key)
+            if estimate is not None:
+                srtt, rttvar = estimate
+                rto = srtt + max(RTT_GRANULARITY, 4 * rttvar)
+                return min(self.max_timeout, max(self.min_timeout, rto))
+        return self.initial
+
+    def forget(self, ip):
+        """Удалить оценку просканированного хоста (подсеть остается)"""
+        self._estimates.pop(ip, None)
+
+
+class PortScanner:
+    """Неблокирующий TCP connect-сканер на asyncio.
+
+    adaptive - таймауты по измеренному RTT (не больше timeout);
+    liveness - сначала проверить несколько портов хоста и пропустить
+    остальные, если ни один не ответил ни SYN-ACK, ни RST;
+    banners - BannerGrabber: открытые порты сразу уходят на второй этап.
+    """
+
+    def __init__(self, concurrency=1000, per_host=100, timeout=2.0, adaptive=False,
+                 liveness=False, min_timeout=MIN_TIMEOUT, banners=None):
+        self.banners = banners
+        limit = raise_fd_limit(concurrency + (banners.concurrency if banners else 0))
+        self.concurrency = max(1, min(concurrency, limit - _FD_RESERVE -
+                                      (banners.concurrency if banners else 0)))
+        self.per_host = max(1, per_host)
+        self.timeout = timeout
+        self.adaptive = adaptive
+        self.liveness = liveness
+        self.rtt = RTTEstimator(timeout, min_timeout)
+        # Хосты, пропущенные после неудачной проверки доступности
+        self.dead_hosts = 0
+
+    async def probe(self, ip, port):
+        """Одна попытка соединения, возвращает состояние порта"""
+        family = socket.AF_INET6 if ':' in ip else socket.AF_INET
+        sock = socket.socket(family, socket.SOCK_STREAM)
+        count('sockets.scan')
+        sock.setblocking(False)
+        loop = asyncio.get_running_loop()
+        timeout = self.rtt.timeout(ip) if self.adaptive else self.timeout
+        started = loop.time()
+        try:
+            await asyncio.wait_for(loop.sock_connect(sock, (ip, port)), timeout)
+            state = OPEN
+        except ConnectionRefusedError:
+            state = CLOSED
+        except asyncio.TimeoutError:
+            return FILTERED
+        except OSError as e:
+            # Сброс соединения - хост ответил, порт закрыт
+            if e.errno not in (errno.ECONNRESET, errno.ECONNREFUSED):
+                return FILTERED
+            state = CLOSED
+        finally:
+            sock.close()
+        # Хост ответил: время ответа уточняет таймауты
+        self.rtt.update(ip, loop.time() - started)
+        return state
+
+    def plan(self, ports):
+        """Порядок проверки: (порты проверки доступности, остальные порты)"""
+        if not self.liveness or len(ports) <= DISCOVERY_COUNT:
+            return [], ports
+        requested = set(ports)
+        # Сначала самые частые из запрошенных портов
+        chosen = [port for port in DISCOVERY_PORTS if port in requested][:DISCOVERY_COUNT]
+        for port in ports:
+            if len(chosen) >= DISCOVERY_COUNT:
+                break
+            if port not in chosen:
+                chosen.append(port)
+        rest = [port for port in ports if port not in chosen]
+        return chosen, rest
+
+    async def _scan_host(self, ip, plan, global_slots, on_result, on_open=None):
+        """Сканирование всех портов одного хоста с лимитом на хост"""
+        host_slots = asyncio.Semaphore(self.per_host)
+
+        async def run_probe(port):
+            try:
+                state = await self.probe(ip, port)
+                on_result(ip, port, state)
+                if state == OPEN and on_open:
+                    on_open(ip, port)
+                return state
+            finally:
+                host_slots.release()
+                global_slots.release()
+
+        async def run_all(batch):
+            tasks = []
+            for port in batch:
+                await host_slots.acquire()
+                await global_slots.acquire()
+                tasks.append(asyncio.ensure_future(run_probe(port)))
+            return await asyncio.gather(*tasks) if tasks else []
+
+        discovery, ports = plan
+        try:
+            if discovery:
+                states = await run_all(discovery)
+                if all(state == FILTERED for state in states):
+                    # Ни SYN-ACK, ни RST: хост считается недоступным
+                    self.dead_hosts += 1
+                    return
+            await run_all(ports)
+        finally:
+            self.rtt.forget(ip)
+
+    async def run(self, targets, ports, on_result, on_banner=None, on_host=None):
+        """Сканирование целей, on_result(ip, port, state) вызывается по готовности.
+
+        on_banner(ip, port, info) - результат второго этапа для открытых портов;
+        on_host(ip) - все порты хоста проверены (или хост признан недоступным).
+        """
+        ports = list(ports)
+        plan = self.plan(ports)
+        global_slots = asyncio.Semaphore(self.concurrency)
+        # Хостов в работе столько, чтобы заполнить глобальный лимит
+        # (при проверке доступности хост сначала занимает только ее порты)
+        per_host = max(1, min(self.per_host, len(plan[0]) or len(ports)))
+        host_slots = asyncio.Semaphore(max(1, self.concurrency // per_host) * 2)
+        pending = set()
+        grabs = set()
+
+        async def grab(ip, port):
+            on_banner(ip, port, await self.banners.grab(ip, port))
+
+        def start_grab(ip, port):
+            # Баннер читается параллельно со сканированием остальных портов
+            task = asyncio.ensure_future(grab(ip, port))
+            grabs.add(task)
+            task.add_done_callback(grabs.discard)
+
+        on_open = start_grab if self.banners and on_banner else None
+
+        async def run_host(ip):
+            try:
+                await self._scan_host(ip, plan, global_slots, on_result, on_open)
+                if on_host:
+                    on_host(ip)
+            finally:
+                host_slots.release()
+
+        for ip in targets:
+            await host_slots.acquire()
+            task = asyncio.ensure_future(run_host(str(ip)))
+            pending.add(task)
+            task.add_done_callback(pending.discard)
+        if pending:
+            await asyncio.gather(*pending)
+        if grabs:
+            await asyncio.gather(*grabs)
+
+    async def stream(self, targets, ports):
+        """Асинхронный генератор результатов (ip, port, state)"""
+        queue = asyncio.Queue()
+        done = object()
+
+        async def produce():
+            try:
+                await self.run(targets, ports, lambda *result: queue.put_nowait(result))
+            finally:
+                queue.put_nowait(done)
+
+        producer = asyncio.ensure_future(produce())
+        try:
+            while True:
+                item = await queue.get()
+                if item is done:
+                    break
+                yield item
+            await producer
+        finally:
+            producer.cancel()
+
+    @traced('scan')
+    def scan(self, targets, ports, on_result=None, on_banner=None, on_host=None):
+        """Синхронная обертка: сканирует и возвращает список открытых (ip, port)"""
+        open_ports = []
+
+        def collect(ip, port, state):
+            if state == OPEN:
+                open_ports.append((ip, port))
+            if on_result:
+                on_result(ip, port, state)
+
+        if isinstance(targets, (str, ipaddress.IPv4Address, ipaddress.IPv6Address)):
+            targets = [targets]
+        asyncio.run(self.run(targets, ports, collect, on_banner, on_host))
+        return open_ports
+
+
+def _der_common_names(der):
+    """Значения CN из сертификата в DER: сначала издатель, затем субъект"""
+    names = []
+    marker = b'\x06\x03\x55\x04\x03'
+    position = der.find(marker)
+    while position >= 0:
+        start = position + len(marker)
+        if start + 2 <= len(der):
+            length = der[start + 1]
+            if length < 0x80:
+                names.append(der[start + 2:start + 2 + length].decode('utf-8', 'replace'))
+        position = der.find(marker, start)
+    return names
+
+
+def identify_service(port, banner):
+    """Служба по тексту баннера, иначе по номеру порта"""
+    text = banner.lstrip()
+    upper = text[:200].upper()
+    if text.startswith('SSH-'):
+        return 'ssh'
+    if text.startswith('HTTP/'):
+        return 'http'
+    if text.startswith('+OK'):
+        return 'pop3'
+    if text.startswith('* OK'):
+        return 'imap'
+    if text.startswith('220') or text.startswith('250'):
+        if 'FTP' in upper:
+            return 'ftp'
+        if 'SMTP' in upper or 'MAIL' in upper or text.startswith('250'):
+            return 'smtp'
+        return 'ftp' if port in (21, 990, 2121) else 'smtp'
+    if upper.startswith('RFB '):
+        return 'vnc'
+    if 'mysql' in text[:64].lower():
+        return 'mysql'
+    return port_name(port).lower()
+
+
+class BannerGrabber:
+    """Второй этап сканирования: баннеры и пробы протоколов открытых портов.
+
+    На каждый порт - не больше max_bytes прочитанных байт и timeout
+    секунд; сначала ждем приветствия (SSH, SMTP, FTP), затем шлем пробу:
+    HTTP-запрос или EHLO. На TLS-портах сначала выполняется рукопожатие.
+    """
+
+    def __init__(self, concurrency=BANNER_CONCURRENCY, timeout=BANNER_TIMEOUT,
+                 max_bytes=BANNER_MAX_BYTES, greeting_wait=GREETING_WAIT):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.max_bytes = max_bytes
+        self.greeting_wait = min(greeting_wait, timeout / 2)
+        self._slots = None
+        self.grabbed = 0
+
+    async def _read(self, reader, budget, wait):
+        try:
+            return await asyncio.wait_for(reader.read(budget), wait)
+        except asyncio.TimeoutError:
+            return b''
+
+    async def _exchange(self, ip, port, info):
+        loop = asyncio.get_running_loop()
+        deadline = loop.time() + self.timeout
+        context = None
+        if port in TLS_PORTS:
+            context = ssl.create_default_context()
+            context.check_hostname = False
+            context.verify_mode = ssl.CERT_NONE
+        count('sockets.banner')
+        reader, writer = await asyncio.open_connection(ip, port, ssl=context)
+        try:
+            if context:
+                tls = writer.get_extra_info('ssl_object')
+                names = _der_common_names(tls.getpeercert(binary_form=True) or b'')
+                info['tls'] = {'version': tls.version(), 'cipher': tls.cipher()[0],
+                               'subject': names[-1] if names else None,
+                               'issuer': names[0] if len(names) > 1 else None}
+            data = await self._read(reader, self.max_bytes, self.greeting_wait)
+            if not data:
+                # Сервер молчит: проба HTTP (на TLS-портах - HTTP поверх TLS)
+                writer.write(f"HEAD / HTTP/1.0\r\nHost: {ip}\r\nUser-Agent: osint-cli\r\n\r\n".encode())
+            elif data.startswith(b'220') and port not in (21, 990, 2121) and b'FTP' not in data.upper():
+                # Приветствие SMTP: EHLO показывает расширения сервера
+                writer.write(b"EHLO osint-cli\r\n")
+            else:
+                return data
+            await writer.drain()
+            remaining = max(0.0, deadline - loop.time())
+            more = await self._read(reader, self.max_bytes - len(data), remaining)
+            return data + more
+        finally:
+            writer.close()
+
+    async def grab(self, ip, port):
+        """Сведения о службе: {'service', 'banner', 'tls'} или с ключом 'error'"""
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self.concurrency)
+        info = {'service': port_name(port).lower(), 'banner': '', 'tls': None}
+        async with self._slots:
+            try:
+                data = await asyncio.wait_for(self._exchange(ip, port, info), self.timeout)
+                banner = data[:self.max_bytes].decode('utf-8', 'replace')
+                info['banner'] = banner.strip()
+                if banner:
+                    info['service'] = identify_service(port, banner)
+                if info['tls'] and info['service'] == 'http':
+                    info['service'] = 'https'
+            except (asyncio.TimeoutError, OSError, ssl.SSLError) as e:
+                info['error'] = str(e) or type(e).__name__
+        self.grabbed += 1
+        return info
+
+
+def banner_summary(info, width=80):
+    """Краткая строка о службе для вывода: служба, TLS, первая строка баннера"""
+    parts = [info['service']]
+    tls = info.get('tls')
+    if tls:
+        parts.append(f"{tls['version']}" + (f", CN={tls['subject']}" if tls.get('subject') else ''))
+    line = info['banner'].splitlines()[0] if info['banner'] else ''
+    if line:
+        parts.append(line[:width] + ('...' if len(line) > width else ''))
+    elif info.get('error'):
+        parts.append(f"нет ответа ({info['error']})")
+    return ' | '.join(parts)
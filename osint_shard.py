@@ -0,0 +1,171 @@
+#!/usr/bin/env python3
+"""
+Многопроцессное сканирование сети для OSINT CLI Helper
+Пространство целей делится между процессами по номеру в порядке обхода,
+каждый процесс ведет свой цикл asyncio. Результаты возвращаются пачками
+через очередь и выдаются в порядке номеров целей
+"""
+
+import heapq
+import multiprocessing
+import queue as queue_module
+import signal
+import time
+
+from osint_metrics import traced
+from osint_scan import PortScanner, BannerGrabber, OPEN
+from osint_targets import TargetSet
+
+# Результатов в одной пачке и максимальная задержка отправки пачки
+SHARD_BATCH = 512
+SHARD_FLUSH = 0.2
+
+# Как часто проверять, живы ли процессы, пока очередь пуста (секунды)
+POLL_INTERVAL = 1.0
+
+
+class _ShardReporter:
+    """Сторона процесса-исполнителя: копит результаты и отправляет пачками.
+
+    Граница (watermark) - номер, ниже которого все цели сегмента
+    завершены и их результаты уже отправлены.
+    """
+
+    def __init__(self, shard, queue):
+        self.shard = shard
+        self.queue = queue
+        self.opens = []
+        self.done = []
+        self.banners = []
+        self.inflight = {}
+        self.next_position = 0
+        self.sent = time.monotonic()
+
+    def track(self, items):
+        for position, ip in items:
+            self.inflight[ip] = position
+            self.next_position = position + 1
+            yield ip
+
+    def watermark(self):
+        return min(self.inflight.values()) if self.inflight else self.next_position
+
+    def on_result(self, ip, port, state):
+        if state == OPEN:
+            self.opens.append((self.inflight[ip], ip, port))
+
+    def on_banner(self, ip, port, info):
+        self.banners.append((ip, port, info))
+
+    def on_host(self, ip):
+        self.done.append(self.inflight.pop(ip))
+        if (len(self.done) + len(self.opens) >= SHARD_BATCH
+                or time.monotonic() - self.sent >= SHARD_FLUSH):
+            self.flush()
+
+    def flush(self, final=False):
+        watermark = None if final else self.watermark()
+        self.queue.put(('batch', self.shard, watermark, self.opens, self.done, self.banners))
+        self.opens, self.done, self.banners = [], [], []
+        self.sent = time.monotonic()
+
+
+def scan_shard(shard, shards, target, exclude, ports, randomize, seed, skip, options, queue):
+    """Точка входа процесса: сканирование сегмента shard из shards"""
+    # Ctrl+C обрабатывает родительский процесс
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    try:
+        targets = TargetSet(target, exclude)
+        options = dict(options)
+        banners = options.pop('banners', False)
+        scanner = PortScanner(banners=BannerGrabber() if banners else None, **options)
+        reporter = _ShardReporter(shard, queue)
+        items = targets.iter_positions(randomize, seed, skip, shard, shards)
+        scanner.scan(reporter.track(items), ports, reporter.on_result,
+                     reporter.on_banner if banners else None, reporter.on_host)
+        reporter.flush(final=True)
+        queue.put(('end', shard, scanner.dead_hosts))
+    except Exception as e:
+        queue.put(('error', shard, f"{type(e).__name__}: {e}"))
+
+
+class ShardedScanner:
+    """Сканирование в нескольких процессах с упорядоченной выдачей результатов"""
+
+    def __init__(self, processes, concurrency=1000, banners=False, **options):
+        self.processes = max(1, processes)
+        # Общий лимит соединений делится между процессами
+        self.options = dict(options, banners=banners,
+                            concurrency=max(1, concurrency // self.processes))
+        self.dead_hosts = 0
+
+    @traced('scan')
+    def scan(self, target, exclude, ports, randomize=False, seed=0, skip=(),
+             on_open=None, on_banner=None, on_done=None):
+        """Сканирование; возвращает число открытых портов.
+
+        on_open(ip, port) - в порядке номеров целей; on_banner(ip, port, info) -
+        по мере готовности; on_done(номер) - цель просканирована полностью,
+        вызывается после on_open для всех ее портов. Счетчики сокетов
+        процессов-исполнителей в метрики родителя не попадают.
+        """
+        context = multiprocessing.get_context()
+        queue = context.Queue()
+        workers = []
+        for shard in range(self.processes):
+            worker = context.Process(
+                target=scan_shard, name=f'scan-shard-{shard}', daemon=True,
+                args=(shard, self.processes, target, exclude, list(ports), randomize, seed,
+                      [list(item) for item in skip], self.options, queue))
+            worker.start()
+            workers.append(worker)
+
+        # Граница каждого сегмента; у завершенных сегментов ее нет
+        watermarks = {shard: 0 for shard in range(self.processes)}
+        pending = []
+        completed = []
+        found = 0
+        try:
+            while watermarks:
+                try:
+                    message = queue.get(timeout=POLL_INTERVAL)
+                except queue_module.Empty:
+                    for worker in workers:
+                        if worker.exitcode not in (None, 0):
+                            raise RuntimeError(f"процесс {worker.name} завершился с кодом {worker.exitcode}")
+                    continue
+                kind, shard = message[0], message[1]
+                if kind == 'error':
+                    raise RuntimeError(f"сегмент {shard}: {message[2]}")
+                if kind == 'end':
+                    self.dead_hosts += message[2]
+                    del watermarks[shard]
+                else:
+                    _, _, watermark, opens, done, banners = message
+                    for item in opens:
+                        heapq.heappush(pending, item)
+                    for position in done:
+                        heapq.heappush(completed, position)
+                    if on_banner:
+                        for ip, port, info in banners:
+                            on_banner(ip, port, info)
+                    if watermark is not None:
+                        watermarks[shard] = watermark
+                # Выдаются результаты ниже границы всех сегментов
+                released = min(watermarks.values()) if watermarks else float('inf')
+                while pending and pending[0][0] < released:
+                    _, ip, port = heapq.heappop(pending)
+                    found += 1
+                    if on_open:
+                        on_open(ip, port)
+                while completed and completed[0] < released:
+                    position = heapq.heappop(completed)
+                    if on_done:
+                        on_done(position)
+        finally:
+            for worker in workers:
+                if worker.is_alive():
+                    worker.terminate()
+                worker.join()
+            queue.close()
+        return found
@@ -0,0 +1,151 @@
+#!/usr/bin/env python3
+"""
+Поиск профилей в социальных сетях для OSINT CLI Helper
+Планировщик проверок: все платформы параллельно, у каждой свой лимит частоты
+"""
+
+import json
+import os
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from osint_metrics import count
+from osint_ratelimit import KeyedRateLimiter
+
+# Запись каталога: шаблон URL, группа и способ проверки
+Platform = namedtuple('Platform', 'name url group probe marker absent_marker max_bytes')
+
+# Каталог платформ по умолчанию (рядом с модулем)
+DEFAULT_CATALOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'platforms.json')
+
+# Стратегии проверки профиля
+PROBES = ('head', 'get', 'body')
+
+# Сколько байт тела читать при поиске маркера, если в каталоге не задано
+DEFAULT_MAX_BYTES = 65536
+
+# Запросов в секунду к одной платформе (прежняя пауза 0.5 с)
+DEFAULT_RATE = 2.0
+
+
+def split_usernames(usernames):
+    """Список имен из строки через запятую или из итерируемого объекта"""
+    if isinstance(usernames, str):
+        usernames = usernames.split(',')
+    return [name.strip() for name in usernames if name.strip()]
+
+
+def load_catalog(path=None):
+    """Загрузка каталога платформ из JSON или YAML (нужен PyYAML)"""
+    path = path or DEFAULT_CATALOG
+    with open(path, encoding='utf-8') as f:
+        if path.lower().endswith(('.yaml', '.yml')):
+            try:
+                import yaml
+            except ImportError:
+                raise ValueError("Для YAML-каталога установите PyYAML: pip install PyYAML")
+            data = yaml.safe_load(f)
+        else:
+            data = json.load(f)
+    platforms = []
+    for entry in data.get('platforms', []):
+        probe = entry.get('probe', 'get')
+        if probe not in PROBES:
+            raise ValueError(f"{entry.get('name')}: неизвестная стратегия проверки '{probe}'")
+        if probe == 'body' and not (entry.get('marker') or entry.get('absent_marker')):
+            raise ValueError(f"{entry.get('name')}: для стратегии body нужен marker или absent_marker")
+        platforms.append(Platform(
+            name=entry['name'],
+            url=entry['url'],
+            group=entry.get('group', 'basic'),
+            probe=probe,
+            marker=entry.get('marker'),
+            absent_marker=entry.get('absent_marker'),
+            max_bytes=int(entry.get('max_bytes', DEFAULT_MAX_BYTES)),
+        ))
+    return platforms
+
+
+def select_platforms(catalog, group=None):
+    """Платформы каталога из указанной группы (все, если группа не задана)"""
+    return [platform for platform in catalog if group is None or platform.group == group]
+
+
+class ProfileScheduler:
+    """Параллельная проверка профилей с token bucket на каждую платформу"""
+
+    def __init__(self, session, rate=DEFAULT_RATE, burst=2, workers=32, timeout=5):
+        self.session = session
+        self.limiter = KeyedRateLimiter(rate, burst)
+        self.workers = workers
+        self.timeout = timeout
+        # Сколько байт тел ответов прочитано при поиске маркеров
+        self.bytes_read = 0
+
+    def _probe(self, username, platform, url):
+        # Лимит по платформе, а не по хосту: у Tumblr и Slack хост зависит от имени
+        self.limiter.acquire(platform.name)
+        try:
+            found = self._fetch(platform, url)
+        except Exception:
+            found = False
+        return username, platform.name, url, found
+
+    def _fetch(self, platform, url):
+        """Проверка профиля с минимальным объемом скачанных данных"""
+        if platform.probe == 'head':
+            response = self.session.head(url, timeout=self.timeout, allow_redirects=True)
+            response.close()
+            # Сервер не поддерживает HEAD - проверяем GET без тела
+            if response.status_code not in (405, 501):
+                return response.status_code == 200
+        # Тело не скачивается: после заголовков соединение закрывается
+        with self.session.get(url, timeout=self.timeout, stream=True) as response:
+            if response.status_code != 200:
+                return False
+            if platform.probe != 'body':
+                return True
+            return self._match_marker(response, platform)
+
+    def _match_marker(self, response, platform):
+        """Поиск маркера в первых max_bytes тела ответа"""
+        markers = [m for m in (platform.marker, platform.absent_marker) if m]
+        overlap = max(len(m.encode('utf-8')) for m in markers) - 1
+        window = b''
+        read = 0
+        for chunk in response.iter_content(chunk_size=8192):
+            read += len(chunk)
+            count('http.bytes', len(chunk))
+            # Хвост прошлого куска - чтобы найти маркер на границе кусков
+            window = window[-overlap:] + chunk if overlap else chunk
+            if platform.marker and platform.marker.encode('utf-8') in window:
+                self.bytes_read += read
+                return True
+            if platform.absent_marker and platform.absent_marker.encode('utf-8') in window:
+                self.bytes_read += read
+                return False
+            if read >= platform.max_bytes:
+                break
+        self.bytes_read += read
+        # Маркер не встретился: профиль есть, только если ждали признак отсутствия
+        return platform.marker is None
+
+    def check(self, usernames, platforms):
+        """Генератор (username, platform, url, found) по мере завершения проверок"""
+        # Имена идут внешним циклом: соседние задачи относятся к разным платформам
+        tasks = ((username, platform, platform.url.format(username=username))
+                 for username in split_usernames(usernames)
+                 for platform in platforms)
+        limit = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = set()
+            for task in tasks:
+                running.add(executor.submit(self._probe, *task))
+                if len(running) >= limit:
+                    done, running = wait(running, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+            while running:
+                done, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
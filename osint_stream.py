@@ -0,0 +1,224 @@
+#!/usr/bin/env python3
+"""
+Потоковая обработка HTTP-ответов для OSINT CLI Helper
+Тело ответа читается кусками с лимитом по объему и времени
+и передается сканерам без накопления всей страницы в памяти
+"""
+
+import codecs
+import json
+import time
+
+from osint_metrics import count
+
+# Лимиты чтения одной страницы по умолчанию
+DEFAULT_MAX_BYTES = 5 * 1024 * 1024
+DEFAULT_MAX_TIME = 15.0
+
+# Размер куска при чтении тела
+CHUNK_SIZE = 64 * 1024
+
+# Предел одного чтения из сокета при разборе страницы с лимитом времени
+READ_SIZE = 16 * 1024
+
+# Максимальный размер одного элемента JSON-массива при потоковом разборе
+MAX_JSON_ITEM = 16 * 1024 * 1024
+
+
+class RegexStreamScanner:
+    """Поиск регулярного выражения в потоке текста.
+
+    Совпадения у конца куска откладываются до следующего куска, поэтому
+    значение, разрезанное границей, находится целиком. overlap должен быть
+    не меньше длины самого длинного ожидаемого совпадения.
+    """
+
+    def __init__(self, pattern, overlap=256, on_match=None):
+        self.pattern = pattern
+        self.overlap = overlap
+        self.on_match = on_match
+        self.matches = []
+        self._tail = ''
+        # Абсолютная позиция начала _tail в потоке
+        self._offset = 0
+
+    def feed(self, text, final=False):
+        window = self._tail + text
+        # Совпадения, заканчивающиеся ближе overlap к концу окна, ждут продолжения
+        limit = len(window) if final else max(len(window) - self.overlap, 0)
+        keep_from = limit
+        for match in self.pattern.finditer(window):
+            if match.end() > limit:
+                keep_from = min(keep_from, match.start())
+                break
+            self._emit(match, self._offset)
+        self._tail = window[keep_from:]
+        self._offset += keep_from
+
+    def finish(self):
+        """Конец потока: обработать отложенный хвост"""
+        self.feed('', final=True)
+        self._tail = ''
+
+    def _emit(self, match, offset):
+        if self.on_match:
+            self.on_match(match, offset)
+        else:
+            self.matches.append(match.group(0))
+
+
+def cap_timeout(timeout, max_time):
+    """Таймаут requests (число или пара подключение/чтение), не больше max_time"""
+    if max_time is None:
+        return timeout
+    if isinstance(timeout, (tuple, list)):
+        return tuple(max_time if part is None else min(part, max_time) for part in timeout)
+    return max_time if timeout is None else min(timeout, max_time)
+
+
+def _response_socket(response):
+    """Сокет соединения, из которого читается тело ответа, или None"""
+    connection = getattr(response.raw, 'connection', None)
+    return getattr(connection, 'sock', None)
+
+
+def stream_text(response, consumers, max_bytes=DEFAULT_MAX_BYTES, max_time=DEFAULT_MAX_TIME):
+    """Чтение тела ответа кусками с передачей текста потребителям.
+
+    У потребителя вызываются feed(text) на каждый кусок и finish() в конце.
+    Перед каждым чтением таймаут сокета уменьшается до оставшегося времени,
+    поэтому сервер, отдающий тело по байту, не растягивает разбор за max_time.
+    Возвращает словарь: прочитано байт, обрезано ли тело и по какой причине.
+    """
+    # Модуль импортируется CLI при запуске ради лимитов, сокеты нужны только здесь
+    import socket
+    from urllib3.exceptions import ReadTimeoutError
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    started = time.monotonic()
+    deadline = started + max_time
+    raw = response.raw
+    # read1 возвращает то, что уже пришло, не дожидаясь полного куска (urllib3 >= 2.3)
+    read = getattr(raw, 'read1', None) or raw.read
+    sock = _response_socket(response)
+    read_timeout = sock.gettimeout() if sock is not None else None
+    received = 0
+    reason = None
+    try:
+        while True:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                reason = 'max_time'
+                break
+            limited = read_timeout is None or remaining < read_timeout
+            if sock is not None:
+                sock.settimeout(remaining if limited else read_timeout)
+            try:
+                chunk = read(READ_SIZE, decode_content=True)
+            except (ReadTimeoutError, socket.timeout):
+                if not limited:
+                    raise
+                reason = 'max_time'
+                break
+            if not chunk:
+                break
+            count('http.bytes', len(chunk))
+            if received + len(chunk) > max_bytes:
+                chunk = chunk[:max_bytes - received]
+                reason = 'max_bytes'
+            received += len(chunk)
+            text = decoder.decode(chunk)
+            for consumer in consumers:
+                consumer.feed(text)
+            if reason:
+                break
+        if not reason:
+            tail = decoder.decode(b'', final=True)
+            if tail:
+                for consumer in consumers:
+                    consumer.feed(tail)
+    finally:
+        # Недочитанное тело не нужно: соединение закрывается
+        response.close()
+    for consumer in consumers:
+        consumer.finish()
+    return {'bytes': received, 'truncated': reason is not None, 'reason': reason,
+            'elapsed': time.monotonic() - started}
+
+
+def iter_text(response, chunk_size=CHUNK_SIZE):
+    """Генератор декодированных кусков тела ответа; соединение закрывается в конце"""
+    decoder = codecs.getincrementaldecoder(response.encoding or 'utf-8')(errors='replace')
+    try:
+        for chunk in response.iter_content(chunk_size=chunk_size):
+            count('http.bytes', len(chunk))
+            text = decoder.decode(chunk)
+            if text:
+                yield text
+        tail = decoder.decode(b'', final=True)
+        if tail:
+            yield tail
+    finally:
+        response.close()
+
+
+def iter_json_array(chunks, max_item=MAX_JSON_ITEM):
+    """Потоковый разбор JSON-массива верхнего уровня по одному элементу.
+
+    chunks - итерируемый объект с кусками текста. В памяти держится только
+    недоразобранный хвост, а не весь массив.
+    """
+    decoder = json.JSONDecoder()
+    buffer = ''
+    position = 0
+    started = False
+    finished = False
+    chunks = iter(chunks)
+    while True:
+        chunk = next(chunks, None)
+        final = chunk is None
+        if chunk:
+            buffer = buffer[position:] + chunk
+            position = 0
+        while True:
+            # Пропуск пробелов и разделителей между элементами
+            while position < len(buffer) and buffer[position] in ' \t\r\n':
+                position += 1
+            if position >= len(buffer):
+                break
+            if finished:
+                raise ValueError("Лишние данные после конца JSON-массива")
+            if not started:
+                if buffer[position] != '[':
+                    raise ValueError("Ожидался JSON-массив")
+                started = True
+                position += 1
+                continue
+            if buffer[position] == ',':
+                position += 1
+                continue
+            if buffer[position] == ']':
+                finished = True
+                position += 1
+                continue
+            try:
+                item, end = decoder.raw_decode(buffer, position)
+            except json.JSONDecodeError:
+                # Элемент разрезан границей куска: ждем продолжения
+                if final:
+                    raise
+                if len(buffer) - position > max_item:
+                    raise ValueError(f"Элемент JSON-массива больше {max_item} байт")
+                break
+            if (not final and not isinstance(item, (dict, list, str))
+                    and (end == len(buffer) or buffer[end] not in ' \t\r\n,]')):
+                # Число в конце буфера может продолжиться в следующем куске,
+                # в том числе после разреза на "-0." или "5e"
+                if len(buffer) - position > max_item:
+                    raise ValueError(f"Элемент JSON-массива больше {max_item} байт")
+                break
+            position = end
+            yield item
+        if final:
+            break
+    if not finished:
+        raise ValueError("JSON-массив оборван" if started else "Пустой ответ вместо JSON-массива")
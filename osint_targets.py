@@ -0,0 +1,225 @@
+#!/usr/bin/env python3
+"""
+Разбор и ленивое перечисление целей сканирования для OSINT CLI Helper
+Цели хранятся как отрезки целых чисел: /8 занимает столько же памяти,
+сколько один адрес. Поддерживаются списки CIDR, диапазонов и хостов,
+исключения и псевдослучайный порядок обхода без построения списка
+"""
+
+import ipaddress
+import os
+import socket
+from bisect import bisect_right
+
+# Раундов сети Фейстеля при перемешивании
+FEISTEL_ROUNDS = 4
+
+_MASK64 = (1 << 64) - 1
+
+
+def _mix64(value):
+    """Перемешивание 64-битного числа (финализатор splitmix64)"""
+    value = (value ^ (value >> 30)) * 0xbf58476d1ce4e5b9 & _MASK64
+    value = (value ^ (value >> 27)) * 0x94d049bb133111eb & _MASK64
+    return value ^ (value >> 31)
+
+
+class FeistelPermutation:
+    """Псевдослучайная перестановка чисел 0..size-1 без хранения.
+
+    Сеть Фейстеля переставляет 2^(2*half) значений; значения вне
+    диапазона пропускаются повторным применением (cycle-walking).
+    """
+
+    def __init__(self, size, seed=0, rounds=FEISTEL_ROUNDS):
+        self.size = size
+        bits = max(2, (size - 1).bit_length())
+        self.half = (bits + 1) // 2
+        self.mask = (1 << self.half) - 1
+        self.keys = [_mix64(seed * FEISTEL_ROUNDS + i + 1) for i in range(rounds)]
+
+    def _encrypt(self, value):
+        left, right = value >> self.half, value & self.mask
+        for key in self.keys:
+            left, right = right, left ^ (_mix64(right ^ key) & self.mask)
+        return (left << self.half) | right
+
+    def __getitem__(self, index):
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        value = self._encrypt(index)
+        while value >= self.size:
+            value = self._encrypt(value)
+        return value
+
+    def __len__(self):
+        return self.size
+
+    def __iter__(self):
+        for index in range(self.size):
+            yield self[index]
+
+
+def _parse_address(text):
+    """Адрес IPv4/IPv6 или имя хоста (разрешается через DNS)"""
+    try:
+        return ipaddress.ip_address(text)
+    except ValueError:
+        pass
+    try:
+        return ipaddress.ip_address(socket.gethostbyname(text))
+    except OSError:
+        raise ValueError(f"Не удалось разобрать цель '{text}'")
+
+
+def parse_item(text, hosts_only=True):
+    """Один элемент списка: (версия IP, начало, конец) включительно.
+
+    Форматы: 10.0.0.0/24, 10.0.0.1-10.0.0.50, 10.0.0.1-50, 10.0.0.1, host.example.
+    hosts_only=False - сеть целиком (для исключений).
+    """
+    text = text.strip()
+    if '/' in text:
+        network = ipaddress.ip_network(text, strict=False)
+        start, end = int(network.network_address), int(network.broadcast_address)
+        # Как network.hosts(): без адреса сети и широковещательного
+        if hosts_only and network.version == 4 and network.prefixlen < 31:
+            start, end = start + 1, end - 1
+        elif hosts_only and network.version == 6 and network.prefixlen < 127:
+            start += 1
+        return network.version, start, end
+    if '-' in text:
+        first, last = text.split('-', 1)
+        try:
+            first = ipaddress.ip_address(first.strip())
+        except ValueError:
+            # Не диапазон, а имя хоста с дефисом
+            first = None
+        if first is not None:
+            last = last.strip()
+            if last.isdigit() and first.version == 4 and int(last) <= 255:
+                # Короткая запись: 10.0.0.1-50 - последний октет
+                last = ipaddress.IPv4Address((int(first) & ~0xff) | int(last))
+            else:
+                last = ipaddress.ip_address(last)
+            if first.version != last.version or int(last) < int(first):
+                raise ValueError(f"Неверный диапазон '{text}'")
+            return first.version, int(first), int(last)
+    address = _parse_address(text)
+    return address.version, int(address), int(address)
+
+
+def split_spec(spec):
+    """Элементы из строки через запятую/пробел, из файла (@путь) или списка"""
+    if isinstance(spec, str):
+        if spec.startswith('@') and os.path.exists(spec[1:]):
+            with open(spec[1:], encoding='utf-8') as f:
+                spec = [line.split('#', 1)[0] for line in f]
+        else:
+            spec = [spec]
+    items = []
+    for part in spec:
+        items.extend(item for item in part.replace(',', ' ').split() if item)
+    return items
+
+
+def _merge(intervals):
+    merged = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1] + 1:
+            if end > merged[-1][1]:
+                merged[-1][1] = end
+        else:
+            merged.append([start, end])
+    return merged
+
+
+def _subtract(intervals, excluded):
+    result = []
+    excluded = _merge(excluded)
+    position = 0
+    for start, end in intervals:
+        while position < len(excluded) and excluded[position][1] < start:
+            position += 1
+        index = position
+        while start <= end and index < len(excluded) and excluded[index][0] <= end:
+            ex_start, ex_end = excluded[index]
+            if ex_start > start:
+                result.append([start, ex_start - 1])
+            start = max(start, ex_end + 1)
+            index += 1
+        if start <= end:
+            result.append([start, end])
+    return result
+
+
+class TargetSet:
+    """Множество адресов в виде отрезков с ленивым перебором"""
+
+    def __init__(self, spec, exclude=None):
+        include = {4: [], 6: []}
+        for item in split_spec(spec):
+            version, start, end = parse_item(item)
+            include[version].append((start, end))
+        removed = {4: [], 6: []}
+        for item in split_spec(exclude or []):
+            version, start, end = parse_item(item, hosts_only=False)
+            removed[version].append((start, end))
+        # Отрезки (версия, начало, конец): сначала IPv4, затем IPv6
+        self.intervals = []
+        for version in (4, 6):
+            for start, end in _subtract(_merge(include[version]), removed[version]):
+                self.intervals.append((version, start, end))
+        # Накопленное число адресов до начала каждого отрезка
+        self._offsets = []
+        total = 0
+        for _, start, end in self.intervals:
+            self._offsets.append(total)
+            total += end - start + 1
+        self.size = total
+
+    def __len__(self):
+        return self.size
+
+    def __getitem__(self, index):
+        """Адрес по номеру в порядке возрастания (строкой)"""
+        if not 0 <= index < self.size:
+            raise IndexError(index)
+        position = bisect_right(self._offsets, index) - 1
+        version, start, _ = self.intervals[position]
+        return self._format(version, start + index - self._offsets[position])
+
+    @staticmethod
+    def _format(version, number):
+        if version == 4:
+            return socket.inet_ntoa(number.to_bytes(4, 'big'))
+        return str(ipaddress.IPv6Address(number))
+
+    def __iter__(self):
+        for version, start, end in self.intervals:
+            for number in range(start, end + 1):
+                yield self._format(version, number)
+
+    def shuffled(self, seed=0):
+        """Все адреса в псевдослучайном порядке: соседние адреса идут вразброс"""
+        permutation = FeistelPermutation(self.size, seed)
+        for index in permutation:
+            yield self[index]
+
+    def iter(self, randomize=False, seed=0):
+        return self.shuffled(seed) if randomize else iter(self)
+
+    def iter_positions(self, randomize=False, seed=0, skip=(), shard=0, shards=1):
+        """Пары (номер в порядке обхода, адрес) без номеров из отрезков skip.
+
+        skip - отсортированные непересекающиеся отрезки [начало, конец]:
+        так возобновленное сканирование пропускает завершенные цели.
+        shard из shards - только номера с остатком shard от деления на shards.
+        """
+        permutation = FeistelPermutation(self.size, seed) if randomize else None
+        position = 0
+        for start, end in list(skip) + [(self.size, self.size)]:
+            first = position + (shard - position) % shards
+            for index in range(first, min(start, self.size), shards):
+                yield index, self[permutation[index] if permutation else index]
+            position = max(position, end + 1)
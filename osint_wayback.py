@@ -0,0 +1,232 @@
+#!/usr/bin/env python3
+"""
+Выгрузка архивных URL из Wayback Machine для OSINT CLI Helper
+CDX API обходится постранично (page или resumeKey), страницы качаются
+параллельно с ограничением частоты, прогресс сохраняется на диск
+"""
+
+import hashlib
+import json
+import os
+import sys
+from concurrent.futures import ThreadPoolExecutor, FIRST_COMPLETED, wait
+
+from osint_ratelimit import TokenBucket
+from osint_stream import iter_text, iter_json_array
+
+CDX_URL = "http://web.archive.org/cdx/search/cdx"
+
+# Параллельных запросов и запросов в секунду к CDX API
+DEFAULT_WORKERS = 4
+DEFAULT_RATE = 1.0
+
+# Строк на запрос в режиме resumeKey
+RESUME_LIMIT = 10000
+
+# Сколько URL возвращает быстрый запрос без перебора страниц (команда archive)
+SAMPLE_LIMIT = 1000
+
+
+def url_digest(url):
+    """64-битный отпечаток URL: множество чисел компактнее множества строк"""
+    return int.from_bytes(hashlib.blake2b(url.encode('utf-8'), digest_size=8).digest(), 'little')
+
+
+class URLSink:
+    """Вывод уникальных URL в файл или stdout"""
+
+    def __init__(self, path=None, resume=False):
+        self.path = path
+        self.seen = set()
+        self.written = 0
+        if path in (None, '-'):
+            self.stream = sys.stdout
+        else:
+            if resume and os.path.exists(path):
+                # Уже выгруженные URL не повторяются после возобновления
+                with open(path, encoding='utf-8') as f:
+                    for line in f:
+                        self.seen.add(url_digest(line.rstrip('\n')))
+            self.stream = open(path, 'a' if resume else 'w', encoding='utf-8')
+
+    def add(self, url):
+        """Записать URL, если его еще не было; True для нового URL"""
+        digest = url_digest(url)
+        if digest in self.seen:
+            return False
+        self.seen.add(digest)
+        self.stream.write(url + '\n')
+        self.written += 1
+        return True
+
+    def flush(self):
+        self.stream.flush()
+        if self.stream is not sys.stdout:
+            os.fsync(self.stream.fileno())
+
+    def close(self):
+        if self.stream is not sys.stdout:
+            self.stream.close()
+
+
+class Checkpoint:
+    """Прогресс выгрузки в JSON-файле; запись атомарна"""
+
+    def __init__(self, path):
+        self.path = path
+        self.state = {}
+        if path and os.path.exists(path):
+            with open(path, encoding='utf-8') as f:
+                self.state = json.load(f)
+
+    def matches(self, domain):
+        return self.state.get('domain') == domain
+
+    def reset(self, domain):
+        self.state = {'domain': domain}
+
+    def save(self):
+        if not self.path:
+            return
+        tmp = self.path + '.tmp'
+        with open(tmp, 'w', encoding='utf-8') as f:
+            json.dump(self.state, f)
+        os.replace(tmp, self.path)
+
+    def remove(self):
+        if self.path and os.path.exists(self.path):
+            os.remove(self.path)
+
+
+class CDXHarvester:
+    """Постраничный обход CDX API"""
+
+    def __init__(self, session, base_url=CDX_URL, workers=DEFAULT_WORKERS, rate=DEFAULT_RATE,
+                 burst=2, checkpoint=None):
+        self.session = session
+        self.base_url = base_url
+        self.workers = workers
+        self.limiter = TokenBucket(rate, burst)
+        self.checkpoint = Checkpoint(checkpoint)
+        self.pages = None
+        self.requests = 0
+
+    def _get(self, params, stream=False):
+        self.limiter.acquire()
+        self.requests += 1
+        response = self.session.get(self.base_url, params=params, stream=stream)
+        if response.status_code != 200:
+            response.close()
+            raise ValueError(f"CDX API вернул статус {response.status_code}")
+        return response
+
+    def _query(self, domain):
+        return {'url': domain, 'matchType': 'domain', 'fl': 'original'}
+
+    def num_pages(self, domain):
+        """Число страниц результата или None, если сервер не поддерживает page"""
+        response = self._get(dict(self._query(domain), showNumPages='true'))
+        try:
+            return int(response.text.strip())
+        except ValueError:
+            return None
+
+    def _rows(self, response):
+        """Строки JSON-ответа CDX без строки заголовков"""
+        rows = iter_json_array(iter_text(response))
+        for row in rows:
+            if row != ['original']:
+                yield row
+
+    def _fetch_page(self, domain, page):
+        response = self._get(dict(self._query(domain), output='json', page=page), stream=True)
+        return page, [row[0] for row in self._rows(response) if row]
+
+    def _fetch_resume(self, domain, resume_key):
+        params = dict(self._query(domain), output='json', showResumeKey='true', limit=RESUME_LIMIT)
+        if resume_key:
+            params['resumeKey'] = resume_key
+        response = self._get(params, stream=True)
+        urls = []
+        next_key = None
+        after_blank = False
+        for row in self._rows(response):
+            # После пустой строки сервер передает ключ продолжения
+            if not row:
+                after_blank = True
+            elif after_blank:
+                next_key = row[0]
+            else:
+                urls.append(row[0])
+        return urls, next_key
+
+    def iter_pages(self, domain):
+        """Генератор списков URL по страницам.
+
+        Страница отмечается в контрольной точке, когда потребитель
+        вернулся за следующей, то есть ее URL уже обработаны.
+        """
+        state = self.checkpoint.state
+        if not self.checkpoint.matches(domain):
+            self.checkpoint.reset(domain)
+            state = self.checkpoint.state
+        if 'pages' not in state:
+            state['pages'] = self.num_pages(domain)
+            self.checkpoint.save()
+        self.pages = state['pages']
+        if self.pages is None:
+            yield from self._iter_resume(domain, state)
+        else:
+            yield from self._iter_paged(domain, state)
+
+    def _iter_paged(self, domain, state):
+        done = set(state.setdefault('done', []))
+        todo = (page for page in range(self.pages) if page not in done)
+        limit = self.workers * 2
+        with ThreadPoolExecutor(max_workers=self.workers) as executor:
+            running = set()
+            while True:
+                for page in todo:
+                    running.add(executor.submit(self._fetch_page, domain, page))
+                    if len(running) >= limit:
+                        break
+                if not running:
+                    break
+                finished, running = wait(running, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    page, urls = future.result()
+                    yield urls
+                    done.add(page)
+                    state['done'] = sorted(done)
+                    self.checkpoint.save()
+
+    def _iter_resume(self, domain, state):
+        # resumeKey задает порядок: запросы идут последовательно
+        while not state.get('exhausted'):
+            urls, next_key = self._fetch_resume(domain, state.get('resume_key'))
+            yield urls
+            state['resume_key'] = next_key
+            state['exhausted'] = next_key is None
+            self.checkpoint.save()
+
+    def sample(self, domain, limit=SAMPLE_LIMIT):
+        """Один запрос к CDX API: не больше limit уникальных URL домена.
+
+        Страницы не перебираются; полная выгрузка - harvest.
+        """
+        response = self._get(dict(self._query(domain), output='json', collapse='urlkey',
+                                  limit=limit), stream=True)
+        return [row[0] for row in self._rows(response) if row]
+
+    def harvest(self, domain, sink, on_page=None):
+        """Выгрузка всех URL домена в sink; on_page(страниц, записано) - прогресс"""
+        pages = 0
+        for urls in self.iter_pages(domain):
+            for url in urls:
+                sink.add(url)
+            # URL страницы на диске до того, как страница отмечена выполненной
+            sink.flush()
+            pages += 1
+            if on_page:
+                on_page(pages, sink.written)
+        return pages
@@ -6,9 +6,8 @@
 
 import sys
 import time
-import threading
-import os
-from osint_advanced import AdvancedOSINT
+
+from osint_cli import clear_screen
 
 # Цвета ANSI
 GREEN = "\033[38;2;0;255;0m"
@@ -42,7 +41,7 @@ def beep():
 
 # Новый баннер
 def print_banner():
-    os.system('cls' if os.name == 'nt' else 'clear')
+    clear_screen()
     banner_art = r'''
 ⠄⢀⣀⣠⣤⣴⣶⣶⡇⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄
 ⢰⣿⣿⣿⣿⣿⣿⣿⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄⠄
@@ -94,6 +93,8 @@ def print_menu():
 def main():
     from osint_cli import OSINTTool
     tool = OSINTTool()
+    # Расширенные функции загружаются при первом выборе пункта 9
+    advanced = None
     tool.print_banner()
     while True:
         print_menu()
@@ -134,7 +135,9 @@ def main():
             if file_path:
                 tool.metadata_extraction(file_path)
         elif choice == "9":
-            advanced = AdvancedOSINT()
+            if advanced is None:
+                from osint_advanced import AdvancedOSINT
+                advanced = AdvancedOSINT(cache=tool.cache, session=tool.session)
             print("\nРасширенные возможности:")
             print("1. Shodan поиск")
             print("2. Wayback Machine")
@@ -168,7 +171,7 @@ def main():
         else:
             print("Неверный выбор. Попробуйте снова.")
         input("\nНажмите Enter для продолжения...")
-        os.system('cls' if os.name == 'nt' else 'clear')
+        clear_screen()
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
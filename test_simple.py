@@ -5,6 +5,107 @@
 
 import sys
 import os
+import json
+import tempfile
+import threading
+import time
+
+
+def check_feistel():
+    """Перестановка Фейстеля - биекция, в том числе для нечетных размеров"""
+    from osint_targets import FeistelPermutation
+    for size in (1, 3, 5, 7, 15, 33, 255, 1001):
+        for seed in (0, 1, 42):
+            values = list(FeistelPermutation(size, seed))
+            assert sorted(values) == list(range(size)), (size, seed)
+
+
+def check_subtract():
+    """Вычитание отрезков: середина, края, полное и пустое исключение"""
+    from osint_targets import _subtract
+    assert _subtract([[0, 9]], [[3, 5]]) == [[0, 2], [6, 9]]
+    assert _subtract([[0, 9]], [[0, 2], [8, 12]]) == [[3, 7]]
+    assert _subtract([[0, 9]], [[0, 9]]) == []
+    assert _subtract([[0, 9]], []) == [[0, 9]]
+    assert _subtract([[0, 4], [10, 14]], [[3, 11]]) == [[0, 2], [12, 14]]
+    assert _subtract([[0, 9]], [[4, 5], [2, 3]]) == [[0, 1], [6, 9]]
+    assert _subtract([[5, 5]], [[0, 4], [6, 8]]) == [[5, 5]]
+
+
+def check_journal_resume():
+    """Возобновление по журналу пропускает ровно записанные номера"""
+    from osint_journal import ScanJournal, scan_params
+    from osint_targets import TargetSet
+    targets = TargetSet('10.0.0.1-10.0.0.29')
+    params = scan_params('10.0.0.1-10.0.0.29', None, [80], True, 7, targets.size)
+    finished = {0, 1, 2, 5, 6, 11, 20, 28}
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'scan.journal')
+        journal = ScanJournal(path, params, interval=3600)
+        for position in sorted(finished):
+            journal.position_done(position)
+        journal.close()
+        journal = ScanJournal(path, params, resume=True)
+        try:
+            assert journal.resumed and journal.completed == len(finished)
+            items = list(targets.iter_positions(True, 7, skip=journal.done))
+        finally:
+            journal.close()
+    order = list(targets.iter(True, 7))
+    assert [position for position, _ in items] == sorted(set(range(targets.size)) - finished)
+    assert all(order[position] == ip for position, ip in items)
+
+
+def check_json_stream():
+    """Потоковый разбор JSON-массива при разрезе на любой границе"""
+    from osint_stream import iter_json_array
+    text = '[{"ip": "1.2.3.4", "n": [1, 2]}, 12345, "a,]b", -0.5e3, true, null, []]'
+    expected = json.loads(text)
+    for cut in range(len(text) + 1):
+        assert list(iter_json_array([text[:cut], text[cut:]])) == expected, cut
+    assert list(iter_json_array(iter(text))) == expected
+
+
+def check_dns_coalescing():
+    """Одновременные промахи кэша DNS - один запрос к резолверу"""
+    from osint_dns import DNSCache
+
+    class Answer:
+        expiration = time.time() + 300
+
+    class Resolver:
+        calls = 0
+
+        def resolve(self, qname, rdtype):
+            Resolver.calls += 1
+            time.sleep(0.2)
+            return Answer()
+
+    cache = DNSCache(Resolver())
+    barrier = threading.Barrier(8)
+    results = []
+
+    def worker():
+        barrier.wait()
+        results.append(cache.resolve('example.com', 'A'))
+
+    threads = [threading.Thread(target=worker) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert Resolver.calls == 1 and cache.misses == 1, Resolver.calls
+    assert len(results) == 8 and all(result is results[0] for result in results)
+
+
+CHECKS = [
+    ("перестановка Фейстеля", check_feistel),
+    ("вычитание отрезков", check_subtract),
+    ("возобновление по журналу", check_journal_resume),
+    ("потоковый JSON", check_json_stream),
+    ("кэш DNS", check_dns_coalescing),
+]
+
 
 def main():
     print("=== ТЕСТ OSINT CLI ===")
@@ -35,11 +136,21 @@ def main():
     except ImportError as e:
         print("❌ PIL - ОШИБКА:", e)
     
+    failed = 0
+    for name, check in CHECKS:
+        try:
+            check()
+            print(f"✅ {name} - OK")
+        except Exception as e:
+            failed += 1
+            print(f"❌ {name} - ОШИБКА: {e!r}")
+    
     print("\n=== ТЕСТ ЗАВЕРШЕН ===")
     
     # Пауза для Windows
     if os.name == 'nt':
         input("Нажмите Enter для выхода...")
+    return 1 if failed else 0
 
 if __name__ == "__main__":
-    main() 
\ No newline at end of file
+    sys.exit(main()) 
\ No newline at end of file